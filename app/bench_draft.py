@@ -0,0 +1,128 @@
+"""
+Benchmark: one LLM call per draft vs batched drafts (same kb_key per request) on the local mock server.
+
+Reports wall-clock latency per draft and prompt/cached/completion tokens per draft for each mode
+(the mock reports a repeated prompt prefix as cached, like provider-side prompt caching).
+Run: python -m app.bench_draft [--n 40] [--batch-size 10]
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from app.classify import ClassificationResult
+from app.config import DEFAULT_DATA_DIR
+from app.draft import DraftBatchStats, draft_batch_from_policy
+from app.kb import get_snippet, load_kb
+from app.llm import generate_draft
+from app.mock_llm import MockLLMServer
+from app.redact import load_patterns, redact
+
+
+def _eligible_messages(data_dir: Path, n: int) -> list[tuple[str, str, str]]:
+    """(message_id, intent, redacted_text) for draft-eligible labelled messages, cycled up to n."""
+    df = pd.read_csv(data_dir / "messages.csv")
+    df = df[df["label"].astype(str).str.strip().str.lower() == "fraud"]
+    patterns = load_patterns(data_dir / "pii_patterns.yaml")
+    rows = [
+        (str(r["message_id"]), "fraud", redact(str(r["text"]), patterns))
+        for _, r in df.iterrows()
+    ]
+    return [
+        (f"{rows[i % len(rows)][0]}-{i}", *rows[i % len(rows)][1:]) for i in range(n)
+    ]
+
+
+def bench_single(messages: list[tuple[str, str, str]], kb: dict[str, str]) -> dict:
+    usage: dict[str, int] = {}
+    t0 = time.perf_counter()
+    for _, intent, redacted in messages:
+        generate_draft(
+            customer_message=redacted,
+            policy_snippet=get_snippet(kb, intent),
+            kb_key="suspected_fraud",
+            usage=usage,
+        )
+    elapsed = time.perf_counter() - t0
+    return _summary("single", len(messages), elapsed, usage, len(messages))
+
+
+def bench_batch(
+    messages: list[tuple[str, str, str]], kb: dict[str, str], batch_size: int
+) -> dict:
+    stats = DraftBatchStats()
+    items = [
+        (mid, ClassificationResult(intent, "Fraud/Economic Crime Prevention", 1.0), red)
+        for mid, intent, red in messages
+    ]
+    t0 = time.perf_counter()
+    draft_batch_from_policy(items, kb, use_llm=True, batch_size=batch_size, stats=stats)
+    elapsed = time.perf_counter() - t0
+    usage = {
+        "prompt_tokens": stats.prompt_tokens,
+        "cached_tokens": stats.cached_tokens,
+        "completion_tokens": stats.completion_tokens,
+    }
+    return _summary(
+        f"batch({batch_size})",
+        len(messages),
+        elapsed,
+        usage,
+        stats.batch_requests + stats.single_retries,
+    )
+
+
+def _summary(mode: str, n: int, elapsed: float, usage: dict, requests: int) -> dict:
+    return {
+        "mode": mode,
+        "drafts": n,
+        "requests": requests,
+        "latency_ms_per_draft": round(1000 * elapsed / n, 2) if n else 0.0,
+        "prompt_tokens_per_draft": round(usage.get("prompt_tokens", 0) / n, 1) if n else 0.0,
+        "cached_tokens_per_draft": round(usage.get("cached_tokens", 0) / n, 1) if n else 0.0,
+        "completion_tokens_per_draft": (
+            round(usage.get("completion_tokens", 0) / n, 1) if n else 0.0
+        ),
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark single vs batched LLM drafts (mock server)")
+    p.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    p.add_argument("--n", type=int, default=40, help="Number of drafts (default: 40)")
+    p.add_argument("--batch-size", type=int, default=10)
+    p.add_argument(
+        "--base-latency-ms",
+        type=float,
+        default=80.0,
+        help="Mock time per request before tokens (default: 80)",
+    )
+    p.add_argument(
+        "--token-latency-ms",
+        type=float,
+        default=2.0,
+        help="Mock time per completion token (default: 2)",
+    )
+    args = p.parse_args()
+
+    kb = load_kb(args.data_dir / "kb")
+    messages = _eligible_messages(args.data_dir, args.n)
+    with MockLLMServer(
+        base_latency_s=args.base_latency_ms / 1000,
+        per_token_latency_s=args.token_latency_ms / 1000,
+    ) as server:
+        os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY") or "mock-key"
+        os.environ["LLM_BASE_URL"] = server.base_url
+        results = [
+            bench_single(messages, kb),
+            bench_batch(messages, kb, args.batch_size),
+        ]
+    for r in results:
+        print(r)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: memory of batch-run results, one dict per message vs the columnar ResultStore.
+
+Rows are sampled from a real (quiet, template-draft) pipeline run over messages.csv and
+cycled up to N; both layouts are measured with tracemalloc and reported per 1M messages.
+Also compares ClassificationResult with and without __slots__.
+Run: python -m app.bench_results [--n 200000]
+"""
+
+import argparse
+import gc
+import os
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.classify import ClassificationResult
+from app.config import DEFAULT_DATA_DIR
+from app.results import ResultRow, ResultStore
+
+PER = 1_000_000
+
+
+@dataclass
+class _DictClassificationResult:
+    """ClassificationResult as it was before __slots__ (per-instance __dict__)."""
+
+    intent: str
+    suggested_queue: str
+    confidence: Optional[float] = None
+
+
+def _measure(build: Callable[[], object]) -> int:
+    """Bytes still allocated while the object returned by build() is alive."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return current
+
+
+def _sample_rows(data_dir: Path) -> list[ResultRow]:
+    from app.run import run_pipeline
+
+    os.environ.pop("USE_LLM", None)
+    os.environ.setdefault("CLASSIFY_BACKEND", "stub")
+    return list(run_pipeline(data_dir / "messages.csv", data_dir, limit=None, quiet=True))
+
+
+def build_dict_rows(sample: list[ResultRow], n: int) -> list[dict]:
+    """The previous run_pipeline layout: one dict with repeated keys per message."""
+    rows = []
+    for i in range(n):
+        r = sample[i % len(sample)]
+        draft = r.draft
+        rows.append(
+            {
+                "msg_id": f"MSG{i:07d}",
+                "intent": r.intent,
+                "queue": r.queue,
+                "confidence": float(r.confidence),
+                "fallback": r.fallback,
+                "checks_ok": r.checks_ok,
+                "status": "OK" if r.checks_ok else f"FAIL:{','.join(r.failures)}",
+                "draft_preview": (draft[:80] + "…") if len(draft) > 80 else draft,
+            }
+        )
+    return rows
+
+
+def build_store(sample: list[ResultRow], n: int) -> ResultStore:
+    store = ResultStore(capacity=n)
+    for i in range(n):
+        r = sample[i % len(sample)]
+        store.append(
+            f"MSG{i:07d}", r.intent, r.queue, r.confidence, r.fallback, r.failures, r.draft
+        )
+    return store
+
+
+def bench(data_dir: Path, n: int) -> list[dict]:
+    sample = _sample_rows(data_dir)
+    scale = PER / n
+    results = []
+    for name, build in (
+        ("rows: list[dict] (draft preview only)", lambda: build_dict_rows(sample, n)),
+        ("rows: ResultStore (full drafts)", lambda: build_store(sample, n)),
+        (
+            "ClassificationResult without __slots__",
+            lambda: [_DictClassificationResult("fraud", "q", 0.9) for _ in range(n)],
+        ),
+        (
+            "ClassificationResult with __slots__",
+            lambda: [ClassificationResult("fraud", "q", 0.9) for _ in range(n)],
+        ),
+    ):
+        nbytes = _measure(build)
+        results.append(
+            {
+                "layout": name,
+                "bytes_per_message": round(nbytes / n, 1),
+                "mb_per_1m_messages": round(nbytes * scale / 1e6, 1),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Memory per 1M messages: dict rows vs ResultStore")
+    p.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    p.add_argument(
+        "--n",
+        type=int,
+        default=200_000,
+        help="Messages to materialise; results are scaled to 1M (default: 200000)",
+    )
+    args = p.parse_args()
+    for r in bench(args.data_dir, args.n):
+        print(r)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Checkpoints for resumable batch runs.
+
+A checkpoint is two files: <path>.jsonl with one flushed result row per processed message
+(in input order) and <path>.json with {fingerprint, offset, rows}. The state is replaced
+atomically only after the rows it counts are fsynced. On resume, result lines beyond the
+recorded count (written just before a crash) are dropped, so no row is duplicated or missing.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from app.results import ResultStore
+
+DEFAULT_CHECKPOINT = Path("run_checkpoint")
+DEFAULT_CHECKPOINT_EVERY = 100
+
+
+def input_fingerprint(messages_path: Path, limit: Optional[int]) -> str:
+    """Identity of a run's input: messages file bytes and the row limit."""
+    h = hashlib.sha256()
+    with open(messages_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    h.update(f"\0limit={limit or 0}".encode())
+    return h.hexdigest()[:32]
+
+
+class CheckpointMismatch(ValueError):
+    """The checkpoint on disk belongs to a different input (file contents or limit)."""
+
+
+class RunCheckpoint:
+    """Flushed partial results plus the offset of the next unprocessed message."""
+
+    def __init__(self, path: Path, fingerprint: str):
+        path = Path(path)
+        self.results_path = path.with_name(path.name + ".jsonl")
+        self.state_path = path.with_name(path.name + ".json")
+        self.fingerprint = fingerprint
+        self._saved = 0  # rows of the store already in results_path
+
+    def reset(self) -> None:
+        """Start over: forget any previous checkpoint at this path."""
+        self.results_path.unlink(missing_ok=True)
+        self.state_path.unlink(missing_ok=True)
+        self._saved = 0
+
+    def restore(self, store: ResultStore) -> int:
+        """Load saved rows into store; returns the offset to resume from (0 if none)."""
+        if not self.state_path.exists():
+            self.reset()
+            return 0
+        state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        if state.get("fingerprint") != self.fingerprint:
+            raise CheckpointMismatch(
+                f"{self.state_path} is for a different input; run without --resume to start over"
+            )
+        n = int(state["rows"])
+        lines = self.results_path.read_text(encoding="utf-8").splitlines()[:n]
+        if len(lines) < n:
+            raise CheckpointMismatch(f"{self.results_path} has fewer rows than its checkpoint")
+        # rewrite without rows flushed after the last state update
+        self._write(self.results_path, "".join(line + "\n" for line in lines))
+        for line in lines:
+            store.append(**json.loads(line))
+        self._saved = len(store)
+        return int(state["offset"])
+
+    def save(self, store: ResultStore, offset: int) -> None:
+        """Append rows not yet saved, fsync them, then atomically record the new offset."""
+        with open(self.results_path, "a", encoding="utf-8") as f:
+            for i in range(self._saved, len(store)):
+                row = asdict(store[i])
+                row["failures"] = list(row["failures"])
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._saved = len(store)
+        state = {"fingerprint": self.fingerprint, "offset": offset, "rows": self._saved}
+        self._write(self.state_path, json.dumps(state))
+
+    @staticmethod
+    def _write(path: Path, text: str) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
@@ -1,49 +1,60 @@
 """Intent classification: interface and backends (stub, MTL, LLM pluggable)."""
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Sequence
 
 import pandas as pd
 
+from app.deadline import Deadline
 
-@dataclass
+if TYPE_CHECKING:  # app.mtl imports this module
+    from app.mtl import MTLClassifier
+
+
+@dataclass(slots=True)
 class ClassificationResult:
     """Output of classifier: intent, suggested_queue, optional confidence."""
 
     intent: str
     suggested_queue: str
     confidence: Optional[float] = None
+    # Per-intent draft gating threshold from a calibrated model (None → draft.CONFIDENCE_THRESHOLD)
+    threshold: Optional[float] = None
+
+
+def load_stub_labels(messages_path: Path) -> dict[str, tuple[str, str]]:
+    """message_id → (label, suggested_queue) from messages.csv; {} if missing or unlabelled."""
+    if not messages_path.exists():
+        return {}
+    df = pd.read_csv(messages_path)
+    if not {"message_id", "label", "suggested_queue"} <= set(df.columns):
+        return {}
+    labels: dict[str, tuple[str, str]] = {}
+    for mid, label, queue in zip(df["message_id"], df["label"], df["suggested_queue"]):
+        # first row wins for a repeated message_id
+        labels.setdefault(str(mid), (str(label).strip().lower(), str(queue).strip()))
+    return labels
 
 
 def classify_stub_from_labels(
     text: str,
     messages_path: Path,
     message_id: Optional[str] = None,
+    labels: Optional[dict[str, tuple[str, str]]] = None,
 ) -> ClassificationResult:
     """
     Stub backend: look up by message_id in messages.csv and return label/suggested_queue.
     If message_id not provided or not found, return a default (general / General Banking).
+    labels: a load_stub_labels() result to reuse instead of reading messages.csv per call.
     """
-    if not messages_path.exists():
-        return ClassificationResult(
-            intent="general",
-            suggested_queue="General Banking",
-            confidence=0.0,
-        )
-    df = pd.read_csv(messages_path)
-    if (
-        message_id
-        and "message_id" in df.columns
-        and "label" in df.columns
-        and "suggested_queue" in df.columns
-    ):
-        row = df[df["message_id"] == message_id]
-        if not row.empty:
+    if message_id:
+        if labels is None:
+            labels = load_stub_labels(messages_path)
+        found = labels.get(str(message_id))
+        if found is not None:
             return ClassificationResult(
-                intent=str(row["label"].iloc[0]).strip().lower(),
-                suggested_queue=str(row["suggested_queue"].iloc[0]).strip(),
-                confidence=1.0,
+                intent=found[0], suggested_queue=found[1], confidence=1.0
             )
     return ClassificationResult(
         intent="general",
@@ -52,25 +63,219 @@ def classify_stub_from_labels(
     )
 
 
+# LLM backend: only messages whose base (MTL) confidence is below this are sent to the LLM
+LLM_CONFIDENCE_THRESHOLD = 0.7
+# Max messages packed into one LLM classification request
+LLM_BATCH_SIZE = 20
+
+
+@dataclass
+class LLMGateStats:
+    """Counters for the gated, batched LLM backend (calls/tokens spent vs avoided)."""
+
+    messages: int = 0
+    gated_out: int = 0  # confident enough: answered by base backend, no LLM
+    sent_to_llm: int = 0
+    llm_calls: int = 0
+    batched_items: int = 0  # items carried by successful LLM calls
+    llm_fallbacks: int = 0  # sent but kept base result (API error / missing item)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_avoided_by_gating: int = 0
+    tokens_avoided_by_batching: int = 0
+
+    @property
+    def calls_avoided_by_gating(self) -> int:
+        return self.gated_out
+
+    @property
+    def calls_avoided_by_batching(self) -> int:
+        return max(0, self.batched_items - self.llm_calls)
+
+    def as_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "calls_avoided_by_gating": self.calls_avoided_by_gating,
+            "calls_avoided_by_batching": self.calls_avoided_by_batching,
+        }
+
+
+def _classify_base_batch(
+    redacted_texts: Sequence[str],
+    messages_path: Path,
+    message_ids: Sequence[Optional[str]],
+    model_path: Optional[Path],
+    classifier: Optional["MTLClassifier"] = None,
+    stub_labels: Optional[dict[str, tuple[str, str]]] = None,
+) -> tuple[list[ClassificationResult], dict[str, float]]:
+    """
+    Base predictions for the LLM gate: classifier, else MTL when available (model loaded
+    once), else stub. Also returns the model's per-intent draft thresholds ({} for stub or
+    uncalibrated).
+    """
+    try:
+        from app.mtl import load_or_train
+
+        clf = (
+            classifier
+            if classifier is not None
+            else load_or_train(messages_path, model_path=model_path)
+        )
+        return [clf.predict(t) for t in redacted_texts], dict(clf.thresholds)
+    except Exception:
+        return [
+            classify_stub_from_labels(t, messages_path, mid, stub_labels)
+            for t, mid in zip(redacted_texts, message_ids)
+        ], {}
+
+
+def classify_batch(
+    redacted_texts: Sequence[str],
+    messages_path: Path,
+    message_ids: Optional[Sequence[Optional[str]]] = None,
+    backend: str = "stub",
+    model_path: Optional[Path] = None,
+    stats: Optional[LLMGateStats] = None,
+    confidence_threshold: float = LLM_CONFIDENCE_THRESHOLD,
+    batch_size: int = LLM_BATCH_SIZE,
+    deadlines: Optional[Sequence[Optional[Deadline]]] = None,
+    classifier: Optional["MTLClassifier"] = None,
+    stub_labels: Optional[dict[str, tuple[str, str]]] = None,
+) -> list[ClassificationResult]:
+    """
+    Classify many redacted messages; results are in input order.
+    backend "llm": base (MTL) prediction for every message; only those below confidence_threshold
+    are packed batch_size at a time into structured-output LLM requests. Any item the LLM
+    does not answer keeps its base prediction. Counters are accumulated into stats if given.
+    Other backends classify one message at a time via classify().
+    deadlines (one per message, as in classify): a message without budget for an LLM call keeps
+    its base prediction (llm_classify_skipped); each request is capped by the least remaining
+    budget of the messages it carries. classifier and stub_labels: as in classify.
+    """
+    ids = list(message_ids) if message_ids is not None else [None] * len(redacted_texts)
+    dls = list(deadlines) if deadlines is not None else [None] * len(redacted_texts)
+    if backend != "llm":
+        return [
+            classify(
+                t,
+                messages_path,
+                message_id=mid,
+                backend=backend,
+                model_path=model_path,
+                deadline=dl,
+                stub_labels=stub_labels,
+                classifier=classifier,
+            )
+            for t, mid, dl in zip(redacted_texts, ids, dls)
+        ]
+    from app.llm import classify_batch as llm_classify_batch
+    from app.llm import classify_single_prompt_tokens
+    from app.mtl import INTENTS, QUEUES
+
+    stats = stats if stats is not None else LLMGateStats()
+    results, thresholds = _classify_base_batch(
+        redacted_texts, messages_path, ids, model_path, classifier, stub_labels
+    )
+    stats.messages += len(results)
+    pending = [
+        i for i, r in enumerate(results) if (r.confidence or 0.0) < confidence_threshold
+    ]
+    pending_set = set(pending)
+    for i, t in enumerate(redacted_texts):
+        if i not in pending_set:
+            stats.gated_out += 1
+            stats.tokens_avoided_by_gating += classify_single_prompt_tokens(
+                t, INTENTS, QUEUES
+            )
+    stats.sent_to_llm += len(pending)
+    for start in range(0, len(pending), max(1, batch_size)):
+        chunk = pending[start : start + max(1, batch_size)]
+        skipped = [i for i in chunk if dls[i] is not None and not dls[i].allows_llm()]
+        for i in skipped:
+            dls[i].degrade("llm_classify_skipped")
+        stats.llm_fallbacks += len(skipped)
+        chunk = [i for i in chunk if i not in skipped]
+        if not chunk:
+            continue
+        items = [(str(i), redacted_texts[i]) for i in chunk]
+        single_cost = sum(
+            classify_single_prompt_tokens(t, INTENTS, QUEUES) for _, t in items
+        )
+        budgets = [dls[i].remaining() for i in chunk if dls[i] is not None]
+        answer = llm_classify_batch(
+            items, INTENTS, QUEUES, timeout_s=min(budgets) if budgets else None
+        )
+        if answer is None:
+            stats.llm_fallbacks += len(chunk)
+            continue
+        parsed, usage = answer
+        stats.llm_calls += 1
+        stats.batched_items += len(chunk)
+        stats.prompt_tokens += usage["prompt_tokens"]
+        stats.completion_tokens += usage["completion_tokens"]
+        stats.tokens_avoided_by_batching += max(0, single_cost - usage["prompt_tokens"])
+        for i in chunk:
+            r = parsed.get(str(i))
+            if r is None:
+                stats.llm_fallbacks += 1
+                continue
+            results[i] = ClassificationResult(
+                intent=r["intent"],
+                suggested_queue=r["suggested_queue"],
+                confidence=r["confidence"],
+                # Gate the LLM's intent like an MTL answer for it
+                threshold=thresholds.get(r["intent"]),
+            )
+    return results
+
+
 def classify(
     redacted_text: str,
     messages_path: Path,
     message_id: Optional[str] = None,
     backend: str = "stub",
     model_path: Optional[Path] = None,
+    deadline: Optional[Deadline] = None,
+    stub_labels: Optional[dict[str, tuple[str, str]]] = None,
+    classifier: Optional["MTLClassifier"] = None,
 ) -> ClassificationResult:
     """
     Classifier interface: input redacted text → output intent, suggested_queue, confidence.
-    backend: "stub" (from labels), "mtl" (multi-task learning in app/mtl.py), "llm" (future).
+    backend: "stub" (from labels), "mtl" (multi-task learning in app/mtl.py),
+    "llm" (MTL, with low-confidence messages re-classified by the LLM; see classify_batch).
+    deadline: with too little budget left for an LLM call, "llm" keeps the MTL result
+    (llm_classify_skipped). stub_labels: see classify_stub_from_labels.
+    classifier: an already loaded MTL model to use instead of load_or_train's process-wide
+    cache (e.g. a tenant engine's own model, freed with the engine).
     """
+    if backend == "llm" and deadline is not None and not deadline.allows_llm():
+        deadline.degrade("llm_classify_skipped")
+        backend = "mtl"
     if backend == "stub":
-        return classify_stub_from_labels(redacted_text, messages_path, message_id)
+        return classify_stub_from_labels(redacted_text, messages_path, message_id, stub_labels)
     if backend == "mtl":
         try:
             from app.mtl import load_or_train
 
-            clf = load_or_train(messages_path, model_path=model_path)
+            clf = (
+                classifier
+                if classifier is not None
+                else load_or_train(messages_path, model_path=model_path)
+            )
             return clf.predict(redacted_text)
         except Exception:
-            return classify_stub_from_labels(redacted_text, messages_path, message_id)
-    return classify_stub_from_labels(redacted_text, messages_path, message_id)
+            return classify_stub_from_labels(
+                redacted_text, messages_path, message_id, stub_labels
+            )
+    if backend == "llm":
+        return classify_batch(
+            [redacted_text],
+            messages_path,
+            message_ids=[message_id],
+            backend="llm",
+            model_path=model_path,
+            deadlines=[deadline],
+            classifier=classifier,
+            stub_labels=stub_labels,
+        )[0]
+    raise ValueError(f"Unknown classification backend: {backend!r}")
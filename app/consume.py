@@ -0,0 +1,521 @@
+"""
+Queue consumer: `app consume` pulls messages from a local durable queue, runs the pipeline
+(redact → classify → draft → check) and acknowledges only after results are durably written
+(at-least-once: a crash before the ack redelivers, so sinks should dedupe on message_id).
+
+Queues (stand-ins for the broker):
+- SQLiteQueue: one table; leased rows are redelivered when their lease expires.
+- SpoolQueue: producers drop *.jsonl files ({"message_id", "text"[, "tenant"]} per line) into a directory
+  (write under another name, then rename). Files are claimed into processing/, the acked line
+  offset is persisted next to each file, and fully acked files move to done/.
+
+Batches adapt to drafting latency (grow while under target, halve when over); leasing pauses
+while too many messages are in flight (backpressure). Queue depth and consumer lag (age of
+the oldest unacknowledged message) are reported with the throughput metrics.
+A message's optional tenant selects its data directory under --tenants-dir; one process
+serves all tenants from an EngineRegistry (app/tenants.py), others use --data-dir.
+Run: python -m app consume (--sqlite queue.db | --spool DIR) [--enqueue messages.csv] [--once]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.config import DEFAULT_DATA_DIR
+
+DEFAULT_MIN_BATCH = 1
+DEFAULT_MAX_BATCH = 64
+DEFAULT_TARGET_BATCH_S = 2.0
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_IN_FLIGHT = 128
+DEFAULT_LEASE_S = 300.0
+DEFAULT_POLL_S = 0.5
+DEFAULT_OUT = Path("consume_results.jsonl")
+
+
+@dataclass
+class QueueItem:
+    message_id: str
+    text: str
+    enqueued_at: float
+    receipt: Any  # backend-specific handle passed back to ack()
+    tenant: Optional[str] = None  # None → the consumer's default data directory
+    error: Optional[str] = None  # unreadable message: acked with an error record, not processed
+
+
+class SQLiteQueue:
+    """Durable FIFO in one SQLite table; lease → ack, expired leases are redelivered."""
+
+    def __init__(self, path: Path, lease_s: float = DEFAULT_LEASE_S):
+        self.path = Path(path)
+        self.lease_s = lease_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, message_id TEXT NOT NULL, "
+                "text TEXT NOT NULL, enqueued_at REAL NOT NULL, leased_until REAL, tenant TEXT)"
+            )
+            columns = {r[1] for r in self._conn.execute("PRAGMA table_info(messages)")}
+            if "tenant" not in columns:  # queue created before tenants were routed
+                self._conn.execute("ALTER TABLE messages ADD COLUMN tenant TEXT")
+
+    def put_many(self, messages: list[tuple]) -> None:
+        """messages: (message_id, text) or (message_id, text, tenant) tuples."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO messages (message_id, text, enqueued_at, tenant) VALUES (?, ?, ?, ?)",
+                [(m[0], m[1], now, m[2] if len(m) > 2 else None) for m in messages],
+            )
+
+    def lease(self, n: int) -> list[QueueItem]:
+        now = time.time()
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT seq, message_id, text, enqueued_at, tenant FROM messages "
+                "WHERE leased_until IS NULL OR leased_until < ? ORDER BY seq LIMIT ?",
+                (now, n),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE messages SET leased_until = ? WHERE seq = ?",
+                [(now + self.lease_s, r[0]) for r in rows],
+            )
+        return [QueueItem(r[1], r[2], r[3], r[0], r[4]) for r in rows]
+
+    def ack(self, items: list[QueueItem]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM messages WHERE seq = ?", [(it.receipt,) for it in items]
+            )
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def oldest_enqueued_at(self) -> Optional[float]:
+        with self._lock:
+            return self._conn.execute("SELECT MIN(enqueued_at) FROM messages").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _write_durably(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SpoolQueue:
+    """Spool directory of *.jsonl files; per-file acked offsets make progress durable."""
+
+    def __init__(self, spool_dir: Path):
+        self.spool_dir = Path(spool_dir)
+        self.processing_dir = self.spool_dir / "processing"
+        self.done_dir = self.spool_dir / "done"
+        for d in (self.spool_dir, self.processing_dir, self.done_dir):
+            d.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # claimed file name → {"lines", "next" (lease cursor), "acked", "enqueued_at"}
+        self._files: "OrderedDict[str, dict]" = OrderedDict()
+        for path in sorted(self.processing_dir.glob("*.jsonl")):
+            self._load(path)  # claimed before a crash: resume after the acked offset
+
+    def _offset_path(self, path: Path) -> Path:
+        return path.with_name(path.name + ".offset")
+
+    def _load(self, path: Path) -> None:
+        lines = [ln for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()]
+        offset_path = self._offset_path(path)
+        acked = int(offset_path.read_text() or 0) if offset_path.exists() else 0
+        self._files[path.name] = {
+            "lines": lines,
+            "next": acked,
+            "acked": acked,
+            "enqueued_at": path.stat().st_mtime,
+        }
+
+    def _claim_next(self) -> bool:
+        for path in sorted(self.spool_dir.glob("*.jsonl")):
+            target = self.processing_dir / path.name
+            try:
+                os.replace(path, target)
+            except FileNotFoundError:
+                continue  # claimed by another consumer
+            self._load(target)
+            return True
+        return False
+
+    def lease(self, n: int) -> list[QueueItem]:
+        items: list[QueueItem] = []
+        with self._lock:
+            while len(items) < n:
+                state = next(
+                    (
+                        (name, s)
+                        for name, s in self._files.items()
+                        if s["next"] < len(s["lines"])
+                    ),
+                    None,
+                )
+                if state is None:
+                    if not self._claim_next():
+                        break
+                    continue
+                name, s = state
+                while len(items) < n and s["next"] < len(s["lines"]):
+                    line_no = s["next"]
+                    items.append(self._item(name, line_no, s))
+                    s["next"] += 1
+        return items
+
+    @staticmethod
+    def _item(name: str, line_no: int, s: dict) -> QueueItem:
+        """QueueItem for one spool line; a malformed line becomes an error item (still acked)."""
+        try:
+            record = json.loads(s["lines"][line_no])
+            if not isinstance(record, dict):
+                raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+            return QueueItem(
+                str(record.get("message_id", f"{name}:{line_no}")),
+                str(record.get("text", "")),
+                float(record.get("enqueued_at", s["enqueued_at"])),
+                (name, line_no),
+                record.get("tenant"),
+            )
+        except (ValueError, TypeError) as exc:  # ValueError includes json.JSONDecodeError
+            return QueueItem(
+                f"{name}:{line_no}",
+                "",
+                s["enqueued_at"],
+                (name, line_no),
+                error=f"malformed spool line: {exc}",
+            )
+
+    def ack(self, items: list[QueueItem]) -> None:
+        """Advance each file's durable offset (batches are acked in lease order)."""
+        with self._lock:
+            for name in dict.fromkeys(it.receipt[0] for it in items):
+                s = self._files[name]
+                s["acked"] = max(
+                    [s["acked"]] + [it.receipt[1] + 1 for it in items if it.receipt[0] == name]
+                )
+                path = self.processing_dir / name
+                if s["acked"] >= len(s["lines"]):
+                    os.replace(path, self.done_dir / name)
+                    self._offset_path(path).unlink(missing_ok=True)
+                    del self._files[name]
+                else:
+                    _write_durably(self._offset_path(path), str(s["acked"]))
+
+    def depth(self) -> int:
+        with self._lock:
+            claimed = sum(len(s["lines"]) - s["acked"] for s in self._files.values())
+        unclaimed = 0
+        for path in self.spool_dir.glob("*.jsonl"):
+            try:
+                unclaimed += sum(1 for ln in path.read_bytes().splitlines() if ln.strip())
+            except FileNotFoundError:
+                pass
+        return claimed + unclaimed
+
+    def oldest_enqueued_at(self) -> Optional[float]:
+        with self._lock:
+            times = [s["enqueued_at"] for s in self._files.values() if s["acked"] < len(s["lines"])]
+        for path in self.spool_dir.glob("*.jsonl"):
+            try:
+                times.append(path.stat().st_mtime)
+            except FileNotFoundError:
+                pass
+        return min(times) if times else None
+
+    def close(self) -> None:
+        pass
+
+
+class ResultSink:
+    """Append-only JSONL results; each batch is flushed and fsynced before it is acked."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def write_batch(self, records: list[dict]) -> None:
+        for rec in records:
+            self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        self._f.close()
+
+
+@dataclass
+class ConsumerStats:
+    batches: int = 0
+    messages: int = 0
+    acked: int = 0
+    failed: int = 0  # pipeline errors (acked with an error record, not redelivered forever)
+    backpressure_waits: int = 0
+    batch_size: int = DEFAULT_MIN_BATCH
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    queue_depth: int = 0
+    consumer_lag_s: float = 0.0
+    throughput_msg_s: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class Consumer:
+    """
+    Lease → process on a worker pool → write durably → ack, batches in lease order.
+    process(text, message_id, tenant) -> result dict (e.g. TenantEngine.process of the
+    tenant's engine; tenant is None for messages without one).
+    """
+
+    def __init__(
+        self,
+        queue,
+        sink: ResultSink,
+        process: Callable[[str, str, Optional[str]], dict],
+        min_batch: int = DEFAULT_MIN_BATCH,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        target_batch_s: float = DEFAULT_TARGET_BATCH_S,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        poll_s: float = DEFAULT_POLL_S,
+    ):
+        self.queue = queue
+        self.sink = sink
+        self.process = process
+        self.max_in_flight = max(1, max_in_flight)
+        self.min_batch = min(max(1, min_batch), self.max_in_flight)
+        # a single batch never exceeds the in-flight bound
+        self.max_batch = min(max(self.min_batch, max_batch), self.max_in_flight)
+        self.target_batch_s = target_batch_s
+        self.concurrency = max(1, concurrency)
+        self.poll_s = poll_s
+        self.stats = ConsumerStats(batch_size=self.min_batch)
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _process_one(self, item: QueueItem) -> dict:
+        if item.error is not None:
+            return {"message_id": item.message_id, "tenant": item.tenant, "error": item.error}
+        try:
+            out = self.process(item.text, item.message_id, item.tenant)
+        except Exception as exc:
+            return {"message_id": item.message_id, "tenant": item.tenant, "error": repr(exc)}
+        return {
+            "message_id": item.message_id,
+            "tenant": item.tenant,
+            "intent": out["intent"],
+            "queue": out["queue"],
+            "confidence": out["confidence"],
+            "fallback": out["fallback"],
+            "checks_ok": out["checks_ok"],
+            "failures": out["failures"],
+            "draft": out["draft"],
+            "degradations": out.get("degradations", []),
+            "processed_at": time.time(),
+        }
+
+    def _adapt(self, elapsed_s: float) -> None:
+        """AIMD on batch size: grow by half while under target latency, halve when over."""
+        size = self.stats.batch_size
+        if elapsed_s > self.target_batch_s:
+            size = max(self.min_batch, size // 2)
+        else:
+            size = min(self.max_batch, size + max(1, size // 2))
+        self.stats.batch_size = size
+
+    def _complete(self, batch: tuple[list[QueueItem], list[Future], float]) -> None:
+        items, futures, started = batch
+        records = [f.result() for f in futures]
+        self.sink.write_batch(records)
+        self.queue.ack(items)  # only after the durable write
+        self.stats.batches += 1
+        self.stats.acked += len(items)
+        self.stats.failed += sum("error" in r for r in records)
+        self.stats.in_flight -= len(items)
+        self._adapt(time.monotonic() - started)
+
+    def refresh_metrics(self, started: float) -> dict:
+        self.stats.queue_depth = self.queue.depth()
+        oldest = self.queue.oldest_enqueued_at()
+        self.stats.consumer_lag_s = round(time.time() - oldest, 3) if oldest else 0.0
+        elapsed = time.monotonic() - started
+        self.stats.throughput_msg_s = round(self.stats.acked / elapsed, 2) if elapsed else 0.0
+        return self.stats.as_dict()
+
+    def run(
+        self,
+        until_empty: bool = False,
+        on_metrics: Optional[Callable[[dict], None]] = None,
+        metrics_interval_s: float = 5.0,
+    ) -> ConsumerStats:
+        """Consume until stop() (or the queue is drained when until_empty); returns stats."""
+        started = time.monotonic()
+        last_report = started
+        pending: deque = deque()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while True:
+                while pending and all(f.done() for f in pending[0][1]):
+                    self._complete(pending.popleft())
+                if on_metrics and time.monotonic() - last_report >= metrics_interval_s:
+                    on_metrics(self.refresh_metrics(started))
+                    last_report = time.monotonic()
+                if self._stop.is_set():
+                    break
+                if self.stats.in_flight + self.stats.batch_size > self.max_in_flight and pending:
+                    # drafting is behind: stop leasing until the oldest batch completes
+                    self.stats.backpressure_waits += 1
+                    wait(pending[0][1])
+                    continue
+                items = self.queue.lease(self.stats.batch_size)
+                if not items:
+                    if pending:
+                        wait(pending[0][1])
+                    elif until_empty:
+                        break
+                    else:
+                        self._stop.wait(self.poll_s)
+                    continue
+                self.stats.messages += len(items)
+                self.stats.in_flight += len(items)
+                self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.stats.in_flight)
+                futures = [pool.submit(self._process_one, it) for it in items]
+                pending.append((items, futures, time.monotonic()))
+            while pending:
+                wait(pending[0][1])
+                self._complete(pending.popleft())
+        self.refresh_metrics(started)
+        if on_metrics:
+            on_metrics(self.stats.as_dict())
+        return self.stats
+
+
+def enqueue_csv(queue, csv_path: Path) -> int:
+    """
+    Load messages.csv rows into the queue (SQLite) or as one spool file; returns the count.
+    An optional tenant column routes each row to that tenant.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    tenants = df["tenant"] if "tenant" in df.columns else [None] * len(df)
+    messages = [
+        (str(m), str(t), None if pd.isna(tn) else str(tn))
+        for m, t, tn in zip(df["message_id"], df["text"], tenants)
+    ]
+    if isinstance(queue, SpoolQueue):
+        name = f"{csv_path.stem}-{time.time_ns()}.jsonl"
+        tmp = queue.spool_dir / (name + ".tmp")
+        tmp.write_text(
+            "".join(
+                json.dumps(
+                    {"message_id": m, "text": t, **({"tenant": tn} if tn else {})},
+                    ensure_ascii=False,
+                )
+                + "\n"
+                for m, t, tn in messages
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, queue.spool_dir / name)
+    else:
+        queue.put_many(messages)
+    return len(messages)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    p = argparse.ArgumentParser(
+        prog="app consume", description="Consume messages from a local durable queue"
+    )
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--sqlite", type=Path, help="SQLite queue database")
+    src.add_argument("--spool", type=Path, help="Spool directory of *.jsonl files")
+    p.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    p.add_argument(
+        "--tenants-dir",
+        type=Path,
+        default=None,
+        help="Data directory per tenant name (messages with a tenant field)",
+    )
+    p.add_argument("--out", type=Path, default=DEFAULT_OUT, help="Results JSONL (appended)")
+    p.add_argument("--enqueue", type=Path, default=None, help="First load this messages CSV")
+    p.add_argument("--once", action="store_true", help="Exit when the queue is drained")
+    p.add_argument("--min-batch", type=int, default=DEFAULT_MIN_BATCH)
+    p.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    p.add_argument("--target-batch-s", type=float, default=DEFAULT_TARGET_BATCH_S)
+    p.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    p.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    p.add_argument("--lease-s", type=float, default=DEFAULT_LEASE_S)
+    p.add_argument("--metrics-interval-s", type=float, default=5.0)
+    args = p.parse_args(argv)
+
+    from app.tenants import EngineRegistry, tenant_data_dir
+
+    queue = SQLiteQueue(args.sqlite, lease_s=args.lease_s) if args.sqlite else SpoolQueue(args.spool)
+    if args.enqueue:
+        print(f"Enqueued {enqueue_csv(queue, args.enqueue)} messages")
+    registry = EngineRegistry()
+    registry.get(args.data_dir)  # warm the default tenant before the first lease
+    use_llm = os.environ.get("USE_LLM", "").strip().lower() in ("1", "true", "yes")
+
+    def process(text: str, message_id: str, tenant: Optional[str]) -> dict:
+        if tenant is None:
+            data_dir = args.data_dir
+        elif args.tenants_dir is None:
+            raise ValueError(f"message for tenant {tenant!r} but no --tenants-dir")
+        else:
+            data_dir = tenant_data_dir(args.tenants_dir, tenant)
+        return registry.get(data_dir).process(text, message_id, use_llm=use_llm)
+
+    sink = ResultSink(args.out)
+    consumer = Consumer(
+        queue,
+        sink,
+        process,
+        min_batch=args.min_batch,
+        max_batch=args.max_batch,
+        target_batch_s=args.target_batch_s,
+        concurrency=args.concurrency,
+        max_in_flight=args.max_in_flight,
+    )
+    try:
+        consumer.run(
+            until_empty=args.once,
+            on_metrics=lambda m: print(f"consumer: {m}", flush=True),
+            metrics_interval_s=args.metrics_interval_s,
+        )
+    except KeyboardInterrupt:
+        # in-flight batches were not acked: they are redelivered on the next start
+        print("Interrupted; unacknowledged messages will be redelivered")
+    finally:
+        sink.close()
+        queue.close()
+        print(f"tenants: {registry.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Per-message latency deadlines and the degradations taken to meet them.
+
+A Deadline starts when a message is picked up and travels through redact → classify →
+draft_from_policy → run_draft_checks. Each stage checks the remaining budget before its
+expensive step and degrades instead of overrunning:
+- classify: skip the LLM re-classification, keep the MTL result (llm_classify_skipped);
+- draft_from_policy: skip the LLM and use the template (llm_skipped), or skip drafting
+  entirely and escalate with only the routing decision (draft_skipped);
+- redact: never skipped (privacy); under REDACT_BUDGET_MS it is capped by the remaining
+  budget and fails closed to the quarantine mask (redact_quarantined);
+- run_draft_checks: never skipped (safety); a message still running past its deadline
+  there is recorded as deadline_missed.
+Enable with MESSAGE_DEADLINE_MS; DEADLINE_LLM_MIN_MS (default 1000) and DEADLINE_DRAFT_MIN_MS
+(default 5) are the least remaining budget to attempt an LLM call / a draft at all.
+"""
+
+import os
+import time
+from typing import Optional
+
+DEGRADATIONS = (
+    "llm_classify_skipped",
+    "llm_skipped",
+    "draft_skipped",
+    "redact_quarantined",
+    "deadline_missed",
+)
+# Least remaining budget to attempt an LLM call (DEADLINE_LLM_MIN_MS)
+DEFAULT_LLM_MIN_S = 1.0
+# Least remaining budget to draft at all, template included (DEADLINE_DRAFT_MIN_MS)
+DEFAULT_DRAFT_MIN_S = 0.005
+
+
+def _env_ms(name: str, default_s: float) -> float:
+    try:
+        return float(os.environ.get(name, "") or default_s * 1000) / 1000
+    except ValueError:
+        return default_s
+
+
+class Deadline:
+    """Monotonic time budget for one message plus the degradations taken under it."""
+
+    __slots__ = ("budget_s", "started", "llm_min_s", "draft_min_s", "degradations")
+
+    def __init__(
+        self,
+        budget_s: float,
+        llm_min_s: float = DEFAULT_LLM_MIN_S,
+        draft_min_s: float = DEFAULT_DRAFT_MIN_S,
+    ):
+        self.budget_s = budget_s
+        self.started = time.monotonic()
+        self.llm_min_s = llm_min_s
+        self.draft_min_s = draft_min_s
+        self.degradations: list[str] = []
+
+    @classmethod
+    def from_env(cls) -> Optional["Deadline"]:
+        """A fresh deadline of MESSAGE_DEADLINE_MS, or None when unset (no deadline)."""
+        budget_s = _env_ms("MESSAGE_DEADLINE_MS", 0.0)
+        if budget_s <= 0:
+            return None
+        return cls(
+            budget_s,
+            llm_min_s=_env_ms("DEADLINE_LLM_MIN_MS", DEFAULT_LLM_MIN_S),
+            draft_min_s=_env_ms("DEADLINE_DRAFT_MIN_MS", DEFAULT_DRAFT_MIN_S),
+        )
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.budget_s - self.elapsed())
+
+    @property
+    def expired(self) -> bool:
+        return self.elapsed() >= self.budget_s
+
+    def allows_llm(self) -> bool:
+        return self.remaining() >= self.llm_min_s
+
+    def allows_draft(self) -> bool:
+        return self.remaining() >= self.draft_min_s
+
+    def degrade(self, name: str) -> None:
+        """Record a degradation (once per message)."""
+        if name not in DEGRADATIONS:
+            raise ValueError(f"unknown degradation {name!r}")
+        if name not in self.degradations:
+            self.degradations.append(name)
+
+
+def degradations_of(deadline: Optional[Deadline]) -> tuple[str, ...]:
+    """Degradations taken under deadline, in order; () without a deadline."""
+    return tuple(deadline.degradations) if deadline is not None else ()
@@ -1,10 +1,22 @@
 """Draft response: policy-grounded with citations, fallback, confidence escalation."""
 
-from typing import Optional
+import os
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
 
 from app.classify import ClassificationResult
+from app.deadline import Deadline
+from app.draft_reuse import DraftReuseIndex, get_draft_index
+from app.guardrails import run_draft_checks
 from app.kb import get_snippet
-from app.llm import is_available, generate_draft
+from app.llm import (
+    circuit_open,
+    is_available,
+    generate_draft,
+    generate_drafts_batch,
+    stream_draft,
+)
 
 # Supported intents for draft generation (≥2 per spec)
 DRAFT_INTENTS = {
@@ -16,8 +28,17 @@ DRAFT_INTENTS = {
     "stolen_card",
 }
 
+# Global draft gate; calibrated models carry per-intent thresholds (ClassificationResult.threshold)
 CONFIDENCE_THRESHOLD = 0.7
 
+# Max messages (same kb_key) per batched LLM draft request
+DRAFT_BATCH_SIZE = 10
+
+
+def stream_enabled() -> bool:
+    """DRAFT_STREAM=1: single-message LLM drafts are streamed with incremental PII checks."""
+    return os.environ.get("DRAFT_STREAM", "").strip().lower() in ("1", "true", "yes")
+
 
 def _intent_eligible_for_draft(intent: str) -> bool:
     return intent.strip().lower() in DRAFT_INTENTS or intent.strip().lower().replace(
@@ -25,6 +46,28 @@ def _intent_eligible_for_draft(intent: str) -> bool:
     ) in {"card_lost_stolen", "suspected_fraud"}
 
 
+def draft_threshold(classification: ClassificationResult) -> float:
+    """Confidence needed for an LLM draft: the classifier's per-intent threshold, else global."""
+    if classification.threshold is not None:
+        return classification.threshold
+    return CONFIDENCE_THRESHOLD
+
+
+def draft_gate(
+    classification: ClassificationResult, threshold: Optional[float] = None
+) -> str:
+    """
+    Where confidence gating sends a message: "out_of_scope" (not a draft intent),
+    "escalate" (below threshold: template + human review) or "llm" (LLM draft allowed).
+    threshold overrides draft_threshold() (e.g. to compare against the global one).
+    """
+    if not _intent_eligible_for_draft(classification.intent):
+        return "out_of_scope"
+    if threshold is None:
+        threshold = draft_threshold(classification)
+    return "escalate" if (classification.confidence or 0.0) < threshold else "llm"
+
+
 def _template_draft(snippet: str, kb_key: str) -> str:
     """Template-based draft (no LLM)."""
     intro = "Thank you for contacting us. Based on our policy"
@@ -33,31 +76,41 @@ def _template_draft(snippet: str, kb_key: str) -> str:
     return f"{intro} [kb: {kb_key}]:\n\n{body}\n\n{closing}"
 
 
-def draft_from_policy(
+def _plan_draft(
     classification: ClassificationResult,
-    kb: dict[str, str],
-    use_llm: bool = False,
-    redacted_message: Optional[str] = None,
-) -> tuple[str, bool]:
+    kb: Mapping[str, str],
+    use_llm: bool,
+    redacted_message: Optional[str],
+) -> tuple[Optional[tuple[str, bool]], str, str, str]:
     """
-    Generate draft response for supported intents. Returns (response_text, used_fallback).
-    use_llm=False: use template only. use_llm=True: call GPT-4o-mini when OPENAI_API_KEY is set and redacted_message provided; else template.
+    Decide everything short of the LLM call. Returns (final, snippet, kb_key, template_text):
+    final is (response_text, used_fallback) when no LLM draft is wanted, else None. Provider
+    availability is checked by the caller after the reuse lookup (see _llm_unavailable).
     """
     intent = classification.intent
     confidence = classification.confidence or 0.0
-    used_fallback = False
 
     if not _intent_eligible_for_draft(intent):
         return (
-            "Thank you for your message. A colleague will respond shortly. [Escalated: intent not in draft scope]",
-            True,
+            (
+                "Thank you for your message. A colleague will respond shortly. [Escalated: intent not in draft scope]",
+                True,
+            ),
+            "",
+            "",
+            "",
         )
 
     snippet = get_snippet(kb, intent)
     if not snippet:
         return (
-            "We are sorry, we need to escalate your request. An agent will contact you shortly. [Escalated: no policy snippet]",
-            True,
+            (
+                "We are sorry, we need to escalate your request. An agent will contact you shortly. [Escalated: no policy snippet]",
+                True,
+            ),
+            "",
+            "",
+            "",
         )
     kb_key = (
         "suspected_fraud"
@@ -66,16 +119,222 @@ def draft_from_policy(
     )
     template_text = _template_draft(snippet, kb_key)
 
-    if confidence < CONFIDENCE_THRESHOLD:
-        return (template_text + " [No-LLM fallback]", True)
-    if not use_llm or not is_available() or not (redacted_message or "").strip():
+    if confidence < draft_threshold(classification):
+        return ((template_text + " [No-LLM fallback]", True), snippet, kb_key, template_text)
+    if not use_llm or not (redacted_message or "").strip():
+        return ((template_text + " [No-LLM fallback]", True), snippet, kb_key, template_text)
+    return (None, snippet, kb_key, template_text)
+
+
+def _llm_unavailable() -> bool:
+    """
+    No key, or the provider failing recently: skip the call (no timeout wait) until a
+    half-open probe succeeds. Checked after the reuse lookup, so approved drafts still serve.
+    """
+    return not is_available() or circuit_open()
+
+
+def _deadline_escalation(classification: ClassificationResult, deadline: Optional[Deadline]):
+    """The routing-only reply when deadline leaves no budget to draft at all, else None."""
+    if (
+        deadline is not None
+        and _intent_eligible_for_draft(classification.intent)
+        and not deadline.allows_draft()
+    ):
+        deadline.degrade("draft_skipped")
+        return (
+            "Thank you for your message. A colleague will respond shortly. [Escalated: deadline]",
+            True,
+        )
+    return None
+
+
+def draft_from_policy(
+    classification: ClassificationResult,
+    kb: Mapping[str, str],
+    use_llm: bool = False,
+    redacted_message: Optional[str] = None,
+    reuse: Optional[DraftReuseIndex] = None,
+    on_partial: Optional[Callable[[str], None]] = None,
+    deadline: Optional[Deadline] = None,
+) -> tuple[str, bool]:
+    """
+    Generate draft response for supported intents. Returns (response_text, used_fallback).
+    use_llm=False: use template only. use_llm=True: call GPT-4o-mini when OPENAI_API_KEY is set and redacted_message provided; else template.
+    reuse (default: get_draft_index(), on with DRAFT_REUSE=1): a near-duplicate prior message
+    with the same kb_key reuses its approved draft instead of an LLM call.
+    on_partial or DRAFT_STREAM=1: stream the LLM draft (stream_draft), aborting on raw PII;
+    on_partial receives the growing text.
+    deadline: with too little budget left for an LLM call, use the template (llm_skipped);
+    for any draft at all, escalate with only the routing decision (draft_skipped). An LLM
+    call that is made gets at most the remaining budget.
+    """
+    escalated = _deadline_escalation(classification, deadline)
+    if escalated is not None:
+        return escalated
+    final, snippet, kb_key, template_text = _plan_draft(
+        classification, kb, use_llm, redacted_message
+    )
+    if final is not None:
+        return final
+    index = reuse if reuse is not None else get_draft_index()
+    if index is not None:
+        prior = index.lookup(kb_key, redacted_message)
+        if prior is not None:
+            return (prior, False)
+    if _llm_unavailable():
         return (template_text + " [No-LLM fallback]", True)
+    timeout_s = None
+    if deadline is not None:
+        if not deadline.allows_llm():
+            deadline.degrade("llm_skipped")
+            return (template_text + " [No-LLM fallback]", True)
+        timeout_s = deadline.remaining()
     # Call LLM (e.g. GPT-4o-mini)
-    llm_text = generate_draft(
-        customer_message=redacted_message.strip(),
-        policy_snippet=snippet,
-        kb_key=kb_key,
-    )
+    if on_partial is not None or stream_enabled():
+        llm_text = stream_draft(
+            customer_message=redacted_message.strip(),
+            policy_snippet=snippet,
+            kb_key=kb_key,
+            on_partial=on_partial,
+            timeout_s=timeout_s,
+        )
+    else:
+        llm_text = generate_draft(
+            customer_message=redacted_message.strip(),
+            policy_snippet=snippet,
+            kb_key=kb_key,
+            timeout_s=timeout_s,
+        )
     if llm_text:
+        if index is not None and run_draft_checks(llm_text)[0]:
+            index.add(kb_key, redacted_message, llm_text)
         return (llm_text, False)
     return (template_text + " [No-LLM fallback]", True)
+
+
+@dataclass
+class DraftBatchStats:
+    """Counters for batched drafting: requests, per-item retries/fallbacks and token usage."""
+
+    drafts: int = 0
+    llm_drafts: int = 0
+    reused: int = 0
+    batch_requests: int = 0
+    single_retries: int = 0
+    template_fallbacks: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def draft_batch_from_policy(
+    items: list[tuple[str, ClassificationResult, Optional[str]]],
+    kb: Mapping[str, str],
+    use_llm: bool = False,
+    batch_size: int = DRAFT_BATCH_SIZE,
+    stats: Optional[DraftBatchStats] = None,
+    reuse: Optional[DraftReuseIndex] = None,
+    deadlines: Optional[Mapping[str, Optional[Deadline]]] = None,
+) -> dict[str, tuple[str, bool]]:
+    """
+    Batch drafting: items are (message_id, classification, redacted_message); returns
+    {message_id: (response_text, used_fallback)} with the same rules as draft_from_policy.
+    LLM-eligible messages sharing a kb_key go into one structured-output request (up to
+    batch_size per request). Each returned draft must pass run_draft_checks; a missing or
+    failing draft in a successful reply is retried as a single-message call, then falls back
+    to the template. A failed request templates its whole chunk without per-item retries.
+    Near-duplicates of approved drafts in reuse (see draft_from_policy) skip the LLM.
+    deadlines ({message_id: Deadline}) degrade each message as in draft_from_policy, checked
+    when its request is about to go out; a request is capped by the least remaining budget
+    of the messages it carries.
+    """
+    deadlines = deadlines or {}
+    stats = stats if stats is not None else DraftBatchStats()
+    index = reuse if reuse is not None else get_draft_index()
+    usage: dict[str, int] = {}
+    out: dict[str, tuple[str, bool]] = {}
+    groups: dict[str, list[tuple[str, str]]] = {}
+    plans: dict[str, tuple[str, str]] = {}  # kb_key -> (snippet, template_text)
+    for msg_id, classification, redacted in items:
+        escalated = _deadline_escalation(classification, deadlines.get(msg_id))
+        if escalated is not None:
+            out[msg_id] = escalated
+            continue
+        final, snippet, kb_key, template_text = _plan_draft(
+            classification, kb, use_llm, redacted
+        )
+        if final is not None:
+            out[msg_id] = final
+            continue
+        prior = index.lookup(kb_key, redacted) if index is not None else None
+        if prior is not None:
+            out[msg_id] = (prior, False)
+            stats.reused += 1
+            continue
+        if _llm_unavailable():
+            out[msg_id] = (template_text + " [No-LLM fallback]", True)
+            continue
+        groups.setdefault(kb_key, []).append((msg_id, redacted.strip()))
+        plans[kb_key] = (snippet, template_text)
+
+    def out_of_budget(msg_id: str, template_text: str) -> bool:
+        """Template the message (llm_skipped) if its deadline no longer allows an LLM call."""
+        deadline = deadlines.get(msg_id)
+        if deadline is None or deadline.allows_llm():
+            return False
+        deadline.degrade("llm_skipped")
+        out[msg_id] = (template_text + " [No-LLM fallback]", True)
+        return True
+
+    def budget_of(chunk: list[tuple[str, str]]) -> Optional[float]:
+        left = [deadlines[m].remaining() for m, _ in chunk if deadlines.get(m) is not None]
+        return min(left) if left else None
+
+    for kb_key, group in groups.items():
+        snippet, template_text = plans[kb_key]
+        for start in range(0, len(group), max(1, batch_size)):
+            chunk = [
+                (msg_id, redacted)
+                for msg_id, redacted in group[start : start + max(1, batch_size)]
+                if not out_of_budget(msg_id, template_text)
+            ]
+            if not chunk:
+                continue
+            drafts = generate_drafts_batch(
+                chunk, snippet, kb_key, usage=usage, timeout_s=budget_of(chunk)
+            )
+            stats.batch_requests += 1
+            # A batch call that failed outright is not retried item by item into the provider
+            retry_singly = drafts is not None
+            for msg_id, redacted in chunk:
+                text = (drafts or {}).get(msg_id)
+                needs_retry = not text or not run_draft_checks(text)[0]
+                if needs_retry and retry_singly and not _llm_unavailable():
+                    if out_of_budget(msg_id, template_text):
+                        continue
+                    stats.single_retries += 1
+                    text = generate_draft(
+                        customer_message=redacted,
+                        policy_snippet=snippet,
+                        kb_key=kb_key,
+                        usage=usage,
+                        timeout_s=budget_of([(msg_id, redacted)]),
+                    )
+                if text and run_draft_checks(text)[0]:
+                    out[msg_id] = (text, False)
+                    stats.llm_drafts += 1
+                    if index is not None:
+                        index.add(kb_key, redacted, text)
+                else:
+                    out[msg_id] = (template_text + " [No-LLM fallback]", True)
+                    stats.template_fallbacks += 1
+
+    stats.drafts += len(items)
+    stats.prompt_tokens += usage.get("prompt_tokens", 0)
+    stats.cached_tokens += usage.get("cached_tokens", 0)
+    stats.completion_tokens += usage.get("completion_tokens", 0)
+    return out
@@ -0,0 +1,243 @@
+"""
+Near-duplicate draft reuse: a MinHash LSH index over approved (redacted message, draft) pairs.
+
+Messages are shingled (word n-grams or character n-grams, digits folded to 0), MinHashed and
+banded per kb_key. A lookup only compares against prior messages sharing at least one LSH band
+bucket, so its cost depends on bucket sizes, not on the index size. A candidate is reused when
+the Jaccard similarity of its shingle set with the new message reaches the threshold.
+Only drafts that passed run_draft_checks are indexed. Each kb_key keeps at most max_per_key
+entries; the least recently used (added or reused) is evicted, with its bucket entries.
+
+Enable with DRAFT_REUSE=1; DRAFT_REUSE_THRESHOLD (default 0.6), DRAFT_REUSE_SHINGLE
+(word|char, default word), DRAFT_REUSE_NGRAM (default 2 for word, 5 for char) and
+DRAFT_REUSE_MAX_PER_KEY (default 1000).
+"""
+
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import numpy as np
+
+# Signature length (hash functions); more = tighter similarity estimate, slower inserts
+NUM_PERM = 128
+# Default Jaccard similarity at which a prior draft is reused
+DEFAULT_REUSE_THRESHOLD = 0.6
+# Entries kept per kb_key before the least recently used is evicted (bounds a long-lived process)
+DEFAULT_MAX_PER_KEY = 1000
+DEFAULT_NGRAM = {"word": 2, "char": 5}
+_MERSENNE = (1 << 61) - 1
+_TOKEN = re.compile(r"\w+|\[[A-Z_]+\]")
+
+
+def shingles(text: str, kind: str = "word", n: Optional[int] = None) -> frozenset[str]:
+    """Word or character n-grams of lowercased text; digits are folded so amounts/dates match."""
+    n = n or DEFAULT_NGRAM[kind]
+    norm = re.sub(r"\d", "0", text.lower().replace("’", "'"))
+    if kind == "char":
+        norm = " ".join(norm.split())
+        return frozenset(norm[i : i + n] for i in range(max(1, len(norm) - n + 1)))
+    words = _TOKEN.findall(norm)
+    if len(words) < n:
+        return frozenset([" ".join(words)])
+    return frozenset(" ".join(words[i : i + n]) for i in range(len(words) - n + 1))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> tuple[int, int]:
+    """(bands, rows) with bands * rows <= num_perm whose S-curve midpoint (1/b)^(1/r) is nearest threshold."""
+    best = (1, num_perm)
+    best_err = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        err = abs((1 / bands) ** (1 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class MinHasher:
+    """Fixed random permutations (a*x + b mod p) over crc32 shingle hashes; stable across processes."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: frozenset[str]) -> np.ndarray:
+        x = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64
+        )
+        # a, x < 2**32 so a * x + b fits in uint64 before the modulus
+        return ((np.outer(x, self.a) + self.b) % _MERSENNE).min(axis=0)
+
+
+@dataclass
+class DraftReuseStats:
+    """Lookups, reuse hits and lookup cost (candidates compared, time) of the reuse index."""
+
+    lookups: int = 0
+    hits: int = 0
+    indexed: int = 0
+    evicted: int = 0
+    candidates: int = 0
+    lookup_s: float = 0.0
+
+    def as_dict(self) -> dict:
+        d = asdict(self)
+        n = self.lookups or 1
+        d["lookup_s"] = round(self.lookup_s, 4)
+        d["hit_rate"] = round(self.hits / n, 4)
+        d["mean_candidates"] = round(self.candidates / n, 2)
+        d["mean_lookup_ms"] = round(1000 * self.lookup_s / n, 3)
+        return d
+
+
+class DraftReuseIndex:
+    """Per-kb_key LSH buckets of approved drafts, LRU-capped per kb_key; thread-safe."""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_REUSE_THRESHOLD,
+        shingle: str = "word",
+        ngram: Optional[int] = None,
+        num_perm: int = NUM_PERM,
+        max_per_key: int = DEFAULT_MAX_PER_KEY,
+    ):
+        if shingle not in DEFAULT_NGRAM:
+            raise ValueError(f"shingle must be one of {sorted(DEFAULT_NGRAM)}")
+        self.threshold = threshold
+        self.shingle = shingle
+        self.ngram = ngram or DEFAULT_NGRAM[shingle]
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.max_per_key = max(1, max_per_key)
+        self._hasher = MinHasher(num_perm)
+        # kb_key -> band -> bucket key -> entry ids
+        self._buckets: dict[str, list[dict[bytes, list[int]]]] = {}
+        # entry id -> (shingles, band keys, draft); per kb_key, entry ids least recent first
+        self._entries: dict[int, tuple[frozenset[str], list[bytes], str]] = {}
+        self._recency: dict[str, "OrderedDict[int, None]"] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.stats = DraftReuseStats()
+
+    @classmethod
+    def from_env(cls) -> "DraftReuseIndex":
+        shingle = os.environ.get("DRAFT_REUSE_SHINGLE", "word").strip().lower() or "word"
+        ngram = os.environ.get("DRAFT_REUSE_NGRAM", "").strip()
+        max_per_key = os.environ.get("DRAFT_REUSE_MAX_PER_KEY", "").strip()
+        return cls(
+            threshold=float(
+                os.environ.get("DRAFT_REUSE_THRESHOLD", DEFAULT_REUSE_THRESHOLD)
+            ),
+            shingle=shingle,
+            ngram=int(ngram) if ngram else None,
+            max_per_key=int(max_per_key) if max_per_key else DEFAULT_MAX_PER_KEY,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, sig: np.ndarray) -> list[bytes]:
+        r = self.rows
+        return [sig[i * r : (i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def lookup(self, kb_key: str, redacted_message: str) -> Optional[str]:
+        """Draft of the most similar prior message for kb_key at or above threshold, else None."""
+        t0 = time.perf_counter()
+        sh = shingles(redacted_message, self.shingle, self.ngram)
+        keys = self._band_keys(self._hasher.signature(sh))
+        best, best_sim, best_id = None, self.threshold, None
+        with self._lock:
+            bands = self._buckets.get(kb_key)
+            candidates: set[int] = set()
+            if bands is not None:
+                for band, key in zip(bands, keys):
+                    candidates.update(band.get(key, ()))
+            for i in candidates:
+                prior, _, draft = self._entries[i]
+                sim = jaccard(sh, prior)
+                if sim >= best_sim:
+                    best, best_sim, best_id = draft, sim, i
+            if best_id is not None:
+                self._recency[kb_key].move_to_end(best_id)
+            self.stats.lookups += 1
+            self.stats.candidates += len(candidates)
+            self.stats.hits += best is not None
+            self.stats.lookup_s += time.perf_counter() - t0
+        return best
+
+    def add(self, kb_key: str, redacted_message: str, draft: str) -> None:
+        """Index an approved (guardrail-passing) draft for later near-duplicates."""
+        sh = shingles(redacted_message, self.shingle, self.ngram)
+        keys = self._band_keys(self._hasher.signature(sh))
+        with self._lock:
+            idx = self._next_id
+            self._next_id += 1
+            self._entries[idx] = (sh, keys, draft)
+            bands = self._buckets.setdefault(kb_key, [{} for _ in range(self.bands)])
+            for band, key in zip(bands, keys):
+                band.setdefault(key, []).append(idx)
+            recency = self._recency.setdefault(kb_key, OrderedDict())
+            recency[idx] = None
+            self.stats.indexed += 1
+            while len(recency) > self.max_per_key:
+                self._evict(kb_key, recency.popitem(last=False)[0])
+
+    def _evict(self, kb_key: str, idx: int) -> None:
+        """Drop one entry and its bucket references (caller holds the lock)."""
+        _, keys, _ = self._entries.pop(idx)
+        for band, key in zip(self._buckets[kb_key], keys):
+            ids = band[key]
+            ids.remove(idx)
+            if not ids:
+                del band[key]
+        self.stats.evicted += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            d = self.stats.as_dict()
+        d.update(
+            threshold=self.threshold,
+            bands=self.bands,
+            rows=self.rows,
+            size=len(self),
+            max_per_key=self.max_per_key,
+        )
+        return d
+
+
+_index: Optional[DraftReuseIndex] = None
+_index_lock = threading.Lock()
+
+
+def reuse_enabled() -> bool:
+    return os.environ.get("DRAFT_REUSE", "").strip().lower() in ("1", "true", "yes")
+
+
+def get_draft_index() -> Optional[DraftReuseIndex]:
+    """Process-wide reuse index, or None unless DRAFT_REUSE=1."""
+    global _index
+    if not reuse_enabled():
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = DraftReuseIndex.from_env()
+        return _index
+
+
+def reset_draft_index() -> None:
+    """Drop the shared index (e.g. after changing DRAFT_REUSE_* settings, or between tests)."""
+    global _index
+    with _index_lock:
+        _index = None
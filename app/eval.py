@@ -1,18 +1,39 @@
 """Evaluation: classification metrics, redaction tests, draft checks."""
 
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
-from app.classify import classify, classify_stub_from_labels
-from app.redact import load_patterns, redact, redact_with_config
+from app.classify import ClassificationResult, classify, classify_stub_from_labels
+from app.eval_cache import DEFAULT_CACHE_PATH, PredictionCache, context_key, row_hash
+from app.redact import load_patterns, redact
 from app.kb import load_kb
-from app.draft import draft_from_policy
+from app.draft import CONFIDENCE_THRESHOLD, draft_from_policy, draft_gate
 from app.guardrails import run_draft_checks
 from app.config import DEFAULT_DATA_DIR
-from app.mtl import DEFAULT_MODEL_DIR, MODEL_FILE, SPLIT_RANDOM_STATE
+from app.mtl import SPLIT_RANDOM_STATE, load_or_train, resolve_model_path
+
+
+def _classifier(
+    backend: str, messages_path: Path, model_path: Optional[Path]
+) -> Callable[[str, str], ClassificationResult]:
+    """(redacted text, message_id) → result; the MTL model is loaded once, not per row."""
+    if backend == "mtl":
+        try:
+            clf = load_or_train(messages_path, model_path=model_path)
+            return lambda text, mid: clf.predict(text)
+        except Exception:
+            pass  # classify() falls back to the stub per row
+    return lambda text, mid: classify(
+        text, messages_path, message_id=mid, backend=backend, model_path=model_path
+    )
+
+
+def _row_keys(df: pd.DataFrame, columns: tuple[str, ...]) -> list[str]:
+    cols = [df[c].astype(str).tolist() if c in df.columns else [""] * len(df) for c in columns]
+    return [row_hash(*fields) for fields in zip(*cols)]
 
 
 def classification_metrics(
@@ -20,9 +41,11 @@ def classification_metrics(
     data_dir: Path,
     backend: Optional[str] = None,
     df: Optional[pd.DataFrame] = None,
+    cache: Optional[PredictionCache] = None,
 ) -> dict:
     """Compute accuracy for suggested_queue. backend: 'stub' (labels), 'mtl' (model), or None=auto.
     If df is provided, evaluate on that DataFrame instead of loading from messages_path.
+    With cache, only rows whose content (or the model, patterns or KB) changed are recomputed.
     """
     if df is None:
         if not messages_path.exists():
@@ -35,30 +58,49 @@ def classification_metrics(
     ):
         return {"error": "missing columns", "precision": 0, "recall": 0}
     if backend is None:
-        model_path = (
-            Path(__file__).resolve().parent.parent / DEFAULT_MODEL_DIR / MODEL_FILE
-        )
+        model_path = resolve_model_path()
         backend = "mtl" if model_path.exists() else "stub"
-    model_path = (
-        Path(__file__).resolve().parent.parent / DEFAULT_MODEL_DIR / MODEL_FILE
-        if backend == "mtl"
-        else None
-    )
+    model_path = resolve_model_path() if backend == "mtl" else None
+    pii_path = data_dir / "pii_patterns.yaml"
+    keys = _row_keys(df, ("message_id", "text", "label", "suggested_queue"))
+    context = ""
+    records: dict[str, dict] = {}
+    if cache is not None:
+        context = context_key("classification", backend, model_path, pii_path, data_dir / "kb")
+        records = cache.get_many(context, keys)
+    cached = sum(k in records for k in keys)
+    fresh: dict[str, dict] = {}
+    if cached < len(keys):
+        patterns = load_patterns(pii_path)
+        predict = _classifier(backend, messages_path, model_path)
+        for key, mid, text in zip(keys, df["message_id"], df.get("text", [""] * len(df))):
+            if key in records:
+                continue
+            res = predict(redact(str(text), patterns), str(mid))
+            records[key] = fresh[key] = {
+                "intent": res.intent,
+                "suggested_queue": res.suggested_queue,
+                "confidence": res.confidence,
+                "threshold": res.threshold,
+            }
+        if cache is not None:
+            cache.put_many(context, fresh)
+
     correct = 0
     total = len(df)
-    for _, row in df.iterrows():
-        mid = row.get("message_id")
-        text = str(row.get("text", ""))
-        redacted = redact_with_config(text, data_dir / "pii_patterns.yaml")
-        res = classify(
-            redacted,
-            messages_path,
-            message_id=str(mid),
-            backend=backend,
-            model_path=model_path,
-        )
-        if res.suggested_queue == str(row["suggested_queue"]).strip():
+    # Draft gating outcomes: per-intent (calibrated) thresholds vs the global threshold
+    gates = {"llm": 0, "escalate": 0}
+    global_gates = {"llm": 0, "escalate": 0}
+    for key, queue in zip(keys, df["suggested_queue"]):
+        res = ClassificationResult(**records[key])
+        if res.suggested_queue == str(queue).strip():
             correct += 1
+        gate = draft_gate(res)
+        if gate in gates:
+            gates[gate] += 1
+        gate = draft_gate(res, threshold=CONFIDENCE_THRESHOLD)
+        if gate in global_gates:
+            global_gates[gate] += 1
     acc = correct / total if total else 0
     return {
         "backend": backend,
@@ -67,41 +109,71 @@ def classification_metrics(
         "total": total,
         "precision": acc,
         "recall": acc,
+        "expected_llm_call_rate": gates["llm"] / total if total else 0,
+        "escalation_rate": gates["escalate"] / total if total else 0,
+        "global_threshold_llm_call_rate": global_gates["llm"] / total if total else 0,
+        "global_threshold_escalation_rate": (
+            global_gates["escalate"] / total if total else 0
+        ),
+        "cached_rows": cached,
+        "recomputed_rows": len(fresh),
     }
 
 
-def eval_draft_checks(data_dir: Path, limit: int = 20) -> dict:
-    """Run draft checks on a sample of messages; return count passed/failed."""
+def eval_draft_checks(
+    data_dir: Path, limit: int = 20, cache: Optional[PredictionCache] = None
+) -> dict:
+    """Run draft checks on a sample of messages; return count passed/failed (cached per row)."""
     messages_path = data_dir / "messages.csv"
     kb_dir = data_dir / "kb"
     if not messages_path.exists():
         return {"error": "messages.csv not found", "passed": 0, "failed": 0}
     df = pd.read_csv(messages_path).head(limit)
-    kb = load_kb(kb_dir)
-    patterns = load_patterns(data_dir / "pii_patterns.yaml")
-    passed = 0
-    failed = 0
-    for _, row in df.iterrows():
-        text = str(row.get("text", ""))
-        redacted = redact(text, patterns)
-        res = classify_stub_from_labels(
-            redacted, messages_path, str(row.get("message_id"))
-        )
-        draft, _ = draft_from_policy(res, kb, use_llm=False)
-        ok, reasons = run_draft_checks(draft)
-        if ok:
-            passed += 1
-        else:
-            failed += 1
-    return {"passed": passed, "failed": failed, "total": passed + failed}
+    pii_path = data_dir / "pii_patterns.yaml"
+    keys = _row_keys(df, ("message_id", "text", "label", "suggested_queue"))
+    context = ""
+    records: dict[str, dict] = {}
+    if cache is not None:
+        context = context_key("draft_checks", "stub", None, pii_path, kb_dir)
+        records = cache.get_many(context, keys)
+    cached = sum(k in records for k in keys)
+    fresh: dict[str, dict] = {}
+    if cached < len(keys):
+        kb = load_kb(kb_dir)
+        patterns = load_patterns(pii_path)
+        for key, (_, row) in zip(keys, df.iterrows()):
+            if key in records:
+                continue
+            text = str(row.get("text", ""))
+            redacted = redact(text, patterns)
+            res = classify_stub_from_labels(
+                redacted, messages_path, str(row.get("message_id"))
+            )
+            draft, _ = draft_from_policy(res, kb, use_llm=False)
+            ok, reasons = run_draft_checks(draft)
+            records[key] = fresh[key] = {"checks_ok": ok, "failures": reasons}
+        if cache is not None:
+            cache.put_many(context, fresh)
+    passed = sum(records[k]["checks_ok"] for k in keys)
+    failed = len(keys) - passed
+    return {
+        "passed": passed,
+        "failed": failed,
+        "total": passed + failed,
+        "cached_rows": cached,
+        "recomputed_rows": len(fresh),
+    }
 
 
 def main(
     data_dir: Optional[Path] = None,
     test_ratio: float = 0.0,
+    cache_path: Optional[Path] = DEFAULT_CACHE_PATH,
 ) -> None:
+    """cache_path=None recomputes every row (no prediction cache)."""
     data_dir = data_dir or DEFAULT_DATA_DIR
     messages_path = data_dir / "messages.csv"
+    cache = PredictionCache(cache_path) if cache_path is not None else None
     print("Evaluation")
     print("=========")
 
@@ -140,6 +212,7 @@ def main(
                     data_dir,
                     backend="mtl",
                     df=test_df,
+                    cache=cache,
                 )
                 metrics["eval_set"] = "holdout"
                 metrics["train_size"] = len(train_df)
@@ -149,11 +222,13 @@ def main(
                     metrics,
                 )
     else:
-        metrics = classification_metrics(messages_path, data_dir)
+        metrics = classification_metrics(messages_path, data_dir, cache=cache)
         print("Classification:", metrics)
 
-    draft_res = eval_draft_checks(data_dir, limit=30)
+    draft_res = eval_draft_checks(data_dir, limit=30, cache=cache)
     print("Draft checks (sample):", draft_res)
+    if cache is not None:
+        cache.close()
 
 
 if __name__ == "__main__":
@@ -168,5 +243,16 @@ if __name__ == "__main__":
         metavar="R",
         help="Evaluate on R holdout (0 < R < 1). Use 0.2 with train-ratio 0.8 (default: 0)",
     )
+    p.add_argument(
+        "--cache-path",
+        type=Path,
+        default=DEFAULT_CACHE_PATH,
+        help=f"Per-row prediction cache (default: {DEFAULT_CACHE_PATH})",
+    )
+    p.add_argument("--no-cache", action="store_true", help="Recompute every row")
     args = p.parse_args()
-    main(args.data_dir, test_ratio=args.test_ratio)
+    main(
+        args.data_dir,
+        test_ratio=args.test_ratio,
+        cache_path=None if args.no_cache else args.cache_path,
+    )
@@ -0,0 +1,113 @@
+"""
+Prediction cache for incremental evaluation.
+
+Per-row eval results are stored in SQLite under a context key (model artifact hash,
+pattern-file hash, KB hash, backend and eval kind) and a per-row content hash. A re-run only
+recomputes rows that are new or changed, or every row when the model, patterns or KB change.
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.mtl import FEATURE_CACHE_DIR
+
+DEFAULT_CACHE_PATH = FEATURE_CACHE_DIR / "eval_predictions.sqlite"
+# Bump when the cached record layout or the eval computation changes
+EVAL_CACHE_VERSION = 1
+_CHUNK = 500  # keys per SQL IN (...) lookup
+
+
+def file_hash(path: Optional[Path]) -> str:
+    """sha256 of a file's bytes ("missing" when absent, e.g. no trained model)."""
+    if path is None or not Path(path).is_file():
+        return "missing"
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def dir_hash(directory: Path, suffix: str = ".md") -> str:
+    """sha256 over names and contents of the directory's *suffix files (e.g. the KB)."""
+    h = hashlib.sha256()
+    directory = Path(directory)
+    if directory.is_dir():
+        for f in sorted(directory.iterdir()):
+            if f.suffix.lower() == suffix:
+                h.update(f.name.encode("utf-8") + b"\0")
+                h.update(f.read_bytes() + b"\0")
+    return h.hexdigest()
+
+
+def row_hash(*fields) -> str:
+    """Content hash of one labelled row (e.g. message_id, text, label, suggested_queue)."""
+    h = hashlib.sha256()
+    for field in fields:
+        h.update(str(field).encode("utf-8") + b"\0")
+    return h.hexdigest()[:32]
+
+
+def context_key(
+    kind: str,
+    backend: str,
+    model_path: Optional[Path],
+    patterns_path: Path,
+    kb_dir: Path,
+) -> str:
+    """Everything besides the row that an eval result depends on."""
+    parts = {
+        "version": EVAL_CACHE_VERSION,
+        "kind": kind,
+        "backend": backend,
+        "model": file_hash(model_path) if backend != "stub" else "stub",
+        "patterns": file_hash(patterns_path),
+        "kb": dir_hash(kb_dir),
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+class PredictionCache:
+    """SQLite-backed {(context, row_hash): record dict}."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "context TEXT NOT NULL, row TEXT NOT NULL, record TEXT NOT NULL, "
+            "PRIMARY KEY (context, row))"
+        )
+
+    def get_many(self, context: str, rows: Iterable[str]) -> dict[str, dict]:
+        rows = list(dict.fromkeys(rows))
+        out: dict[str, dict] = {}
+        for start in range(0, len(rows), _CHUNK):
+            chunk = rows[start : start + _CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for row, record in self._conn.execute(
+                f"SELECT row, record FROM predictions WHERE context = ? AND row IN ({marks})",
+                [context, *chunk],
+            ):
+                out[row] = json.loads(record)
+        return out
+
+    def put_many(self, context: str, records: dict[str, dict]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO predictions (context, row, record) VALUES (?, ?, ?)",
+                [(context, row, json.dumps(rec)) for row, rec in records.items()],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "PredictionCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,6 +1,9 @@
 """Guardrails: at least one automated check on draft output (citation, PII mask, or safety)."""
 
 import re
+from typing import Optional
+
+from app.deadline import Deadline
 
 
 def check_draft_citation_present(draft: str) -> bool:
@@ -18,13 +21,46 @@ def check_draft_no_raw_pii(draft: str) -> bool:
     return True
 
 
-def run_draft_checks(draft: str) -> tuple[bool, list[str]]:
+def _digit_space_tail(text: str) -> int:
+    """Start of the trailing run of digits and whitespace: the only old text a raw-PII match
+    (digits with unbounded whitespace between groups) can extend into."""
+    i = len(text)
+    while i > 0 and (text[i - 1].isdigit() or text[i - 1].isspace()):
+        i -= 1
+    return i
+
+
+class IncrementalPIICheck:
+    """
+    check_draft_no_raw_pii on a growing (streamed) draft: each feed() only rescans the new
+    text plus the trailing digit/whitespace run a match could straddle, so ordinary prose
+    costs O(length) overall.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.ok = True
+
+    def feed(self, chunk: str) -> bool:
+        """Append chunk; False once raw PII has appeared (stays False)."""
+        if not self.ok or not chunk:
+            return self.ok
+        start = _digit_space_tail(self.text)
+        self.text += chunk
+        self.ok = check_draft_no_raw_pii(self.text[start:])
+        return self.ok
+
+
+def run_draft_checks(draft: str, deadline: Optional[Deadline] = None) -> tuple[bool, list[str]]:
     """
     Run at least one automated check. Returns (all_passed, list of failure reasons).
+    Checks are never skipped for a deadline; one already past is recorded as deadline_missed.
     """
     failures = []
     if not check_draft_citation_present(draft):
         failures.append("citation_missing")
     if not check_draft_no_raw_pii(draft):
         failures.append("possible_pii_in_draft")
+    if deadline is not None and deadline.expired:
+        deadline.degrade("deadline_missed")
     return (len(failures) == 0, failures)
@@ -1,6 +1,23 @@
-"""Knowledge base: in-memory load of kb/*.md keyed by intent/filename."""
+"""
+Knowledge base: kb/*.md keyed by intent/filename.
 
+load_kb reads every file into a dict. open_kb returns a KBStore with the same read-only
+mapping interface: only paths and metadata are indexed up front; documents are read on
+first access into an LRU capped by bytes (KB_CACHE_BYTES), optionally via mmap (KB_MMAP=1).
+"""
+
+import mmap
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Iterator, Optional, Union
+
+# Resident document bytes per KBStore unless KB_CACHE_BYTES is set
+DEFAULT_KB_CACHE_BYTES = 64 * 1024 * 1024
 
 
 def load_kb(kb_dir: Path) -> dict[str, str]:
@@ -14,7 +31,157 @@ def load_kb(kb_dir: Path) -> dict[str, str]:
     return out
 
 
-def get_snippet(kb: dict[str, str], intent: str) -> str:
+@dataclass
+class KBDoc:
+    """Index entry: where a document lives and what it looked like when indexed."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+
+
+@dataclass
+class KBCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    uncached: int = 0  # documents larger than the whole cap (read, not kept)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class KBStore(Mapping):
+    """
+    Lazy, memory-bounded KB: stem -> policy text, loaded on first access.
+    Documents live in an LRU of decoded text (or, with use_mmap, read-only memory maps that are
+    decoded per access and count only their mapped size) capped at max_bytes. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        kb_dir: Path,
+        max_bytes: int = DEFAULT_KB_CACHE_BYTES,
+        use_mmap: bool = False,
+    ):
+        self.kb_dir = Path(kb_dir)
+        self.max_bytes = max_bytes
+        self.use_mmap = use_mmap
+        self.index: dict[str, KBDoc] = {}
+        self._cache: "OrderedDict[str, tuple[Union[str, mmap.mmap], int]]" = OrderedDict()
+        self._resident = 0
+        self._lock = threading.Lock()
+        self.stats = KBCacheStats()
+        self.reindex()
+
+    def reindex(self) -> None:
+        """Rescan kb_dir (paths, sizes, mtimes only) and drop cached documents."""
+        index: dict[str, KBDoc] = {}
+        if self.kb_dir.is_dir():
+            with os.scandir(self.kb_dir) as entries:
+                for e in entries:
+                    if e.is_file() and Path(e.name).suffix.lower() == ".md":
+                        st = e.stat()
+                        index[Path(e.name).stem] = KBDoc(Path(e.path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            self.index = index
+            self._clear()
+
+    def _clear(self) -> None:
+        for value, _ in self._cache.values():
+            if isinstance(value, mmap.mmap):
+                value.close()
+        self._cache.clear()
+        self._resident = 0
+
+    def _read(self, doc: KBDoc) -> tuple[Union[str, mmap.mmap], int]:
+        if self.use_mmap and doc.size > 0:
+            with open(doc.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return mapped, doc.size
+        text = doc.path.read_text(encoding="utf-8").strip()
+        return text, sys.getsizeof(text)
+
+    @staticmethod
+    def _text(value: Union[str, mmap.mmap]) -> str:
+        if isinstance(value, mmap.mmap):
+            return value[:].decode("utf-8").strip()
+        return value
+
+    def __getitem__(self, key: str) -> str:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats.hits += 1
+                return self._text(cached[0])
+            doc = self.index.get(key)
+            if doc is None:
+                raise KeyError(key)
+            self.stats.misses += 1
+            value, nbytes = self._read(doc)
+            if nbytes > self.max_bytes:
+                self.stats.uncached += 1
+                text = self._text(value)
+                if isinstance(value, mmap.mmap):
+                    value.close()
+                return text
+            self._cache[key] = (value, nbytes)
+            self._resident += nbytes
+            while self._resident > self.max_bytes:
+                old, (old_value, old_bytes) = self._cache.popitem(last=False)
+                if isinstance(old_value, mmap.mmap):
+                    old_value.close()
+                self._resident -= old_bytes
+                self.stats.evictions += 1
+            return self._text(value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.index))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self.stats.hits + self.stats.misses
+            return {
+                **self.stats.as_dict(),
+                "hit_rate": round(self.stats.hits / lookups, 4) if lookups else 0.0,
+                "documents": len(self.index),
+                "cached": len(self._cache),
+                "resident_bytes": self._resident,
+                "max_bytes": self.max_bytes,
+                "mmap": self.use_mmap,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._clear()
+
+
+def open_kb(
+    kb_dir: Path, max_bytes: Optional[int] = None, use_mmap: Optional[bool] = None
+) -> KBStore:
+    """Lazy KBStore over kb_dir; unset options come from KB_CACHE_BYTES and KB_MMAP=1."""
+    if max_bytes is None:
+        try:
+            max_bytes = int(os.environ.get("KB_CACHE_BYTES", "") or DEFAULT_KB_CACHE_BYTES)
+        except ValueError:
+            max_bytes = DEFAULT_KB_CACHE_BYTES
+    if use_mmap is None:
+        use_mmap = os.environ.get("KB_MMAP", "").strip().lower() in ("1", "true", "yes")
+    return KBStore(kb_dir, max_bytes=max_bytes, use_mmap=use_mmap)
+
+
+def get_snippet(kb: Mapping[str, str], intent: str) -> str:
     """Return policy snippet(s) for the given intent. Intent mapped to kb key (e.g. fraud -> suspected_fraud)."""
     # Normalize intent to kb filename stem
     mapping = {
@@ -1,16 +1,27 @@
 """
-LLM integration for draft generation (e.g. OpenAI GPT-4o-mini).
+LLM integration for draft generation and batched classification (e.g. OpenAI GPT-4o-mini).
 
 Loads OPENAI_API_KEY from environment or from .env in the project root.
 On missing key or API error, callers should fall back to template.
 """
 
+import json
 import os
+import random
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
 
 from dotenv import load_dotenv
 
+from app.guardrails import (
+    IncrementalPIICheck,
+    check_draft_citation_present,
+    check_draft_no_raw_pii,
+)
+
 # Load .env from project root (parent of app/)
 _env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(_env_path)
@@ -19,16 +30,408 @@ load_dotenv(_env_path)
 DEFAULT_MODEL = "gpt-4o-mini"
 
 
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) for accounting when usage is unavailable."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+def base_url() -> Optional[str]:
+    """
+    OpenAI-compatible endpoint: LLM_BASE_URL (e.g. the local mock, python -m app.mock_llm),
+    else OPENAI_BASE_URL, else None (api.openai.com).
+    """
+    for name in ("LLM_BASE_URL", "OPENAI_BASE_URL"):
+        url = os.environ.get(name, "").strip()
+        if url:
+            return url
+    return None
+
+
 def _client():
-    """Lazy import to avoid import error when openai not installed."""
+    """Lazy import to avoid import error when openai not installed. Retries are done by GuardedLLMClient."""
     from openai import OpenAI
 
-    return OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    url = base_url()
+    # Local/compatible endpoints (LLM_BASE_URL) usually ignore the key
+    key = os.environ.get("OPENAI_API_KEY") or ("not-needed" if url else None)
+    return OpenAI(api_key=key, base_url=url, max_retries=0)
+
+
+class LLMUnavailable(Exception):
+    """Call shed or failed: circuit open, rate limit not granted in time, or retries exhausted."""
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at capacity per minute; thread-safe."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, float(per_minute))
+        self._rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+
+    def acquire(self, amount: float, deadline: float) -> bool:
+        """Take amount tokens, waiting until deadline (monotonic); False if not granted in time."""
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return True
+                wait = (amount - self._tokens) / self._rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(min(wait, 0.05))
+
+    def refund(self, amount: float) -> None:
+        """Give back tokens taken by acquire() for a call that was shed before it was sent."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + min(float(amount), self.capacity))
+
+
+class CircuitBreaker:
+    """
+    closed → open after failure_threshold consecutive failures; open → half_open after
+    reset_timeout_s; half_open lets one probe through: success closes, failure re-opens.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.opened_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == "open"
+                and time.monotonic() - self._opened_at >= self.reset_timeout_s
+            ):
+                self._state = "half_open"
+            return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may go out now (claims the single probe when half-open)."""
+        state = self.state
+        with self._lock:
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe that was claimed but never reached the provider."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.opened_count += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+def _retry_after_s(exc: Exception) -> float:
+    """Retry-After seconds from an HTTP error response (e.g. 429), else 0."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("retry-after", 0) or 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Timeouts, connection errors, 429 and 5xx are retryable; other API errors are not."""
+    import openai
+
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    return status == 429 or (status is not None and status >= 500)
+
+
+class GuardedLLMClient:
+    """
+    Chat-completions wrapper: request and token per-minute buckets, a deadline per call
+    (covering queueing and all attempts), bounded retries with full jitter for retryable
+    errors, and a circuit breaker that sheds calls while the provider is failing.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 200_000,
+        timeout_s: float = 10.0,
+        max_retries: int = 2,
+        backoff_base_s: float = 0.2,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.timeout_s = timeout_s
+        self.max_retries = max(0, max_retries)
+        self.backoff_base_s = backoff_base_s
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        # One OpenAI client (and its HTTP connection pool) reused by every call
+        self._openai = None
+        self._counts = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "shed_circuit_open": 0,
+            "shed_rate_limited": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "GuardedLLMClient":
+        """Limits from LLM_RPM, LLM_TPM, LLM_TIMEOUT_S, LLM_MAX_RETRIES, LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_S."""
+        return cls(
+            requests_per_minute=_env_float("LLM_RPM", 500),
+            tokens_per_minute=_env_float("LLM_TPM", 200_000),
+            timeout_s=_env_float("LLM_TIMEOUT_S", 10.0),
+            max_retries=int(_env_float("LLM_MAX_RETRIES", 2)),
+            breaker=CircuitBreaker(
+                failure_threshold=int(_env_float("LLM_BREAKER_FAILURES", 5)),
+                reset_timeout_s=_env_float("LLM_BREAKER_RESET_S", 30.0),
+            ),
+        )
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def _get_openai(self):
+        with self._lock:
+            if self._openai is None:
+                self._openai = _client()
+            return self._openai
+
+    def create(
+        self,
+        *,
+        messages: list[dict],
+        max_tokens: int = 300,
+        timeout_s: Optional[float] = None,
+        **kwargs: Any,
+    ):
+        """
+        chat.completions.create with limits; raises LLMUnavailable when shed or exhausted.
+        timeout_s (e.g. a message's remaining deadline) shortens the per-call deadline; running
+        out of a caller's shorter budget does not count against the provider in the breaker.
+        """
+        self._count("calls")
+        budget_s = self.timeout_s if timeout_s is None else min(self.timeout_s, timeout_s)
+        caller_bound = budget_s < self.timeout_s
+        deadline = time.monotonic() + budget_s
+        if not self.breaker.allow():
+            self._count("shed_circuit_open")
+            raise LLMUnavailable("circuit open")
+        est_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages) + max_tokens
+        if not self.requests.acquire(1, deadline):
+            granted = False
+        elif not self.tokens.acquire(est_tokens, deadline):
+            self.requests.refund(1)  # shed: the request slot was never used
+            granted = False
+        else:
+            granted = True
+        if not granted:
+            self._count("shed_rate_limited")
+            self.breaker.release_probe()
+            raise LLMUnavailable("rate limit not granted before deadline")
+        client = self._get_openai()
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._count("failures")
+                if caller_bound:
+                    self.breaker.release_probe()
+                else:
+                    self.breaker.record_failure()
+                raise LLMUnavailable("deadline exceeded")
+            try:
+                resp = client.with_options(timeout=remaining).chat.completions.create(
+                    messages=messages, max_tokens=max_tokens, **kwargs
+                )
+            except Exception as exc:
+                retryable = _is_retryable(exc)
+                if retryable and attempt < self.max_retries:
+                    attempt += 1
+                    self._count("retries")
+                    sleep = max(
+                        random.uniform(0, self.backoff_base_s * (2**attempt)),
+                        _retry_after_s(exc),
+                    )
+                    if time.monotonic() + sleep < deadline:
+                        time.sleep(sleep)
+                        continue
+                self._count("failures")
+                if retryable and not (caller_bound and time.monotonic() >= deadline):
+                    self.breaker.record_failure()
+                else:
+                    # e.g. bad request, or the caller's shorter budget ran out: not a
+                    # provider outage, does not trip the breaker
+                    self.breaker.release_probe()
+                raise LLMUnavailable(str(exc)) from exc
+            self._count("successes")
+            self.breaker.record_success()
+            return resp
+
+    def metrics(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            **counts,
+            "breaker_state": self.breaker.state,
+            "breaker_opened": self.breaker.opened_count,
+        }
+
+
+_guarded: Optional[GuardedLLMClient] = None
+_guarded_lock = threading.Lock()
+
+
+def get_llm_client() -> GuardedLLMClient:
+    """Process-wide guarded client (limits and breaker state shared by all LLM calls)."""
+    global _guarded
+    with _guarded_lock:
+        if _guarded is None:
+            _guarded = GuardedLLMClient.from_env()
+        return _guarded
+
+
+def reset_llm_client() -> None:
+    """Drop the shared client (e.g. after changing LLM_* settings, or between tests)."""
+    global _guarded, _stream_stats, _draft_tokens
+    with _guarded_lock:
+        _guarded = None
+    with _stats_lock:
+        _stream_stats = DraftStreamStats()
+        _draft_tokens = DraftTokenStats()
+
+
+def llm_metrics() -> dict:
+    """Breaker state, shed counts and call counters of the shared client."""
+    return get_llm_client().metrics()
+
+
+def circuit_open() -> bool:
+    """True while the breaker is open (callers should skip the LLM and use the template)."""
+    return get_llm_client().breaker.state == "open"
 
 
 def is_available() -> bool:
-    """Return True if OPENAI_API_KEY is set and non-empty."""
-    return bool(os.environ.get("OPENAI_API_KEY", "").strip())
+    """
+    Return True if OPENAI_API_KEY is set and non-empty, or LLM_BASE_URL is set (any
+    OpenAI-compatible endpoint, e.g. the local mock; the key is then optional).
+    """
+    return bool(
+        os.environ.get("OPENAI_API_KEY", "").strip()
+        or os.environ.get("LLM_BASE_URL", "").strip()
+    )
+
+
+def _add_usage(usage: Optional[dict[str, int]], resp, prompt_text: str) -> None:
+    """Accumulate prompt/completion tokens of resp into usage (estimated if not reported)."""
+    if usage is None:
+        return
+    reported = getattr(resp, "usage", None)
+    content = resp.choices[0].message.content if resp.choices else ""
+    usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + int(
+        getattr(reported, "prompt_tokens", None) or estimate_tokens(prompt_text)
+    )
+    usage["completion_tokens"] = usage.get("completion_tokens", 0) + int(
+        getattr(reported, "completion_tokens", None) or estimate_tokens(content or "")
+    )
+    usage["cached_tokens"] = usage.get("cached_tokens", 0) + _cached_tokens(reported)
+
+
+def _cached_tokens(reported) -> int:
+    """Prompt tokens served from the provider's prompt cache (usage.prompt_tokens_details)."""
+    details = getattr(reported, "prompt_tokens_details", None)
+    return int(getattr(details, "cached_tokens", None) or 0)
+
+
+@dataclass
+class DraftTokenStats:
+    """Per-call token accounting of draft requests (single, streamed and batched)."""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    max_prompt_tokens: int = 0
+    trimmed_prompts: int = 0  # policy cut to fit DRAFT_PROMPT_TOKENS
+
+    def as_dict(self) -> dict:
+        d = asdict(self)
+        n = self.calls or 1
+        d["prompt_tokens_per_call"] = round(self.prompt_tokens / n, 1)
+        d["completion_tokens_per_call"] = round(self.completion_tokens / n, 1)
+        d["cached_ratio"] = (
+            round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0
+        )
+        return d
+
+
+_draft_tokens = DraftTokenStats()
+_stats_lock = threading.Lock()
+
+
+def _record_draft_call(prompt, call_usage: dict[str, int], usage: Optional[dict[str, int]]) -> None:
+    """Add one draft call's token counts to the shared stats and to the caller's usage dict."""
+    with _stats_lock:
+        st = _draft_tokens
+        st.calls += 1
+        st.prompt_tokens += call_usage.get("prompt_tokens", 0)
+        st.cached_tokens += call_usage.get("cached_tokens", 0)
+        st.completion_tokens += call_usage.get("completion_tokens", 0)
+        st.max_prompt_tokens = max(st.max_prompt_tokens, call_usage.get("prompt_tokens", 0))
+        st.trimmed_prompts += prompt.trimmed
+    if usage is not None:
+        for key, value in call_usage.items():
+            usage[key] = usage.get(key, 0) + value
+
+
+def draft_token_metrics() -> dict:
+    """Prompt, cached and completion tokens of draft calls since start (or reset_llm_client)."""
+    with _stats_lock:
+        return _draft_tokens.as_dict()
 
 
 def generate_draft(
@@ -36,6 +439,8 @@ def generate_draft(
     policy_snippet: str,
     kb_key: str,
     model: str = DEFAULT_MODEL,
+    usage: Optional[dict[str, int]] = None,
+    timeout_s: Optional[float] = None,
 ) -> Optional[str]:
     """
     Ask the LLM to generate a short, policy-grounded draft reply.
@@ -43,33 +448,345 @@ def generate_draft(
     - customer_message: redacted customer text (no PII).
     - policy_snippet: relevant kb content to ground the reply.
     - kb_key: e.g. suspected_fraud, card_lost_stolen (for citation).
+    - usage: if given, prompt_tokens / cached_tokens / completion_tokens of the call are added to it.
+    - timeout_s: caps the call's deadline (e.g. the message's remaining budget).
+    The prompt comes from app.prompts.build_draft_prompt (cache-friendly prefix, token budget).
     Returns generated text, or None on missing key / API error (caller should use template fallback).
     """
     if not is_available():
         return None
-    system = (
-        "You are a helpful banking assistant. Reply in 2–4 short sentences. "
-        "Use ONLY the policy below; do not invent steps. "
-        f"Include exactly one citation in this format: [kb: {kb_key}]"
+    from app.prompts import build_draft_prompt
+
+    prompt = build_draft_prompt(customer_message, policy_snippet, kb_key)
+    try:
+        resp = get_llm_client().create(
+            model=model,
+            messages=prompt.messages,
+            max_tokens=300,
+            temperature=0.3,
+            timeout_s=timeout_s,
+        )
+        call_usage: dict[str, int] = {}
+        _add_usage(call_usage, resp, "".join(m["content"] for m in prompt.messages))
+        _record_draft_call(prompt, call_usage, usage)
+        if resp.choices and resp.choices[0].message.content:
+            return resp.choices[0].message.content.strip()
+        return None
+    except Exception:
+        return None
+
+
+@dataclass
+class DraftStreamStats:
+    """Streamed drafts: outcomes, time to first token and what early aborts saved."""
+
+    streams: int = 0
+    completed: int = 0
+    aborted_pii: int = 0
+    citation_missing: int = 0
+    errors: int = 0
+    ttft_s: float = 0.0  # summed over streams that produced a token
+    first_tokens: int = 0
+    completed_s: float = 0.0  # summed full-stream durations (completed streams)
+    completion_tokens: int = 0
+    tokens_saved: int = 0  # max_tokens budget left unused by aborted streams
+    latency_saved_s: float = 0.0  # mean completed duration minus time at abort
+
+    def as_dict(self) -> dict:
+        d = asdict(self)
+        for key in ("ttft_s", "completed_s", "latency_saved_s"):
+            d[key] = round(d[key], 4)
+        d["mean_ttft_ms"] = round(1000 * self.ttft_s / self.first_tokens, 1) if self.first_tokens else 0.0
+        return d
+
+
+_stream_stats = DraftStreamStats()
+
+
+def draft_stream_metrics() -> dict:
+    """Counters of stream_draft since start (or the last reset_llm_client)."""
+    with _stats_lock:
+        return _stream_stats.as_dict()
+
+
+def stream_draft(
+    customer_message: str,
+    policy_snippet: str,
+    kb_key: str,
+    model: str = DEFAULT_MODEL,
+    on_partial: Optional[Callable[[str], None]] = None,
+    usage: Optional[dict[str, int]] = None,
+    max_tokens: int = 300,
+    timeout_s: Optional[float] = None,
+) -> Optional[str]:
+    """
+    generate_draft, streamed: tokens are checked for raw PII as they arrive and the stream is
+    closed on the first hit (the remaining tokens are never generated or paid for).
+    on_partial(text_so_far) is called per received chunk (e.g. to render a live preview).
+    timeout_s caps the call's deadline, as in generate_draft.
+    Returns the draft once it completes with a [kb: ...] citation, else None (template fallback).
+    """
+    if not is_available():
+        return None
+    from app.prompts import build_draft_prompt
+
+    prompt = build_draft_prompt(customer_message, policy_snippet, kb_key)
+    check = IncrementalPIICheck()
+    t0 = time.perf_counter()
+    first_token_s = None
+    reported = None
+    try:
+        stream = get_llm_client().create(
+            model=model,
+            messages=prompt.messages,
+            max_tokens=max_tokens,
+            temperature=0.3,
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout_s=timeout_s,
+        )
+        with stream:
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    reported = chunk.usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first_token_s is None:
+                    first_token_s = time.perf_counter() - t0
+                ok = check.feed(delta)
+                if on_partial is not None:
+                    on_partial(check.text)
+                if not ok:
+                    break
+    except Exception:
+        with _stats_lock:
+            _stream_stats.streams += 1
+            _stream_stats.errors += 1
+        return None
+    elapsed = time.perf_counter() - t0
+    text = check.text.strip()
+    # The incremental check only rescans tails: confirm on the whole draft before accepting it
+    pii_ok = check.ok and check_draft_no_raw_pii(check.text)
+    # An aborted stream never receives the usage chunk: count what arrived
+    streamed_tokens = (
+        getattr(reported, "completion_tokens", None) or estimate_tokens(check.text)
+    )
+    _record_draft_call(
+        prompt,
+        {
+            "prompt_tokens": getattr(reported, "prompt_tokens", None) or prompt.prompt_tokens,
+            "cached_tokens": _cached_tokens(reported),
+            "completion_tokens": streamed_tokens,
+        },
+        usage,
+    )
+    with _stats_lock:
+        st = _stream_stats
+        st.streams += 1
+        st.completion_tokens += streamed_tokens
+        if first_token_s is not None:
+            st.first_tokens += 1
+            st.ttft_s += first_token_s
+        if not pii_ok:
+            st.aborted_pii += 1
+            st.tokens_saved += max(0, max_tokens - streamed_tokens)
+            if st.completed:
+                st.latency_saved_s += max(0.0, st.completed_s / st.completed - elapsed)
+            return None
+        st.completed += 1
+        st.completed_s += elapsed
+        if not check_draft_citation_present(text):
+            st.citation_missing += 1
+            return None
+    return text or None
+
+
+def _classify_system_prompt(intents: tuple[str, ...], queues: tuple[str, ...]) -> str:
+    return (
+        "You route redacted banking customer messages. For every message, choose exactly one "
+        f"intent from {list(intents)} and one suggested_queue from {list(queues)}, "
+        "plus a confidence between 0 and 1. Answer with JSON only, one result per message id."
     )
-    user = (
-        f"Policy:\n{policy_snippet}\n\n"
-        f"Customer message:\n{customer_message}\n\n"
-        "Draft reply (cite policy with [kb: ...]):"
+
+
+def _classify_response_format(
+    intents: tuple[str, ...], queues: tuple[str, ...]
+) -> dict:
+    """JSON schema for structured output: {"results": [{id, intent, suggested_queue, confidence}]}."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "message_routing",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "results": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {"type": "string"},
+                                "intent": {"type": "string", "enum": list(intents)},
+                                "suggested_queue": {
+                                    "type": "string",
+                                    "enum": list(queues),
+                                },
+                                "confidence": {"type": "number"},
+                            },
+                            "required": ["id", "intent", "suggested_queue", "confidence"],
+                            "additionalProperties": False,
+                        },
+                    }
+                },
+                "required": ["results"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def classify_single_prompt_tokens(
+    text: str, intents: tuple[str, ...], queues: tuple[str, ...]
+) -> int:
+    """Estimated prompt tokens if this message were classified in its own request."""
+    return estimate_tokens(_classify_system_prompt(intents, queues)) + estimate_tokens(
+        json.dumps([{"id": "0", "text": text}])
     )
+
+
+def classify_batch(
+    items: list[tuple[str, str]],
+    intents: tuple[str, ...],
+    queues: tuple[str, ...],
+    model: str = DEFAULT_MODEL,
+    timeout_s: Optional[float] = None,
+) -> Optional[tuple[dict[str, dict], dict[str, int]]]:
+    """
+    Classify many redacted messages in one structured-output request.
+
+    - items: (id, redacted_text) pairs; ids must be unique within the batch.
+    - timeout_s: caps the call's deadline (e.g. the least remaining budget in the batch).
+    Returns ({id: {intent, suggested_queue, confidence}}, usage) where usage has
+    prompt_tokens and completion_tokens. Items that are missing from the reply or carry an
+    unknown intent/queue are left out, so the caller can fall back per item.
+    Returns None on missing key / API error / unparseable reply (caller falls back for the batch).
+    """
+    if not items or not is_available():
+        return None
+    system = _classify_system_prompt(intents, queues)
+    user = json.dumps([{"id": i, "text": t} for i, t in items], ensure_ascii=False)
     try:
-        client = _client()
-        resp = client.chat.completions.create(
+        resp = get_llm_client().create(
             model=model,
             messages=[
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
             ],
-            max_tokens=300,
-            temperature=0.3,
+            response_format=_classify_response_format(intents, queues),
+            temperature=0,
+            timeout_s=timeout_s,
         )
-        if resp.choices and resp.choices[0].message.content:
-            return resp.choices[0].message.content.strip()
+        content = resp.choices[0].message.content if resp.choices else None
+        data = json.loads(content or "")
+    except Exception:
+        return None
+    usage: dict[str, int] = {}
+    _add_usage(usage, resp, system + user)
+    wanted = {i for i, _ in items}
+    out: dict[str, dict] = {}
+    for r in data.get("results", []) if isinstance(data, dict) else []:
+        if not isinstance(r, dict):
+            continue
+        rid = str(r.get("id", ""))
+        intent = str(r.get("intent", "")).strip().lower()
+        queue = str(r.get("suggested_queue", "")).strip()
+        if rid not in wanted or intent not in intents or queue not in queues:
+            continue
+        try:
+            conf = min(1.0, max(0.0, float(r.get("confidence", 0.0))))
+        except (TypeError, ValueError):
+            conf = 0.0
+        out[rid] = {"intent": intent, "suggested_queue": queue, "confidence": conf}
+    return out, usage
+
+
+def _draft_batch_response_format() -> dict:
+    """JSON schema for structured output: {"drafts": [{id, draft}]}."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "draft_batch",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "drafts": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {"type": "string"},
+                                "draft": {"type": "string"},
+                            },
+                            "required": ["id", "draft"],
+                            "additionalProperties": False,
+                        },
+                    }
+                },
+                "required": ["drafts"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def generate_drafts_batch(
+    items: list[tuple[str, str]],
+    policy_snippet: str,
+    kb_key: str,
+    model: str = DEFAULT_MODEL,
+    usage: Optional[dict[str, int]] = None,
+    timeout_s: Optional[float] = None,
+) -> Optional[dict[str, str]]:
+    """
+    Draft replies for several redacted messages that share one policy (kb_key) in one request.
+
+    - items: (id, redacted_text) pairs; ids must be unique within the batch.
+    - usage: if given, prompt_tokens / completion_tokens of the call are added to it.
+    - timeout_s: caps the call's deadline, as in classify_batch.
+    Returns {id: draft} for the ids the model answered (others are left out so the caller can
+    retry or fall back per item), or None on missing key / API error / unparseable reply.
+    """
+    if not items or not is_available():
         return None
+    from app.prompts import build_draft_batch_prompt
+
+    prompt = build_draft_batch_prompt(items, policy_snippet, kb_key)
+    try:
+        resp = get_llm_client().create(
+            model=model,
+            messages=prompt.messages,
+            response_format=_draft_batch_response_format(),
+            max_tokens=300 * len(items),
+            temperature=0.3,
+            timeout_s=timeout_s,
+        )
+        content = resp.choices[0].message.content if resp.choices else None
+        data = json.loads(content or "")
     except Exception:
         return None
+    call_usage: dict[str, int] = {}
+    _add_usage(call_usage, resp, "".join(m["content"] for m in prompt.messages))
+    _record_draft_call(prompt, call_usage, usage)
+    wanted = {i for i, _ in items}
+    out: dict[str, str] = {}
+    for d in data.get("drafts", []) if isinstance(data, dict) else []:
+        if not isinstance(d, dict):
+            continue
+        did = str(d.get("id", ""))
+        text = str(d.get("draft", "")).strip()
+        if did in wanted and text:
+            out[did] = text
+    return out
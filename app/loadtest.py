@@ -0,0 +1,148 @@
+"""
+Soak test of the LLM drafting path: the per-message pipeline (redact → classify → draft →
+check) with USE_LLM=1 against the local mock server, at increasing concurrency.
+
+Per concurrency level reports throughput, latency percentiles, fallback rate and guardrail
+pass rate (plus mock 429/500 counts and client retries/sheds) as a table, ASCII curves and CSV.
+Run: python -m app.loadtest [--concurrency 1 2 4 8 16] [--n 200] [--latency-ms 300]
+     [--latency-sigma 0.5] [--error-rate 0.02] [--rate-limit-rate 0.05] [--base-url URL]
+"""
+
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import DEFAULT_DATA_DIR
+from app.llm import llm_metrics, reset_llm_client
+from app.mock_llm import MockLLMServer
+from app.tenants import TenantEngine, build_engine
+
+DEFAULT_LEVELS = (1, 2, 4, 8, 16)
+DEFAULT_OUT = Path("loadtest.csv")
+CURVE_WIDTH = 40
+
+
+def load_messages(data_dir: Path, n: int, all_intents: bool = False) -> list[tuple[str, str]]:
+    """(message_id, text) cycled up to n; draft-eligible (fraud) messages only unless all_intents."""
+    df = pd.read_csv(data_dir / "messages.csv")
+    if not all_intents:
+        df = df[df["label"].astype(str).str.strip().str.lower() == "fraud"]
+    rows = [(str(r["message_id"]), str(r["text"])) for _, r in df.iterrows()]
+    return [(f"{rows[i % len(rows)][0]}-{i}", rows[i % len(rows)][1]) for i in range(n)]
+
+
+def run_level(
+    engine: TenantEngine,
+    messages: list[tuple[str, str]],
+    concurrency: int,
+    server: Optional[MockLLMServer] = None,
+) -> dict:
+    """Process every message with `concurrency` workers on a fresh LLM client; one curve point."""
+    reset_llm_client()
+    if server is not None:
+        server.reset_counts()
+
+    def one(item: tuple[str, str]) -> tuple[float, dict]:
+        mid, text = item
+        t0 = time.perf_counter()
+        out = engine.process(text, mid, use_llm=True)
+        return time.perf_counter() - t0, out
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, messages))
+    wall = time.perf_counter() - t0
+    latencies = np.array([r[0] for r in results]) * 1000
+    n = len(results) or 1
+    client = llm_metrics()
+    point = {
+        "concurrency": concurrency,
+        "messages": len(results),
+        "wall_s": round(wall, 3),
+        "throughput_msg_s": round(len(results) / wall, 2) if wall else 0.0,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 1) if len(results) else 0.0,
+        "p95_ms": round(float(np.percentile(latencies, 95)), 1) if len(results) else 0.0,
+        "p99_ms": round(float(np.percentile(latencies, 99)), 1) if len(results) else 0.0,
+        "fallback_rate": round(sum(r[1]["fallback"] for r in results) / n, 4),
+        "guardrail_pass_rate": round(sum(r[1]["checks_ok"] for r in results) / n, 4),
+        "llm_retries": client["retries"],
+        "llm_shed": client["shed_circuit_open"] + client["shed_rate_limited"],
+        "breaker_opened": client["breaker_opened"],
+    }
+    if server is not None:
+        point["mock_429"] = server.counts["rate_limited"]
+        point["mock_5xx"] = server.counts["server_error"]
+    return point
+
+
+def _curve(points: list[dict], key: str) -> None:
+    top = max((p[key] for p in points), default=0) or 1
+    print(f"{key}:")
+    for p in points:
+        bar = "█" * max(1, round(CURVE_WIDTH * p[key] / top)) if p[key] else ""
+        print(f"  c={p['concurrency']:<4} {bar} {p[key]}")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Load-test LLM drafting on the local mock server")
+    p.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    p.add_argument("--n", type=int, default=200, help="Messages per concurrency level")
+    p.add_argument("--concurrency", type=int, nargs="+", default=list(DEFAULT_LEVELS))
+    p.add_argument("--all-intents", action="store_true", help="Include non-draft intents")
+    p.add_argument(
+        "--base-url",
+        default=None,
+        help="Use an already running server (e.g. python -m app.mock_llm) instead of starting one",
+    )
+    p.add_argument("--latency-ms", type=float, default=300.0, help="Mock median latency")
+    p.add_argument("--latency-sigma", type=float, default=0.5, help="Mock log-normal shape")
+    p.add_argument("--token-latency-ms", type=float, default=0.0)
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--rate-limit-rate", type=float, default=0.0)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", type=Path, default=DEFAULT_OUT, help="CSV of the curve points")
+    args = p.parse_args(argv)
+
+    server = None
+    url = args.base_url
+    if url is None:
+        server = MockLLMServer(
+            base_latency_s=args.latency_ms / 1000,
+            per_token_latency_s=args.token_latency_ms / 1000,
+            latency_sigma=args.latency_sigma,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            seed=args.seed,
+        ).start()
+        url = server.base_url
+    os.environ.update({"USE_LLM": "1", "LLM_BASE_URL": url})
+    engine = build_engine(args.data_dir)
+    messages = load_messages(args.data_dir, args.n, args.all_intents)
+    points = []
+    try:
+        for level in args.concurrency:
+            points.append(run_level(engine, messages, level, server))
+            print(points[-1])
+    finally:
+        if server is not None:
+            server.stop()
+        reset_llm_client()
+
+    for key in ("throughput_msg_s", "p95_ms", "fallback_rate", "guardrail_pass_rate"):
+        _curve(points, key)
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(points[0]))
+        writer.writeheader()
+        writer.writerows(points)
+    print(f"Curves written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
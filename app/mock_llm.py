@@ -0,0 +1,319 @@
+"""
+Local OpenAI-compatible mock server (chat completions) for tests, benchmarks and soak tests.
+
+No network or API key needed: point the OpenAI client at base_url (LLM_BASE_URL) and every
+request is answered in-process. Default replies are canned, citation-bearing drafts;
+structured-output requests (batched drafts, batched classification) get one item per message id.
+Latency (fixed or log-normal), server-error rate and 429 rate-limit rate are configurable.
+Run standalone: python -m app.mock_llm [--port 8000] [--latency-ms 300] [--error-rate 0.02]
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+CANNED_DRAFT = (
+    "Thank you for letting us know. Please follow the steps in our policy and we will "
+    "help you right away. [kb: {kb_key}]"
+)
+
+
+def _kb_key_from_request(body: dict) -> str:
+    for m in body.get("messages", []):
+        match = re.search(r"\[kb:\s*(\w+)\]", m.get("content", ""))
+        if match:
+            return match.group(1)
+    return "general_servicing"
+
+
+def _message_items(body: dict) -> list[dict]:
+    """Batched requests end the user message with a JSON list of {id, text} on its own line."""
+    content = body.get("messages", [{}])[-1].get("content", "")
+    start = 0 if content.startswith("[") else content.rfind("\n[")
+    try:
+        items = json.loads(content[start:]) if start >= 0 else []
+    except ValueError:
+        return []
+    return [it for it in items if isinstance(it, dict) and "id" in it]
+
+
+def default_responder(body: dict) -> str:
+    """Canned reply: drafts for draft_batch, general routing for message_routing, else one draft."""
+    kb_key = _kb_key_from_request(body)
+    schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("name")
+    if schema == "draft_batch":
+        return json.dumps(
+            {
+                "drafts": [
+                    {"id": it["id"], "draft": CANNED_DRAFT.format(kb_key=kb_key)}
+                    for it in _message_items(body)
+                ]
+            }
+        )
+    if schema == "message_routing":
+        return json.dumps(
+            {
+                "results": [
+                    {
+                        "id": it["id"],
+                        "intent": "general",
+                        "suggested_queue": "General Banking",
+                        "confidence": 0.5,
+                    }
+                    for it in _message_items(body)
+                ]
+            }
+        )
+    return CANNED_DRAFT.format(kb_key=kb_key)
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+def _error_payload(status: int) -> dict:
+    if status == 429:
+        return {
+            "error": {
+                "message": "mock rate limit reached",
+                "type": "requests",
+                "code": "rate_limit_exceeded",
+            }
+        }
+    return {"error": {"message": "mock error", "type": "server_error"}}
+
+
+class MockLLMServer:
+    """
+    Threaded chat-completions server on 127.0.0.1.
+    - responder: request body -> reply content (default: default_responder).
+    - status: HTTP status for every reply (non-200 returns an OpenAI-style error body).
+    - base_latency_s / per_token_latency_s: simulated time to first token and per completion token.
+    - latency_sigma: > 0 draws the time to first token from a log-normal with median
+      base_latency_s and this shape (long tail), else it is fixed.
+    - error_rate / rate_limit_rate: fraction of requests answered 500 / 429 (with Retry-After).
+    - usage reports cached_tokens for a prompt prefix (all but the last message) seen before.
+    - "stream": true requests get server-sent chunks, one per ~4-character token.
+    Records every request body in .requests and reply counts in .counts.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        responder: Optional[Callable[[dict], str]] = None,
+        base_latency_s: float = 0.0,
+        per_token_latency_s: float = 0.0,
+        latency_sigma: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after_s: float = 0.1,
+        seed: Optional[int] = None,
+    ):
+        self.responder = responder or default_responder
+        self.status = 200
+        self.base_latency_s = base_latency_s
+        self.per_token_latency_s = per_token_latency_s
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_s = retry_after_s
+        self.requests: list[dict] = []
+        self._prefixes: set[str] = set()  # simulated provider prompt cache
+        self.counts = {"ok": 0, "server_error": 0, "rate_limited": 0, "stream_aborted": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def _draw(self) -> tuple[int, float]:
+        """(status, time to first token) for the next request."""
+        with self._lock:
+            u = self._rng.random()
+            if self.status != 200:
+                status = self.status
+            elif u < self.rate_limit_rate:
+                status = 429
+            elif u < self.rate_limit_rate + self.error_rate:
+                status = 500
+            else:
+                status = 200
+            latency = self.base_latency_s
+            if self.latency_sigma > 0 and latency > 0:
+                latency = self._rng.lognormvariate(0.0, self.latency_sigma) * latency
+            key = {200: "ok", 429: "rate_limited"}.get(status, "server_error")
+            self.counts[key] += 1
+        return status, latency
+
+    def _usage(self, body: dict, completion_tokens: int) -> dict:
+        """Usage block; a prompt prefix (all but the last message) seen before counts as cached."""
+        messages = body.get("messages", [])
+        prompt_tokens = sum(_tokens(m.get("content", "")) for m in messages)
+        prefix = json.dumps(messages[:-1], sort_keys=True)
+        with self._lock:
+            cached = prefix in self._prefixes
+            self._prefixes.add(prefix)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {
+                "cached_tokens": sum(_tokens(m.get("content", "")) for m in messages[:-1])
+                if cached
+                else 0
+            },
+        }
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.counts = dict.fromkeys(self.counts, 0)
+            self.requests.clear()
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                mock.requests.append(body)
+                status, latency = mock._draw()
+                if status == 429:
+                    payload = _error_payload(status)
+                elif status != 200:
+                    time.sleep(latency)
+                    payload = _error_payload(status)
+                elif body.get("stream"):
+                    self._stream(body, latency)
+                    return
+                else:
+                    content = mock.responder(body)
+                    completion_tokens = _tokens(content)
+                    time.sleep(latency + mock.per_token_latency_s * completion_tokens)
+                    payload = {
+                        "id": "chatcmpl-mock",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model", "mock"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": mock._usage(body, completion_tokens),
+                    }
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", f"{mock.retry_after_s:g}")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, body: dict, latency: float) -> None:
+                """Server-sent chat.completion.chunk events, one ~4-character token each."""
+                content = mock.responder(body)
+                pieces = [content[i : i + 4] for i in range(0, len(content), 4)]
+                usage = None
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    usage = mock._usage(body, len(pieces))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+
+                def event(delta: Optional[dict], finish: Optional[str] = None, **extra) -> None:
+                    chunk = {
+                        "id": "chatcmpl-mock",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", "mock"),
+                        "choices": []
+                        if delta is None
+                        else [{"index": 0, "delta": delta, "finish_reason": finish}],
+                        **extra,
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+
+                time.sleep(latency)
+                try:
+                    event({"role": "assistant", "content": ""})
+                    for piece in pieces:
+                        time.sleep(mock.per_token_latency_s)
+                        event({"content": piece})
+                    event({}, "stop")
+                    if usage is not None:
+                        event(None, usage=usage)
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client closed the stream early (e.g. guardrail abort)
+                    with mock._lock:
+                        mock.counts["stream_aborted"] += 1
+
+        return Handler
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Run the mock OpenAI-compatible server until Ctrl-C")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--latency-ms", type=float, default=0.0, help="Median time to first token")
+    p.add_argument("--latency-sigma", type=float, default=0.0, help="Log-normal shape (0 = fixed)")
+    p.add_argument("--token-latency-ms", type=float, default=0.0, help="Per completion token")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Fraction answered 500")
+    p.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction answered 429")
+    p.add_argument("--retry-after-s", type=float, default=0.1)
+    p.add_argument("--seed", type=int, default=None)
+    args = p.parse_args()
+    server = MockLLMServer(
+        port=args.port,
+        base_latency_s=args.latency_ms / 1000,
+        per_token_latency_s=args.token_latency_ms / 1000,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_s=args.retry_after_s,
+        seed=args.seed,
+    )
+    print(f"Mock LLM listening: LLM_BASE_URL={server.base_url} (Ctrl-C to stop)")
+    try:
+        server._server.serve_forever(0.05)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        print(f"Replies: {server.counts}")
+
+
+if __name__ == "__main__":
+    main()
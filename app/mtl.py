@@ -5,14 +5,24 @@ Shared representation (TF-IDF) with two heads: intent (label) and suggested_queu
 Trained on messages.csv; model persisted to disk for inference.
 """
 
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
 from pathlib import Path
 from typing import Optional
 
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import StratifiedKFold, cross_val_predict, train_test_split
 from sklearn.pipeline import Pipeline
 
 from app.classify import ClassificationResult
@@ -28,6 +38,29 @@ QUEUES = (
 
 DEFAULT_MODEL_DIR = Path(__file__).resolve().parent.parent / "models"
 MODEL_FILE = "mtl_model.joblib"
+COMPACT_MODEL_FILE = "mtl_model_compact.joblib"
+# Fitted vectorizer + sparse feature matrix, keyed by data hash and vectorizer params
+FEATURE_CACHE_DIR = DEFAULT_MODEL_DIR / "cache"
+
+VECTORIZER_PARAMS = {"max_features": 5000, "ngram_range": (1, 2), "min_df": 2}
+HEAD_C = 1.0
+
+# Calibration (temperature per head, fitted on out-of-fold training predictions) and
+# per-intent draft gating thresholds chosen for TARGET_PRECISION; both stored in the artifact
+TARGET_PRECISION = 0.9
+CALIBRATION_FOLDS = 5
+# Intents with fewer evaluation predictions than this keep the global threshold (raised to
+# what target_precision needs for a single error to be visible, see choose_thresholds)
+MIN_THRESHOLD_SUPPORT = 5
+# Temperature grid; a best fit on either edge is treated as a failed fit (head stays uncalibrated)
+_TEMPERATURES = np.logspace(-1, 1, 81)
+
+# Default grid for train_mtl --search
+SEARCH_GRID = {
+    "C": (0.3, 1.0, 3.0, 10.0),
+    "ngram_range": ((1, 1), (1, 2)),
+    "max_features": (2000, 5000, 20000),
+}
 
 
 def _label_to_intent(label: str) -> str:
@@ -45,20 +78,17 @@ def _queue_normalize(q: str) -> str:
     return "General Banking"
 
 
+def resolve_model_path() -> Path:
+    """Model used by run/eval: MTL_MODEL_PATH if set (e.g. the compact variant), else the default."""
+    env = os.environ.get("MTL_MODEL_PATH", "").strip()
+    return Path(env) if env else DEFAULT_MODEL_DIR / MODEL_FILE
+
+
 # Fixed seed for reproducible train/test split (must match eval.py)
 SPLIT_RANDOM_STATE = 42
 
 
-def train(
-    messages_path: Path,
-    model_path: Optional[Path] = None,
-    train_ratio: float = 1.0,
-) -> "MTLClassifier":
-    """
-    Train MTL model on messages.csv (text → intent, suggested_queue).
-    If train_ratio < 1.0, use only that fraction for training (same split as eval --test-ratio).
-    Saves pipeline to model_path.
-    """
+def _load_training_frame(messages_path: Path) -> pd.DataFrame:
     if not messages_path.exists():
         raise FileNotFoundError(f"Messages file not found: {messages_path}")
     df = pd.read_csv(messages_path)
@@ -68,48 +98,448 @@ def train(
         or "suggested_queue" not in df.columns
     ):
         raise ValueError("messages.csv must have columns: text, label, suggested_queue")
+    return df
+
+
+def _split(df: pd.DataFrame, train_ratio: float) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Stratified split with SPLIT_RANDOM_STATE (same as eval --test-ratio); (train, holdout)."""
+    try:
+        return train_test_split(
+            df,
+            train_size=train_ratio,
+            random_state=SPLIT_RANDOM_STATE,
+            stratify=df["label"],
+        )
+    except ValueError:
+        return train_test_split(
+            df, train_size=train_ratio, random_state=SPLIT_RANDOM_STATE
+        )
 
-    if train_ratio < 1.0 and train_ratio > 0:
-        try:
-            train_df, _ = train_test_split(
-                df,
-                train_size=train_ratio,
-                random_state=SPLIT_RANDOM_STATE,
-                stratify=df["label"],
-            )
-        except ValueError:
-            train_df, _ = train_test_split(
-                df, train_size=train_ratio, random_state=SPLIT_RANDOM_STATE
-            )
-        df = train_df
 
+def _targets(df: pd.DataFrame) -> tuple[pd.Series, pd.Series, pd.Series]:
     X = df["text"].astype(str).fillna("")
-    y_intent = df["label"].apply(_label_to_intent)
-    y_queue = df["suggested_queue"].apply(_queue_normalize)
+    return (
+        X,
+        df["label"].apply(_label_to_intent),
+        df["suggested_queue"].apply(_queue_normalize),
+    )
+
+
+def _feature_cache_key(texts: pd.Series, params: dict) -> str:
+    h = hashlib.sha256()
+    for t in texts:
+        h.update(t.encode("utf-8"))
+        h.update(b"\0")
+    h.update(json.dumps(params, sort_keys=True, default=list).encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def fit_features(
+    texts: pd.Series,
+    params: Optional[dict] = None,
+    cache_dir: Optional[Path] = FEATURE_CACHE_DIR,
+) -> tuple[TfidfVectorizer, "object", bool]:
+    """
+    Fit TF-IDF on texts → (vectorizer, sparse matrix, cache_hit).
+    With cache_dir, reuse the pair stored for the same texts + params instead of re-tokenizing.
+    """
+    params = {**VECTORIZER_PARAMS, **(params or {})}
+    path = None
+    if cache_dir is not None:
+        path = Path(cache_dir) / f"features_{_feature_cache_key(texts, params)}.joblib"
+        if path.exists():
+            try:
+                cached = joblib.load(path)
+                return cached["vectorizer"], cached["X"], True
+            except Exception:
+                pass
+    vectorizer = TfidfVectorizer(**params)
+    X_vec = vectorizer.fit_transform(texts)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({"vectorizer": vectorizer, "X": X_vec}, path)
+    return vectorizer, X_vec, False
+
+
+def _fit_head(X_vec, y, C: float = HEAD_C) -> LogisticRegression:
+    clf = LogisticRegression(max_iter=500, random_state=42, C=C)
+    clf.fit(X_vec, y)
+    return clf
+
+
+def fit_heads(
+    X_vec, y_intent, y_queue, C: float = HEAD_C
+) -> tuple[LogisticRegression, LogisticRegression]:
+    """Fit the intent and queue heads concurrently on the shared feature matrix."""
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        f_intent = pool.submit(_fit_head, X_vec, y_intent, C)
+        f_queue = pool.submit(_fit_head, X_vec, y_queue, C)
+        return f_intent.result(), f_queue.result()
+
+
+def apply_temperature(proba: np.ndarray, temperature: float) -> np.ndarray:
+    """Temperature-scaled probabilities: softmax(log p / T); T > 1 softens, T < 1 sharpens."""
+    if temperature == 1.0:
+        return proba
+    logits = np.log(np.clip(proba, 1e-12, 1.0)) / temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    e = np.exp(logits)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def fit_temperature(proba: np.ndarray, y, classes) -> Optional[float]:
+    """
+    Temperature minimising the negative log-likelihood of the true classes y; None when the
+    minimum is on the edge of the grid (e.g. separable data driving confidences to 1).
+    """
+    index = {c: i for i, c in enumerate(classes)}
+    rows = np.arange(len(proba))
+    cols = np.array([index[c] for c in y])
+    nll = [
+        -np.log(np.clip(apply_temperature(proba, t)[rows, cols], 1e-12, 1.0)).mean()
+        for t in _TEMPERATURES
+    ]
+    best = int(np.argmin(nll))
+    if best in (0, len(_TEMPERATURES) - 1):
+        return None
+    return float(_TEMPERATURES[best])
+
+
+def _oof_proba(X_vec, y: pd.Series, C: float) -> tuple[np.ndarray, np.ndarray]:
+    """Out-of-fold predict_proba on the training rows → (proba, classes)."""
+    folds = max(2, min(CALIBRATION_FOLDS, int(y.value_counts().min())))
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=SPLIT_RANDOM_STATE)
+    clf = LogisticRegression(max_iter=500, random_state=42, C=C)
+    proba = cross_val_predict(clf, X_vec, y, cv=cv, method="predict_proba")
+    return proba, np.array(sorted(y.unique()))
+
+
+def calibrated_predict(
+    clf_intent, clf_queue, X, calibration: Optional[dict] = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(intents, queues, confidence): confidence = min of the calibrated max probabilities."""
+    calibration = calibration or {}
+    p_intent = apply_temperature(clf_intent.predict_proba(X), calibration.get("intent", 1.0))
+    p_queue = apply_temperature(clf_queue.predict_proba(X), calibration.get("queue", 1.0))
+    return (
+        clf_intent.classes_[p_intent.argmax(axis=1)],
+        clf_queue.classes_[p_queue.argmax(axis=1)],
+        np.minimum(p_intent.max(axis=1), p_queue.max(axis=1)),
+    )
+
+
+def choose_thresholds(
+    pred_intents,
+    confidence,
+    correct,
+    target_precision: float = TARGET_PRECISION,
+    min_support: int = MIN_THRESHOLD_SUPPORT,
+) -> dict[str, dict]:
+    """
+    Per predicted intent, the largest set of most-confident predictions that is correct at
+    least target_precision of the time; the threshold sits midway between its lowest confidence
+    and the next (rejected) one, or at its lowest confidence when nothing is rejected (no
+    evidence for accepting anything less confident).
+    Returns {intent: {threshold, precision, coverage, support}}; intents below min_support,
+    or below the ceil(1 / (1 - target_precision)) predictions the target needs to mean
+    anything, are omitted (global threshold); unreachable targets get threshold 1.0 (always
+    escalate).
+    """
+    if target_precision < 1.0:
+        min_support = max(min_support, math.ceil(1.0 / (1.0 - target_precision) - 1e-9))
+    else:  # no finite sample shows precision 1.0
+        min_support = len(confidence) + 1
+    pred_intents = np.asarray(pred_intents)
+    confidence = np.asarray(confidence, dtype=float)
+    correct = np.asarray(correct, dtype=bool)
+    out: dict[str, dict] = {}
+    for intent in INTENTS:
+        mask = pred_intents == intent
+        support = int(mask.sum())
+        if support < min_support:
+            continue
+        order = np.argsort(-confidence[mask])
+        conf = confidence[mask][order]
+        hits = np.cumsum(correct[mask][order])
+        precision = hits / np.arange(1, support + 1)
+        # accepted set for threshold conf[k] is every prediction with confidence >= conf[k]
+        last = {c: k for k, c in enumerate(conf)}
+        ok = [k for k in sorted(set(last.values())) if precision[k] >= target_precision]
+        if ok:
+            k = ok[-1]
+            below = conf[k + 1] if k + 1 < support else conf[k]
+            out[intent] = {
+                "threshold": float((conf[k] + below) / 2),
+                "precision": float(precision[k]),
+                "coverage": (k + 1) / support,
+                "support": support,
+            }
+        else:
+            out[intent] = {
+                "threshold": 1.0,
+                "precision": float(precision[-1]),
+                "coverage": 0.0,
+                "support": support,
+            }
+    return out
+
+
+def calibrate(
+    X_vec,
+    y_intent: pd.Series,
+    y_queue: pd.Series,
+    clf_intent,
+    clf_queue,
+    C: float = HEAD_C,
+    holdout: Optional[tuple] = None,
+    target_precision: float = TARGET_PRECISION,
+) -> tuple[dict, dict[str, dict]]:
+    """
+    Fit one temperature per head on out-of-fold training predictions, then choose per-intent
+    thresholds on holdout=(X_hold_vec, y_intent, y_queue) when given, else on the calibrated
+    out-of-fold predictions. A head whose fit fails (see fit_temperature) is left out of the
+    calibration and keeps its raw probabilities. Returns (calibration, threshold report).
+    """
+    oof_intent, intent_classes = _oof_proba(X_vec, y_intent, C)
+    oof_queue, queue_classes = _oof_proba(X_vec, y_queue, C)
+    fitted = {
+        "intent": fit_temperature(oof_intent, y_intent, intent_classes),
+        "queue": fit_temperature(oof_queue, y_queue, queue_classes),
+    }
+    calibration = {head: t for head, t in fitted.items() if t is not None}
+    if holdout is not None:
+        X_hold, yi, yq = holdout
+        pred_i, pred_q, conf = calibrated_predict(clf_intent, clf_queue, X_hold, calibration)
+    else:
+        yi, yq = y_intent, y_queue
+        p_i = apply_temperature(oof_intent, calibration.get("intent", 1.0))
+        p_q = apply_temperature(oof_queue, calibration.get("queue", 1.0))
+        pred_i = intent_classes[p_i.argmax(axis=1)]
+        pred_q = queue_classes[p_q.argmax(axis=1)]
+        conf = np.minimum(p_i.max(axis=1), p_q.max(axis=1))
+    correct = (pred_i == np.asarray(yi)) & (pred_q == np.asarray(yq))
+    return calibration, choose_thresholds(pred_i, conf, correct, target_precision)
+
+
+def train(
+    messages_path: Path,
+    model_path: Optional[Path] = None,
+    train_ratio: float = 1.0,
+    vectorizer_params: Optional[dict] = None,
+    C: float = HEAD_C,
+    cache_dir: Optional[Path] = FEATURE_CACHE_DIR,
+    timings: Optional[dict] = None,
+    target_precision: float = TARGET_PRECISION,
+    thresholds_report: Optional[dict] = None,
+    calibrated: bool = False,
+) -> "MTLClassifier":
+    """
+    Train MTL model on messages.csv (text → intent, suggested_queue).
+    If train_ratio < 1.0, use only that fraction for training (same split as eval --test-ratio).
+    Features come from the on-disk cache when texts and vectorizer params are unchanged
+    (cache_dir=None disables it); both heads are fitted in parallel.
+    calibrated=True: heads are then calibrated (k-fold out-of-fold refits, the slowest stage,
+    so off by default for fast retrains) and per-intent draft thresholds chosen for
+    target_precision (on the holdout when there is one); the per-intent report is written
+    into thresholds_report. Uncalibrated models use the global draft threshold.
+    Wall-clock seconds per stage are written into timings if given. Saves pipeline to model_path.
+    """
+    timings = timings if timings is not None else {}
+    t0 = time.perf_counter()
+    df = _load_training_frame(messages_path)
+    holdout_df = None
+    if train_ratio < 1.0 and train_ratio > 0:
+        df, holdout_df = _split(df, train_ratio)
+    X, y_intent, y_queue = _targets(df)
+    timings["load_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    vectorizer, X_vec, hit = fit_features(X, vectorizer_params, cache_dir=cache_dir)
+    timings["features_s"] = time.perf_counter() - t0
+    timings["features_cache_hit"] = hit
 
-    vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 2), min_df=2)
-    X_vec = vectorizer.fit_transform(X)
+    t0 = time.perf_counter()
+    clf_intent, clf_queue = fit_heads(X_vec, y_intent, y_queue, C=C)
+    timings["heads_s"] = time.perf_counter() - t0
 
-    clf_intent = LogisticRegression(max_iter=500, random_state=42)
-    clf_queue = LogisticRegression(max_iter=500, random_state=42)
-    clf_intent.fit(X_vec, y_intent)
-    clf_queue.fit(X_vec, y_queue)
+    calibration: dict = {}
+    report: dict[str, dict] = {}
+    if calibrated:
+        t0 = time.perf_counter()
+        holdout = None
+        if holdout_df is not None:
+            X_hold, yi_hold, yq_hold = _targets(holdout_df)
+            holdout = (vectorizer.transform(X_hold), yi_hold, yq_hold)
+        calibration, report = calibrate(
+            X_vec,
+            y_intent,
+            y_queue,
+            clf_intent,
+            clf_queue,
+            C=C,
+            holdout=holdout,
+            target_precision=target_precision,
+        )
+        if thresholds_report is not None:
+            thresholds_report.update(report)
+        timings["calibration_s"] = time.perf_counter() - t0
 
     pipeline = {
         "vectorizer": vectorizer,
         "clf_intent": clf_intent,
         "clf_queue": clf_queue,
+        "calibration": calibration,
+        "thresholds": {k: v["threshold"] for k, v in report.items()},
+        "target_precision": target_precision,
     }
 
+    t0 = time.perf_counter()
     if model_path is None:
         model_path = DEFAULT_MODEL_DIR / MODEL_FILE
     model_path = Path(model_path)
     model_path.parent.mkdir(parents=True, exist_ok=True)
     joblib.dump(pipeline, model_path)
+    timings["save_s"] = time.perf_counter() - t0
 
     return MTLClassifier(model_path=model_path, pipeline=pipeline)
 
 
+def _score_config(
+    X_train, X_test, yi_train, yq_train, yi_test, yq_test, params, C, cache_dir
+) -> dict:
+    t0 = time.perf_counter()
+    vectorizer, X_vec, hit = fit_features(X_train, params, cache_dir=cache_dir)
+    X_hold = vectorizer.transform(X_test)
+    clf_intent, clf_queue = fit_heads(X_vec, yi_train, yq_train, C=C)
+    intent_acc = float((clf_intent.predict(X_hold) == yi_test.to_numpy()).mean())
+    queue_acc = float((clf_queue.predict(X_hold) == yq_test.to_numpy()).mean())
+    return {
+        "C": C,
+        "ngram_range": tuple(params["ngram_range"]),
+        "max_features": params["max_features"],
+        "intent_accuracy": intent_acc,
+        "queue_accuracy": queue_acc,
+        "score": (intent_acc + queue_acc) / 2,
+        "features_cache_hit": hit,
+        "fit_s": time.perf_counter() - t0,
+    }
+
+
+def search(
+    messages_path: Path,
+    grid: Optional[dict] = None,
+    train_ratio: float = 0.8,
+    n_jobs: int = -1,
+    cache_dir: Optional[Path] = FEATURE_CACHE_DIR,
+    timings: Optional[dict] = None,
+) -> list[dict]:
+    """
+    Parallel grid search over C, ngram_range and max_features, scored on the SPLIT_RANDOM_STATE
+    holdout (1 - train_ratio). Feature matrices are built once per vectorizer config (and cached
+    on disk); every (config, C) pair is then fitted in parallel. Returns results, best first.
+    """
+    timings = timings if timings is not None else {}
+    grid = {**SEARCH_GRID, **(grid or {})}
+    t0 = time.perf_counter()
+    train_df, test_df = _split(_load_training_frame(messages_path), train_ratio)
+    X_train, yi_train, yq_train = _targets(train_df)
+    X_test, yi_test, yq_test = _targets(test_df)
+    timings["load_s"] = time.perf_counter() - t0
+
+    vec_configs = [
+        {**VECTORIZER_PARAMS, "ngram_range": tuple(ng), "max_features": mf}
+        for ng, mf in product(grid["ngram_range"], grid["max_features"])
+    ]
+    t0 = time.perf_counter()
+    if cache_dir is not None:
+        joblib.Parallel(n_jobs=n_jobs, prefer="threads")(
+            joblib.delayed(fit_features)(X_train, params, cache_dir)
+            for params in vec_configs
+        )
+    timings["features_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    results = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_score_config)(
+            X_train, X_test, yi_train, yq_train, yi_test, yq_test, params, C, cache_dir
+        )
+        for params, C in product(vec_configs, grid["C"])
+    )
+    timings["fit_s"] = time.perf_counter() - t0
+    return sorted(results, key=lambda r: r["score"], reverse=True)
+
+
+class _CompactHead:
+    """Linear head from a compact artifact: predict / predict_proba like LogisticRegression."""
+
+    def __init__(self, data: dict):
+        self.classes_ = np.asarray(data["classes"])
+        # float16 on disk; float32 in memory for fast, stable sparse dot products
+        self.coef_ = np.asarray(data["coef"], dtype=np.float32)
+        self.intercept_ = np.asarray(data["intercept"], dtype=np.float32)
+
+    def predict_proba(self, X) -> np.ndarray:
+        scores = np.asarray(X @ self.coef_.T) + self.intercept_
+        if scores.shape[1] == 1:  # binary head: sigmoid over the positive class
+            pos = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - pos, pos])
+        scores -= scores.max(axis=1, keepdims=True)
+        e = np.exp(scores)
+        return e / e.sum(axis=1, keepdims=True)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def compact_pipeline(
+    pipeline: dict, keep_ratio: float = 0.5, dtype: str = "float16"
+) -> dict:
+    """
+    Compact artifact from a full pipeline: keep the keep_ratio of vocabulary terms with the
+    largest absolute coefficient in either head, store coefficients as dtype (float16/float32)
+    and idf/intercepts as float32. Loaded by MTLClassifier like the full model.
+    """
+    vectorizer = pipeline["vectorizer"]
+    heads = {"intent": pipeline["clf_intent"], "queue": pipeline["clf_queue"]}
+    importance = np.maximum(
+        *(np.abs(h.coef_).max(axis=0) for h in heads.values())
+    )
+    n_keep = max(1, int(round(len(importance) * keep_ratio)))
+    kept = np.sort(np.argsort(importance)[::-1][:n_keep])
+    terms = vectorizer.get_feature_names_out()
+    params = {
+        k: v
+        for k, v in vectorizer.get_params().items()
+        if k in ("lowercase", "ngram_range", "token_pattern", "analyzer", "norm", "sublinear_tf")
+    }
+    return {
+        "format": "compact",
+        "calibration": pipeline.get("calibration", {}),
+        "thresholds": pipeline.get("thresholds", {}),
+        "vectorizer_params": params,
+        "vocabulary": [str(t) for t in terms[kept]],
+        "idf": vectorizer.idf_[kept].astype(np.float32),
+        **{
+            f"clf_{name}": {
+                "classes": [str(c) for c in h.classes_],
+                "coef": h.coef_[:, kept].astype(dtype),
+                "intercept": h.intercept_.astype(np.float32),
+            }
+            for name, h in heads.items()
+        },
+    }
+
+
+def _compact_vectorizer(data: dict) -> TfidfVectorizer:
+    vectorizer = TfidfVectorizer(
+        vocabulary={t: i for i, t in enumerate(data["vocabulary"])},
+        dtype=np.float32,
+        **data["vectorizer_params"],
+    )
+    vectorizer.idf_ = np.asarray(data["idf"], dtype=np.float64)
+    return vectorizer
+
+
 class MTLClassifier:
     """Load and run MTL model: redacted text → intent, suggested_queue, confidence."""
 
@@ -117,9 +547,7 @@ class MTLClassifier:
         self, model_path: Optional[Path] = None, pipeline: Optional[dict] = None
     ):
         if pipeline is not None:
-            self._vectorizer = pipeline["vectorizer"]
-            self._clf_intent = pipeline["clf_intent"]
-            self._clf_queue = pipeline["clf_queue"]
+            self._load(pipeline)
             self._model_path = model_path
             return
         path = model_path or DEFAULT_MODEL_DIR / MODEL_FILE
@@ -128,33 +556,138 @@ class MTLClassifier:
             raise FileNotFoundError(
                 f"Model not found: {path}. Run train() first or use backend='stub'."
             )
-        data = joblib.load(path)
+        self._load(joblib.load(path))
+        self._model_path = path
+
+    def _load(self, data: dict) -> None:
+        """Full artifact (sklearn objects) or compact artifact (pruned vocabulary, small floats)."""
+        # Older artifacts have neither: uncalibrated confidence, global draft threshold
+        self._calibration = data.get("calibration", {})
+        self.thresholds: dict[str, float] = data.get("thresholds", {})
+        if data.get("format") == "compact":
+            self._vectorizer = _compact_vectorizer(data)
+            self._clf_intent = _CompactHead(data["clf_intent"])
+            self._clf_queue = _CompactHead(data["clf_queue"])
+            return
         self._vectorizer = data["vectorizer"]
         self._clf_intent = data["clf_intent"]
         self._clf_queue = data["clf_queue"]
-        self._model_path = path
+
+    @property
+    def calibration(self) -> dict[str, float]:
+        """Fitted temperature per head ({} or missing heads: uncalibrated)."""
+        return dict(self._calibration)
 
     def predict(self, redacted_text: str) -> ClassificationResult:
-        """Predict intent and suggested_queue; confidence from max probability."""
+        """Predict intent and suggested_queue; confidence from calibrated max probability."""
         X = self._vectorizer.transform([redacted_text])
-        intent = self._clf_intent.predict(X)[0]
-        queue = self._clf_queue.predict(X)[0]
-        prob_intent = self._clf_intent.predict_proba(X).max()
-        prob_queue = self._clf_queue.predict_proba(X).max()
-        confidence = float(min(prob_intent, prob_queue))
+        intents, queues, confidence = calibrated_predict(
+            self._clf_intent, self._clf_queue, X, self._calibration
+        )
+        intent = str(intents[0])
         return ClassificationResult(
-            intent=str(intent),
-            suggested_queue=str(queue),
-            confidence=confidence,
+            intent=intent,
+            suggested_queue=str(queues[0]),
+            confidence=float(confidence[0]),
+            threshold=self.thresholds.get(intent),
         )
 
 
+# Loaded classifiers by (resolved path, mtime, size): per-message classify() reuses one load
+_loaded: dict[tuple[str, int, int], MTLClassifier] = {}
+_loaded_lock = threading.Lock()
+
+
 def load_or_train(
     messages_path: Path, model_path: Optional[Path] = None
 ) -> MTLClassifier:
-    """Load existing model from model_path; if missing, train and save."""
+    """
+    Load existing model from model_path; if missing, train and save.
+    A loaded model is kept and reused until its file changes on disk (see clear_loaded_models).
+    """
     path = model_path or DEFAULT_MODEL_DIR / MODEL_FILE
     path = Path(path)
     if path.exists():
-        return MTLClassifier(model_path=path)
+        st = path.stat()
+        key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+        with _loaded_lock:
+            clf = _loaded.get(key)
+            if clf is None:
+                clf = MTLClassifier(model_path=path)
+                # keep only the current version of each path
+                for old in [k for k in _loaded if k[0] == key[0]]:
+                    del _loaded[old]
+                _loaded[key] = clf
+        return clf
     return train(messages_path, model_path=path)
+
+
+def clear_loaded_models() -> None:
+    """Forget models kept by load_or_train (the next call loads from disk)."""
+    with _loaded_lock:
+        _loaded.clear()
+
+
+def train_compact(
+    model_path: Path,
+    compact_path: Optional[Path] = None,
+    keep_ratio: float = 0.5,
+    dtype: str = "float16",
+) -> Path:
+    """
+    Write the compact variant of the full artifact at model_path; returns its path.
+    Dumped uncompressed like the full artifact, so their sizes compare pruning and dtype only.
+    """
+    compact_path = Path(compact_path or Path(model_path).with_name(COMPACT_MODEL_FILE))
+    compact_path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(
+        compact_pipeline(joblib.load(model_path), keep_ratio=keep_ratio, dtype=dtype),
+        compact_path,
+    )
+    return compact_path
+
+
+def compare_models(
+    full_path: Path,
+    compact_path: Path,
+    messages_path: Path,
+    train_ratio: float = 1.0,
+) -> list[dict]:
+    """
+    Accuracy (holdout when train_ratio < 1, else all rows), artifact size on disk and after
+    zlib (level 3, the same for both), load time and median per-message latency for the full
+    and compact artifacts.
+    """
+    df = _load_training_frame(messages_path)
+    if 0 < train_ratio < 1:
+        _, df = _split(df, train_ratio)
+    X, y_intent, y_queue = _targets(df)
+    texts = list(X)
+    report = []
+    for name, path in (("full", Path(full_path)), ("compact", Path(compact_path))):
+        t0 = time.perf_counter()
+        clf = MTLClassifier(model_path=path)
+        load_ms = 1000 * (time.perf_counter() - t0)
+        latencies = []
+        preds = []
+        for t in texts:
+            t0 = time.perf_counter()
+            preds.append(clf.predict(t))
+            latencies.append(time.perf_counter() - t0)
+        n = len(texts) or 1
+        report.append(
+            {
+                "model": name,
+                "intent_accuracy": sum(p.intent == y for p, y in zip(preds, y_intent)) / n,
+                "queue_accuracy": sum(
+                    p.suggested_queue == y for p, y in zip(preds, y_queue)
+                )
+                / n,
+                "size_kb": round(path.stat().st_size / 1024, 1),
+                "size_kb_zlib": round(len(zlib.compress(path.read_bytes(), 3)) / 1024, 1),
+                "vocabulary": len(clf._vectorizer.vocabulary_),
+                "load_ms": round(load_ms, 2),
+                "latency_us_p50": round(1e6 * float(np.median(latencies or [0.0])), 1),
+            }
+        )
+    return report
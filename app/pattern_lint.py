@@ -0,0 +1,274 @@
+"""
+ReDoS safety for PII patterns: static linter for super-linear regex constructs and a fuzz
+benchmark that measures worst-case redaction latency per configured pattern.
+
+Run: python -m app.pattern_lint [--data-dir DIR] [--sizes 1000 10000 50000]
+"""
+
+import argparse
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+try:  # Python 3.11+
+    from re import _constants as _sre_constants
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants as _sre_constants
+    import sre_parse as _sre_parse
+
+MAXREPEAT = _sre_constants.MAXREPEAT
+# Bounded repeats above this count are treated like unbounded ones
+LARGE_REPEAT = 100
+_ASCII = [chr(i) for i in range(128)]
+_REPEATS = ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+
+
+@dataclass
+class LintFinding:
+    """One lint result: severity "error" (reject), "warning" (warn at load) or "info" (report only)."""
+
+    rule: str
+    severity: str
+    detail: str
+
+
+def _category_chars(cat: str) -> set[str]:
+    tests = {
+        "DIGIT": str.isdigit,
+        "SPACE": str.isspace,
+        "WORD": lambda c: c.isalnum() or c == "_",
+        "LINEBREAK": lambda c: c == "\n",
+    }
+    negate = "NOT_" in cat
+    base = next((f for k, f in tests.items() if cat.endswith(k)), None)
+    if base is None:
+        return set(_ASCII)
+    return {c for c in _ASCII if bool(base(c)) != negate}
+
+
+def _in_chars(items) -> set[str]:
+    chars: set[str] = set()
+    negate = False
+    for op, av in items:
+        name = str(op)
+        if name == "NEGATE":
+            negate = True
+        elif name == "LITERAL":
+            chars.add(chr(av))
+        elif name == "RANGE":
+            chars.update(chr(i) for i in range(av[0], min(av[1], 127) + 1))
+        elif name == "CATEGORY":
+            chars |= _category_chars(str(av))
+    return set(_ASCII) - chars if negate else chars
+
+
+def _chars(seq, ignorecase: bool) -> set[str]:
+    """Over-approximation of the ASCII characters a subpattern can consume."""
+    out: set[str] = set()
+    for op, av in seq:
+        name = str(op)
+        if name == "LITERAL":
+            out.add(chr(av) if av < 128 else "\x7f")
+        elif name == "NOT_LITERAL" or name == "ANY":
+            out |= set(_ASCII)
+        elif name == "IN":
+            out |= _in_chars(av)
+        elif name in _REPEATS:
+            out |= _chars(av[2], ignorecase)
+        elif name == "SUBPATTERN":
+            out |= _chars(av[3], ignorecase)
+        elif name == "ATOMIC_GROUP":
+            out |= _chars(av, ignorecase)
+        elif name == "BRANCH":
+            for branch in av[1]:
+                out |= _chars(branch, ignorecase)
+        elif name == "GROUPREF":
+            out |= set(_ASCII)
+    if ignorecase:
+        out |= {c.swapcase() for c in out}
+    return out
+
+
+def _is_big(lo_hi) -> bool:
+    return lo_hi[1] == MAXREPEAT or lo_hi[1] > LARGE_REPEAT
+
+
+def _walk(seq, ignorecase: bool, findings: list[LintFinding], under_big: bool) -> None:
+    prev_big: set[str] | None = None
+    for op, av in seq:
+        name = str(op)
+        if name in _REPEATS:
+            lo, hi, body = av
+            big = _is_big((lo, hi)) and name != "POSSESSIVE_REPEAT"
+            body_chars = _chars(body, ignorecase)
+            if big:
+                for inner in _big_repeats(body):
+                    inner_chars = _chars(inner, ignorecase)
+                    if inner_chars >= body_chars:
+                        findings.append(
+                            LintFinding(
+                                "nested_quantifier",
+                                "error",
+                                "unbounded repeat of a subpattern made of an unbounded repeat (e.g. (a+)+)",
+                            )
+                        )
+                    else:
+                        findings.append(
+                            LintFinding(
+                                "nested_quantifier",
+                                "warning",
+                                "unbounded repeat contains another unbounded repeat",
+                            )
+                        )
+                if prev_big is not None and prev_big & body_chars:
+                    findings.append(
+                        LintFinding(
+                            "adjacent_overlapping_repeats",
+                            "warning",
+                            "consecutive unbounded repeats over overlapping characters (e.g. \\d+\\d+)",
+                        )
+                    )
+                prev_big = body_chars
+            elif lo == 0 and prev_big is not None:
+                pass  # optional item between two repeats keeps them adjacent
+            else:
+                prev_big = None
+            _walk(body, ignorecase, findings, under_big or big)
+            continue
+        prev_big = None
+        if name == "SUBPATTERN":
+            _walk(av[3], ignorecase, findings, under_big)
+        elif name == "ATOMIC_GROUP":
+            _walk(av, ignorecase, findings, False)
+        elif name in ("ASSERT", "ASSERT_NOT"):
+            _walk(av[1], ignorecase, findings, under_big)
+        elif name == "BRANCH":
+            branches = av[1]
+            if under_big:
+                sets = [_chars(b[:1], ignorecase) for b in branches]
+                for i in range(len(sets)):
+                    for j in range(i + 1, len(sets)):
+                        if sets[i] & sets[j]:
+                            findings.append(
+                                LintFinding(
+                                    "overlapping_alternation",
+                                    "error",
+                                    "alternatives that can start with the same character inside an unbounded repeat",
+                                )
+                            )
+                            break
+            for b in branches:
+                _walk(b, ignorecase, findings, under_big)
+        elif name in ("GROUPREF", "GROUPREF_EXISTS"):
+            findings.append(
+                LintFinding("backreference", "warning", "backreferences can backtrack super-linearly")
+            )
+
+
+def _big_repeats(seq):
+    """Bodies of unbounded/large repeats anywhere inside seq."""
+    for op, av in seq:
+        name = str(op)
+        if name in _REPEATS:
+            if _is_big(av[:2]) and name != "POSSESSIVE_REPEAT":
+                yield av[2]
+            yield from _big_repeats(av[2])
+        elif name == "SUBPATTERN":
+            yield from _big_repeats(av[3])
+        elif name == "BRANCH":
+            for b in av[1]:
+                yield from _big_repeats(b)
+
+
+def lint_regex(regex: str) -> list[LintFinding]:
+    """Static check for constructs with super-linear (catastrophic) backtracking."""
+    try:
+        parsed = _sre_parse.parse(regex)
+    except re.error as exc:
+        # redact() skips patterns that do not compile; surface it without rejecting the file
+        return [LintFinding("invalid_regex", "warning", str(exc))]
+    ignorecase = bool(parsed.state.flags & re.IGNORECASE)
+    findings: list[LintFinding] = []
+    seq = list(parsed)
+    _walk(seq, ignorecase, findings, under_big=False)
+    if seq and str(seq[0][0]) in _REPEATS and _is_big(seq[0][1][:2]):
+        findings.append(
+            LintFinding(
+                "leading_unbounded_repeat",
+                "info",
+                "unanchored search retries the repeat from every offset: quadratic on long runs",
+            )
+        )
+    # de-duplicate (same rule + severity reported once)
+    seen = set()
+    unique = []
+    for f in findings:
+        if (f.rule, f.severity) not in seen:
+            seen.add((f.rule, f.severity))
+            unique.append(f)
+    return unique
+
+
+def _pump_strings(regex: str, size: int) -> list[str]:
+    """Adversarial inputs: long runs of characters the pattern consumes, ending in a mismatch."""
+    try:
+        chars = sorted(_chars(list(_sre_parse.parse(regex)), False))
+    except re.error:
+        return []
+    printable = [c for c in chars if c.isprintable()] or ["a"]
+    samples = []
+    for c in printable[:: max(1, len(printable) // 6)][:6]:
+        samples.append(c * size + "\x00")
+    cycle = "".join(printable)
+    samples.append((cycle * (size // max(1, len(cycle)) + 1))[:size] + "\x00")
+    return samples
+
+
+def fuzz_pattern(regex: str, sizes=(1000, 10000, 50000), budget_s: float = 1.0) -> dict:
+    """
+    Worst-case re.sub latency of regex over pumped adversarial inputs of each size.
+    Returns {size: worst_seconds}; a size whose worst case exceeds budget_s stops the run
+    (larger sizes would only be slower).
+    """
+    from app.redact import RedactionBudgetExceeded, redact_with_budget
+
+    rx_pattern = [{"regex": regex, "mask": "[X]"}]
+    worst: dict[int, float] = {}
+    for size in sizes:
+        worst[size] = 0.0
+        for s in _pump_strings(regex, size):
+            t0 = time.perf_counter()
+            try:
+                redact_with_budget(s, rx_pattern, budget_s=budget_s, on_timeout="raise")
+            except RedactionBudgetExceeded:
+                worst[size] = float("inf")
+                return worst
+            worst[size] = max(worst[size], time.perf_counter() - t0)
+    return worst
+
+
+def main() -> None:
+    from app.config import DEFAULT_DATA_DIR
+    from app.redact import load_patterns
+
+    p = argparse.ArgumentParser(description="Lint and fuzz PII regex patterns for ReDoS")
+    p.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    p.add_argument("--budget-ms", type=float, default=1000.0)
+    args = p.parse_args()
+    patterns = load_patterns(args.data_dir / "pii_patterns.yaml", lint="off")
+    for pat in patterns:
+        findings = lint_regex(pat["regex"])
+        worst = fuzz_pattern(pat["regex"], args.sizes, budget_s=args.budget_ms / 1000)
+        lint = ", ".join(f"{f.severity}:{f.rule}" for f in findings) or "clean"
+        timing = "  ".join(
+            f"{size}={'TIMEOUT' if t == float('inf') else f'{1000 * t:.2f}ms'}"
+            for size, t in worst.items()
+        )
+        print(f"{pat.get('name', pat['regex'])}: lint={lint}  worst-case: {timing}")
+
+
+if __name__ == "__main__":
+    main()
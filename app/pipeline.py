@@ -0,0 +1,263 @@
+"""
+Staged pipeline runner: overlaps CPU work (redact, classify) with LLM I/O (drafting).
+
+    feed ─▶ [q_cpu] ─▶ cpu pool (N threads) ─▶ [q_draft] ─▶ async draft stage ─▶ [q_check] ─▶ checks
+             bounded                              bounded    (M drafts in flight)    bounded
+
+Queues are bounded, so a fast stage blocks on put (backpressure) instead of piling up work
+in memory. The draft stage is an asyncio loop that keeps up to M blocking draft calls in
+flight on its own executor; guardrail checks run on each draft as soon as it completes.
+Results come back in input order. Per stage: items, busy time, utilisation (busy / (workers
+× wall)), time blocked on a full downstream queue, and sampled queue depth (mean / max).
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+DEFAULT_CPU_WORKERS = 4
+DEFAULT_DRAFT_CONCURRENCY = 16
+DEFAULT_QUEUE_SIZE = 32
+QUEUE_SAMPLE_S = 0.005
+_DONE = object()  # end-of-stream marker passed down the queues
+
+
+@dataclass
+class StageStats:
+    workers: int = 1
+    items: int = 0
+    busy_s: float = 0.0
+    blocked_s: float = 0.0  # waiting for room in the downstream queue (backpressure)
+
+    def as_dict(self, wall_s: float) -> dict:
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "busy_s": round(self.busy_s, 4),
+            "utilisation": round(self.busy_s / (self.workers * wall_s), 4) if wall_s else 0.0,
+            "blocked_s": round(self.blocked_s, 4),
+        }
+
+
+@dataclass
+class QueueStats:
+    maxsize: int = 0
+    samples: int = 0
+    depth_sum: int = 0
+    max_depth: int = 0
+
+    def sample(self, depth: int) -> None:
+        self.samples += 1
+        self.depth_sum += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def as_dict(self) -> dict:
+        return {
+            "maxsize": self.maxsize,
+            "mean_depth": round(self.depth_sum / self.samples, 2) if self.samples else 0.0,
+            "max_depth": self.max_depth,
+        }
+
+
+@dataclass
+class PipelineStats:
+    wall_s: float = 0.0
+    stages: dict[str, StageStats] = field(default_factory=dict)
+    queues: dict[str, QueueStats] = field(default_factory=dict)
+
+    def merge(self, other: "PipelineStats") -> None:
+        """Add another run's stats (e.g. one per checkpoint chunk) into this one."""
+        self.wall_s += other.wall_s
+        for name, s in other.stages.items():
+            mine = self.stages.setdefault(name, StageStats(workers=s.workers))
+            mine.items += s.items
+            mine.busy_s += s.busy_s
+            mine.blocked_s += s.blocked_s
+        for name, q in other.queues.items():
+            mine_q = self.queues.setdefault(name, QueueStats(maxsize=q.maxsize))
+            mine_q.samples += q.samples
+            mine_q.depth_sum += q.depth_sum
+            mine_q.max_depth = max(mine_q.max_depth, q.max_depth)
+
+    def as_dict(self) -> dict:
+        return {
+            "wall_s": round(self.wall_s, 4),
+            "throughput_msg_s": (
+                round(self.stages["check"].items / self.wall_s, 2) if self.wall_s else 0.0
+            ),
+            "stages": {k: s.as_dict(self.wall_s) for k, s in self.stages.items()},
+            "queues": {k: q.as_dict() for k, q in self.queues.items()},
+        }
+
+
+class StagedPipeline:
+    """
+    Runs items through cpu_fn → draft_fn → check_fn with bounded queues between stages.
+    - cpu_fn(item) -> a: redact + classify (run on cpu_workers threads).
+    - draft_fn(a) -> b: blocking draft call (up to draft_concurrency in flight).
+    - check_fn(b) -> result: guardrails, run as each draft completes.
+    """
+
+    def __init__(
+        self,
+        cpu_fn: Callable[[Any], Any],
+        draft_fn: Callable[[Any], Any],
+        check_fn: Callable[[Any], Any],
+        cpu_workers: int = DEFAULT_CPU_WORKERS,
+        draft_concurrency: int = DEFAULT_DRAFT_CONCURRENCY,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        self.cpu_fn = cpu_fn
+        self.draft_fn = draft_fn
+        self.check_fn = check_fn
+        self.cpu_workers = max(1, cpu_workers)
+        self.draft_concurrency = max(1, draft_concurrency)
+        self.queue_size = max(1, queue_size)
+        self.stats = PipelineStats()
+
+    def run(
+        self, items: Iterable[Any], on_result: Optional[Callable[[int, Any], None]] = None
+    ) -> list[Any]:
+        """Process items; returns results in input order. on_result(index, result) per completion."""
+        q_cpu: queue.Queue = queue.Queue(self.queue_size)
+        q_draft: queue.Queue = queue.Queue(self.queue_size)
+        q_check: queue.Queue = queue.Queue(self.queue_size)
+        queues = {"cpu": q_cpu, "draft": q_draft, "check": q_check}
+        st = self.stats = PipelineStats(
+            stages={
+                "feed": StageStats(),
+                "cpu": StageStats(workers=self.cpu_workers),
+                "draft": StageStats(workers=self.draft_concurrency),
+                "check": StageStats(),
+            },
+            queues={k: QueueStats(maxsize=self.queue_size) for k in queues},
+        )
+        lock = threading.Lock()
+        results: dict[int, Any] = {}
+        errors: list[BaseException] = []
+        stop_sampling = threading.Event()
+
+        def put(q: queue.Queue, value: Any, stage: str) -> None:
+            t0 = time.perf_counter()
+            q.put(value)
+            with lock:
+                st.stages[stage].blocked_s += time.perf_counter() - t0
+
+        def timed(stage: str, fn: Callable, arg: Any) -> Any:
+            t0 = time.perf_counter()
+            try:
+                return fn(arg)
+            finally:
+                with lock:
+                    st.stages[stage].busy_s += time.perf_counter() - t0
+                    st.stages[stage].items += 1
+
+        def feed() -> None:
+            try:
+                for i, item in enumerate(items):
+                    if errors:
+                        break
+                    put(q_cpu, (i, item), "feed")
+                    with lock:
+                        st.stages["feed"].items += 1
+            except BaseException as exc:
+                errors.append(exc)
+            finally:
+                for _ in range(self.cpu_workers):
+                    q_cpu.put(_DONE)
+
+        def cpu_worker() -> None:
+            try:
+                while (job := q_cpu.get()) is not _DONE:
+                    i, item = job
+                    if not errors:
+                        put(q_draft, (i, timed("cpu", self.cpu_fn, item)), "cpu")
+            except BaseException as exc:  # surfaced to the caller after shutdown
+                errors.append(exc)
+                while q_cpu.get() is not _DONE:  # drain so the feeder can finish
+                    pass
+            finally:
+                q_draft.put(_DONE)
+
+        def draft_stage() -> None:
+            executor = ThreadPoolExecutor(
+                max_workers=self.draft_concurrency, thread_name_prefix="draft"
+            )
+
+            async def main() -> None:
+                loop = asyncio.get_running_loop()
+                sem = asyncio.Semaphore(self.draft_concurrency)
+                tasks: set[asyncio.Task] = set()
+
+                async def one(i: int, a: Any) -> None:
+                    try:
+                        b = await loop.run_in_executor(executor, timed, "draft", self.draft_fn, a)
+                        await loop.run_in_executor(executor, put, q_check, (i, b), "draft")
+                    except BaseException as exc:
+                        errors.append(exc)
+                    finally:
+                        sem.release()
+
+                finished = 0
+                while finished < self.cpu_workers:
+                    job = await loop.run_in_executor(None, q_draft.get)
+                    if job is _DONE:
+                        finished += 1
+                        continue
+                    await sem.acquire()  # at most draft_concurrency in flight
+                    task = asyncio.create_task(one(*job))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*tasks)
+
+            try:
+                asyncio.run(main())
+            finally:
+                executor.shutdown(wait=True)
+                q_check.put(_DONE)
+
+        def check_worker() -> None:
+            while (job := q_check.get()) is not _DONE:
+                i, b = job
+                try:
+                    result = timed("check", self.check_fn, b)
+                except BaseException as exc:
+                    errors.append(exc)
+                    continue
+                results[i] = result
+                if on_result is not None:
+                    on_result(i, result)
+
+        def sample_queues() -> None:
+            while not stop_sampling.wait(QUEUE_SAMPLE_S):
+                with lock:
+                    for name, q in queues.items():
+                        st.queues[name].sample(q.qsize())
+
+        t0 = time.perf_counter()
+        threads = [
+            threading.Thread(target=feed, name="pipeline-feed"),
+            *(
+                threading.Thread(target=cpu_worker, name=f"pipeline-cpu-{n}")
+                for n in range(self.cpu_workers)
+            ),
+            threading.Thread(target=draft_stage, name="pipeline-draft"),
+            threading.Thread(target=check_worker, name="pipeline-check"),
+        ]
+        sampler = threading.Thread(target=sample_queues, name="pipeline-sampler", daemon=True)
+        sampler.start()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stop_sampling.set()
+        sampler.join()
+        st.wall_s = time.perf_counter() - t0
+        if errors:
+            raise errors[0]
+        return [results[i] for i in sorted(results)]
@@ -0,0 +1,324 @@
+"""
+Profile run_pipeline: CPU time and allocations per stage, flamegraph stacks, top allocations.
+
+Runs the batch pipeline quietly over N messages (or a synthetic corpus), after one untraced
+warm-up message so lazy imports, model unpickling and client setup are not charged to
+whichever stage happens to run first:
+- timing pass: a sampling profiler on the pipeline thread → collapsed stacks (flamegraph.pl /
+  speedscope) and wall time per stage for redact, classify, draft_from_policy and
+  run_draft_checks;
+- allocation pass (separate, as tracemalloc slows every allocation): per-stage peak/retained
+  allocation and a top-N allocation report.
+Run: python -m app profile [N] [--synthetic N] [--backend stub|mtl|llm] [--mock-llm]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.config import DEFAULT_DATA_DIR
+
+# Pipeline stage → app.run attributes attributed to it (batch variants count as the same stage);
+# redaction is timed at run._redact, which covers both redact() and the REDACT_BUDGET_MS path
+STAGES = {
+    "redact": ("_redact",),
+    "classify": ("classify", "classify_batch"),
+    "draft_from_policy": ("draft_from_policy", "draft_batch_from_policy"),
+    "run_draft_checks": ("run_draft_checks",),
+}
+DEFAULT_OUT_DIR = Path("profile_out")
+SAMPLE_INTERVAL_S = 0.001
+# tracemalloc frames kept per allocation: enough to name the caller, cheap enough to run
+TRACEMALLOC_DEPTH = 5
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    total_s: float = 0.0
+    alloc_peak_bytes: int = 0  # largest transient allocation during one call
+    alloc_retained_bytes: int = 0  # net bytes still held after calls (summed)
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval; counts collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval_s: float = SAMPLE_INTERVAL_S):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path: Path) -> None:
+        """Brendan Gregg collapsed format: 'frame;frame;frame count' per line."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def instrument_stages(stats: dict[str, StageStats]) -> Iterator[None]:
+    """Wrap the stage functions used by app.run with timers and allocation accounting."""
+    import app.run as run_module
+
+    originals = {}
+
+    def wrap(stage: str, fn):
+        def timed(*args, **kwargs):
+            tracing = tracemalloc.is_tracing()
+            if tracing:
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                st = stats.setdefault(stage, StageStats())
+                st.calls += 1
+                st.total_s += time.perf_counter() - t0
+                if tracing:
+                    current, peak = tracemalloc.get_traced_memory()
+                    st.alloc_peak_bytes = max(st.alloc_peak_bytes, peak - before)
+                    st.alloc_retained_bytes += current - before
+
+        return timed
+
+    for stage, attrs in STAGES.items():
+        for attr in attrs:
+            fn = getattr(run_module, attr)
+            originals[attr] = fn
+            setattr(run_module, attr, wrap(stage, fn))
+    try:
+        yield
+    finally:
+        for attr, fn in originals.items():
+            setattr(run_module, attr, fn)
+
+
+def write_synthetic_corpus(data_dir: Path, n: int, out_path: Path, seed: int = 0) -> Path:
+    """n messages sampled from messages.csv with random card/email/sort-code PII appended."""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    base = pd.read_csv(data_dir / "messages.csv")
+    rows = base.sample(n=n, replace=True, random_state=seed).reset_index(drop=True)
+
+    def pii() -> str:
+        card = " ".join(f"{rng.randint(0, 9999):04d}" for _ in range(4))
+        return rng.choice(
+            [
+                f" My card is {card}.",
+                f" Email me at user{rng.randint(1, 999)}@example.com.",
+                f" Sort code {rng.randint(10, 99)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}.",
+                "",
+            ]
+        )
+
+    rows["text"] = [str(t) + pii() for t in rows["text"]]
+    rows["message_id"] = [f"SYN{i:07d}" for i in range(n)]
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    rows.to_csv(out_path, index=False)
+    return out_path
+
+
+def _warm_up(messages_path: Path, data_dir: Path) -> None:
+    """One-time costs outside the measured passes: LLM client, model, KB, one message."""
+    from app.llm import get_llm_client, is_available
+    from app.run import run_pipeline
+
+    if is_available():
+        get_llm_client()._get_openai()  # imports openai and opens the HTTP client
+    run_pipeline(messages_path, data_dir, limit=1, quiet=True)
+
+
+def profile_pipeline(
+    messages_path: Path,
+    data_dir: Path,
+    limit: Optional[int],
+    out_dir: Path = DEFAULT_OUT_DIR,
+    top_n: int = 20,
+    trace_allocations: bool = True,
+) -> dict:
+    """
+    Warm up, then a timed run under the sampler and (trace_allocations) a separate run under
+    tracemalloc; write outputs; return a summary. Stage times come from the timing pass only.
+    """
+    from app.run import run_pipeline
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    _warm_up(messages_path, data_dir)
+    stats: dict[str, StageStats] = {}
+    sampler = StackSampler(threading.get_ident()).start()
+    t0 = time.perf_counter()
+    try:
+        with instrument_stages(stats):
+            rows = run_pipeline(messages_path, data_dir, limit=limit, quiet=True)
+    finally:
+        wall_s = time.perf_counter() - t0
+        sampler.stop()
+    snapshot = None
+    alloc_wall_s = 0.0
+    if trace_allocations:
+        alloc_stats: dict[str, StageStats] = {}
+        tracemalloc.start(TRACEMALLOC_DEPTH)
+        t0 = time.perf_counter()
+        try:
+            with instrument_stages(alloc_stats):
+                run_pipeline(messages_path, data_dir, limit=limit, quiet=True)
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            alloc_wall_s = time.perf_counter() - t0
+            tracemalloc.stop()
+        for stage, a in alloc_stats.items():
+            st = stats.setdefault(stage, StageStats())
+            st.alloc_peak_bytes = a.alloc_peak_bytes
+            st.alloc_retained_bytes = a.alloc_retained_bytes
+
+    stacks_path = out_dir / "stacks.collapsed"
+    sampler.write_collapsed(stacks_path)
+    alloc_path = out_dir / "allocations.txt"
+    with open(alloc_path, "w", encoding="utf-8") as f:
+        if snapshot is None:
+            f.write("tracemalloc disabled\n")
+        else:
+            f.write(f"Top {top_n} retained allocations by line\n")
+            for stat in snapshot.statistics("lineno")[:top_n]:
+                f.write(f"{stat}\n")
+            f.write(f"\nTop {top_n} retained allocations by traceback\n")
+            for stat in snapshot.statistics("traceback")[:top_n]:
+                f.write(f"\n{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+                for line in stat.traceback.format(limit=TRACEMALLOC_DEPTH):
+                    f.write(f"{line}\n")
+    return {
+        "messages": len(rows),
+        "wall_s": wall_s,
+        "alloc_wall_s": alloc_wall_s,
+        "samples": sum(sampler.stacks.values()),
+        "stages": stats,
+        "stacks_path": stacks_path,
+        "allocations_path": alloc_path,
+    }
+
+
+def _print_summary(summary: dict) -> None:
+    wall = summary["wall_s"] or 1e-9
+    n = summary["messages"] or 1
+    print(
+        f"Profiled {summary['messages']} messages in {summary['wall_s']:.3f}s "
+        f"({summary['samples']} stack samples; timings exclude warm-up and tracemalloc)"
+    )
+    print(
+        f"  {'stage':<18}{'calls':>7}{'total_s':>10}{'ms/msg':>9}{'share':>8}"
+        f"{'peak_kb':>10}{'retained_kb':>13}"
+    )
+    for stage in STAGES:
+        st = summary["stages"].get(stage, StageStats())
+        print(
+            f"  {stage:<18}{st.calls:>7}{st.total_s:>10.3f}{1000 * st.total_s / n:>9.3f}"
+            f"{st.total_s / wall:>8.1%}{st.alloc_peak_bytes / 1024:>10.1f}"
+            f"{st.alloc_retained_bytes / 1024:>13.1f}"
+        )
+    if summary["alloc_wall_s"]:
+        print(f"Allocation pass (tracemalloc, separate run): {summary['alloc_wall_s']:.3f}s")
+    print(f"Collapsed stacks (flamegraph input): {summary['stacks_path']}")
+    print(f"Allocation report: {summary['allocations_path']}")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    p = argparse.ArgumentParser(
+        prog="app profile", description="Profile the batch pipeline per stage"
+    )
+    p.add_argument("n", nargs="?", type=int, default=100, help="Messages to run (default: 100)")
+    p.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    p.add_argument(
+        "--synthetic",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Generate an N-message synthetic corpus (with PII) instead of messages.csv",
+    )
+    p.add_argument("--backend", choices=("stub", "mtl", "llm"), default=None)
+    p.add_argument(
+        "--mock-llm",
+        action="store_true",
+        help="Enable LLM drafting against the local mock server (no network, no cost)",
+    )
+    p.add_argument("--out", type=Path, default=DEFAULT_OUT_DIR)
+    p.add_argument("--top", type=int, default=20, help="Top-N allocations to report")
+    p.add_argument(
+        "--no-tracemalloc",
+        action="store_true",
+        help="Skip the separate tracemalloc allocation pass",
+    )
+    args = p.parse_args(argv)
+
+    if args.backend:
+        os.environ["CLASSIFY_BACKEND"] = args.backend
+    messages_path = args.data_dir / "messages.csv"
+    limit: Optional[int] = args.n
+    if args.synthetic:
+        messages_path = write_synthetic_corpus(
+            args.data_dir, args.synthetic, args.out / "synthetic_messages.csv"
+        )
+        limit = None
+
+    server = None
+    if args.mock_llm:
+        from app.llm import reset_llm_client
+        from app.mock_llm import MockLLMServer
+
+        server = MockLLMServer().start()
+        os.environ.update(
+            {
+                "USE_LLM": "1",
+                "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "mock-key",
+                "LLM_BASE_URL": server.base_url,
+            }
+        )
+        reset_llm_client()
+    try:
+        summary = profile_pipeline(
+            messages_path,
+            args.data_dir,
+            limit,
+            out_dir=args.out,
+            top_n=args.top,
+            trace_allocations=not args.no_tracemalloc,
+        )
+    finally:
+        if server is not None:
+            server.stop()
+    _print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Draft prompt construction: a deterministic, cache-friendly prefix and a token budget.
+
+Every draft request starts with the same system message (no kb_key or other per-request
+text), then one message holding the policy for the kb_key, then the customer message(s).
+Requests for the same kb_key therefore share their whole prefix up to the customer text,
+which provider-side prompt caching can reuse. When the prompt would exceed the budget, the
+policy is trimmed to its sections most relevant to the customer text (kept in file order);
+the most relevant section is always kept, and an over-long customer message is truncated
+to make room for it.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+
+from app.llm import estimate_tokens
+
+# Prompt tokens per draft request (system + policy + customer text) unless DRAFT_PROMPT_TOKENS is set
+DEFAULT_PROMPT_BUDGET = 400
+# Least customer text kept when the budget cannot even fit the top policy section
+MIN_CUSTOMER_TOKENS = 32
+_TRUNCATED = " [truncated]"
+
+DRAFT_SYSTEM = (
+    "You are a helpful banking assistant. Reply to the customer in 2–4 short sentences. "
+    "Use ONLY the policy provided; do not invent steps. Include exactly one citation of the "
+    "policy, written exactly as the policy's citation tag."
+)
+_WORD = re.compile(r"[a-z]+")
+# Words too common to signal which policy section is relevant
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from have i if in is it me my of on or our "
+    "please so that the this to was we what when where which who will with you your".split()
+)
+
+
+def prompt_budget() -> int:
+    try:
+        return int(os.environ.get("DRAFT_PROMPT_TOKENS", "") or DEFAULT_PROMPT_BUDGET)
+    except ValueError:
+        return DEFAULT_PROMPT_BUDGET
+
+
+@dataclass
+class DraftPrompt:
+    """Chat messages of one draft request plus how the policy was fitted to the budget."""
+
+    messages: list[dict] = field(default_factory=list)
+    prompt_tokens: int = 0  # estimated
+    policy_sections: int = 0
+    sections_kept: int = 0
+
+    @property
+    def trimmed(self) -> bool:
+        return self.sections_kept < self.policy_sections
+
+    @property
+    def prefix(self) -> list[dict]:
+        """Messages shared by every request for this kb_key (everything before the customer text)."""
+        return self.messages[:-1]
+
+
+def policy_sections(policy: str) -> tuple[str, list[str]]:
+    """(header, sections): leading heading/intro lines, then one section per top-level bullet or heading."""
+    header: list[str] = []
+    sections: list[list[str]] = []
+    for line in policy.strip().splitlines():
+        starts_section = line.startswith(("- ", "* ", "#")) and (sections or line[0] != "#")
+        if starts_section:
+            sections.append([line])
+        elif sections:
+            sections[-1].append(line)
+        else:
+            header.append(line)
+    return "\n".join(header).strip(), ["\n".join(s).rstrip() for s in sections]
+
+
+def _terms(text: str) -> set[str]:
+    return {w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS and len(w) > 2}
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """text unchanged if within max_tokens, else cut at a word boundary and marked [truncated]."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[: max(0, max_tokens * 4 - len(_TRUNCATED))]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip() + _TRUNCATED
+
+
+def trim_policy(policy: str, query: str, budget_tokens: int) -> tuple[str, int, int]:
+    """
+    Policy within budget_tokens: unchanged if it fits, else the header plus the sections with
+    most term overlap with query (ties: earlier first), in their original order. The top-ranked
+    section is kept even over budget; callers make room by truncating the customer text.
+    Returns (text, sections_total, sections_kept).
+    """
+    header, sections = policy_sections(policy)
+    if estimate_tokens(policy) <= budget_tokens or not sections:
+        return policy, len(sections), len(sections)
+    q = _terms(query)
+    ranked = sorted(range(len(sections)), key=lambda i: (-len(q & _terms(sections[i])), i))
+    used = estimate_tokens(header)
+    keep: list[int] = []
+    for rank, i in enumerate(ranked):
+        cost = estimate_tokens(sections[i]) + 1
+        if rank == 0 or used + cost <= budget_tokens:
+            keep.append(i)
+            used += cost
+    text = "\n".join(([header] if header else []) + [sections[i] for i in sorted(keep)])
+    return text, len(sections), len(keep)
+
+
+def _policy_message(policy: str, kb_key: str) -> dict:
+    return {"role": "system", "content": f"Policy (citation tag: [kb: {kb_key}]):\n{policy}"}
+
+
+def _customer_room(budget: int, policy: str, query: str, kb_key: str, user_overhead: int) -> int:
+    """Tokens left for customer text once the system, user framing and top policy section fit."""
+    floor_policy, _, _ = trim_policy(policy, query, 0)
+    used = (
+        estimate_tokens(DRAFT_SYSTEM)
+        + estimate_tokens(_policy_message(floor_policy, kb_key)["content"])
+        + user_overhead
+        + 1  # rounding when the customer text joins its framing
+    )
+    return max(MIN_CUSTOMER_TOKENS, budget - used)
+
+
+def build_draft_prompt(
+    customer_message: str,
+    policy_snippet: str,
+    kb_key: str,
+    budget_tokens: int | None = None,
+) -> DraftPrompt:
+    """
+    Static system, then policy for kb_key (trimmed to the budget), then the customer message
+    (truncated when it alone would crowd out the top policy section).
+    """
+    budget = prompt_budget() if budget_tokens is None else budget_tokens
+
+    def framed(text: str) -> str:
+        return f"Customer message:\n{text}\n\nDraft reply (cite the policy with [kb: {kb_key}]):"
+
+    query = customer_message
+    room = _customer_room(budget, policy_snippet, query, kb_key, estimate_tokens(framed("")))
+    user = framed(truncate_to_tokens(customer_message, room))
+    fixed = estimate_tokens(DRAFT_SYSTEM) + estimate_tokens(user) + estimate_tokens(
+        _policy_message("", kb_key)["content"]
+    )
+    policy, total, kept = trim_policy(policy_snippet, query, max(0, budget - fixed))
+    messages = [
+        {"role": "system", "content": DRAFT_SYSTEM},
+        _policy_message(policy, kb_key),
+        {"role": "user", "content": user},
+    ]
+    return DraftPrompt(
+        messages=messages,
+        prompt_tokens=sum(estimate_tokens(m["content"]) for m in messages),
+        policy_sections=total,
+        sections_kept=kept,
+    )
+
+
+def build_draft_batch_prompt(
+    items: list[tuple[str, str]],
+    policy_snippet: str,
+    kb_key: str,
+    budget_tokens: int | None = None,
+) -> DraftPrompt:
+    """
+    Batched variant with the same system and policy prefix; items are (id, redacted_text).
+    The budget covers the prefix plus one average customer message (the batch shares the policy);
+    each message is truncated as in build_draft_prompt.
+    """
+    budget = prompt_budget() if budget_tokens is None else budget_tokens
+    query = " ".join(t for _, t in items)
+    room = _customer_room(budget, policy_snippet, query, kb_key, 0)
+    items = [(i, truncate_to_tokens(t, room)) for i, t in items]
+    user = (
+        "Customer messages (JSON list of id and text); answer with one draft per id, each "
+        f"citing the policy with [kb: {kb_key}]:\n"
+        + json.dumps([{"id": i, "text": t} for i, t in items], ensure_ascii=False)
+    )
+    per_item = sum(estimate_tokens(t) for _, t in items) // max(1, len(items))
+    fixed = (
+        estimate_tokens(DRAFT_SYSTEM)
+        + estimate_tokens(_policy_message("", kb_key)["content"])
+        + per_item
+    )
+    policy, total, kept = trim_policy(policy_snippet, query, max(0, budget - fixed))
+    messages = [
+        {"role": "system", "content": DRAFT_SYSTEM},
+        _policy_message(policy, kb_key),
+        {"role": "user", "content": user},
+    ]
+    return DraftPrompt(
+        messages=messages,
+        prompt_tokens=sum(estimate_tokens(m["content"]) for m in messages),
+        policy_sections=total,
+        sections_kept=kept,
+    )
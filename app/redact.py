@@ -1,14 +1,46 @@
 """PII redaction: load patterns from YAML, replace matches with placeholders."""
 
+import os
 import re
+import signal
+import threading
+import warnings
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, Optional, TextIO, Union
 
 import yaml
 
+from app.deadline import Deadline
 
-def load_patterns(path: Path) -> list[dict[str, Any]]:
-    """Load PII patterns from pii_patterns.yaml. Returns list of {name, regex, mask}."""
+try:  # Python 3.11+
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+# Streaming: window for patterns with unbounded width (e.g. email; 254 = max address length)
+MAX_UNBOUNDED_MATCH = 254
+# Extra lookahead so assertions just past a match are still visible
+_WINDOW_SLACK = 16
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Fail-closed replacement for a message whose redaction exceeded its time budget
+QUARANTINE_MASK = "[QUARANTINED: redaction time budget exceeded]"
+
+
+class UnsafePatternError(ValueError):
+    """A PII pattern failed the ReDoS linter (super-linear backtracking construct)."""
+
+
+class RedactionBudgetExceeded(TimeoutError):
+    """Redaction of one message did not finish within its time budget."""
+
+
+def load_patterns(path: Path, lint: str = "strict") -> list[dict[str, Any]]:
+    """
+    Load PII patterns from pii_patterns.yaml. Returns list of {name, regex, mask}.
+    lint: "strict" raises UnsafePatternError on ReDoS errors and warns on warnings,
+    "warn" only warns, "off" skips the linter (see app/pattern_lint.py).
+    """
     if not path.exists():
         return []
     with open(path, encoding="utf-8") as f:
@@ -25,9 +57,24 @@ def load_patterns(path: Path) -> list[dict[str, Any]]:
                 "mask": str(p.get("mask", "[REDACTED]")).strip(),
             }
         )
+    if lint != "off":
+        _lint_patterns(out, strict=lint == "strict")
     return out
 
 
+def _lint_patterns(patterns: list[dict[str, Any]], strict: bool) -> None:
+    from app.pattern_lint import lint_regex
+
+    for p in patterns:
+        name = p.get("name", p["regex"])
+        for f in lint_regex(p["regex"]):
+            msg = f"PII pattern {name!r}: {f.rule} ({f.detail})"
+            if f.severity == "error" and strict:
+                raise UnsafePatternError(msg)
+            if f.severity in ("error", "warning"):
+                warnings.warn(msg, RuntimeWarning, stacklevel=3)
+
+
 def redact(text: str, patterns: list[dict[str, Any]]) -> str:
     """Apply each pattern: replace regex matches with pattern['mask']. Returns redacted text."""
     out = text
@@ -39,7 +86,234 @@ def redact(text: str, patterns: list[dict[str, Any]]) -> str:
     return out
 
 
+def _redact_with_alarm(text: str, patterns: list[dict[str, Any]], budget_s: float) -> str:
+    """Main thread on Unix: SIGALRM interrupts the regex engine (it polls for signals)."""
+
+    def _on_alarm(signum, frame):
+        raise RedactionBudgetExceeded(f"redaction exceeded {budget_s:.3f}s")
+
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, budget_s)
+    try:
+        return redact(text, patterns)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+# Idle redaction worker processes kept for reuse, unless REDACT_WORKERS is set: one per
+# concurrent caller (e.g. the staged pipeline's 4 CPU threads), at least one per CPU
+DEFAULT_REDACT_WORKERS = max(4, os.cpu_count() or 1)
+_idle_workers: list = []
+_pool_lock = threading.Lock()
+
+
+def _max_workers() -> int:
+    try:
+        return max(1, int(os.environ.get("REDACT_WORKERS", "") or DEFAULT_REDACT_WORKERS))
+    except ValueError:
+        return DEFAULT_REDACT_WORKERS
+
+
+def _worker_loop(conn) -> None:
+    """Worker process: redact each (text, patterns) received on conn until it is closed."""
+    while True:
+        try:
+            text, patterns = conn.recv()
+        except EOFError:
+            return
+        conn.send(redact(text, patterns))
+
+
+class _RedactWorker:
+    """One worker process and its pipe; killed (not reused) when a redaction overruns."""
+
+    def __init__(self):
+        import multiprocessing
+
+        # forkserver (spawn elsewhere): never fork this multi-threaded process
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        ctx = multiprocessing.get_context(method)
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_loop, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def redact(self, text: str, patterns: list[dict[str, Any]], budget_s: float) -> str:
+        self.conn.send((text, patterns))
+        if not self.conn.poll(budget_s):
+            self.close()
+            raise RedactionBudgetExceeded(f"redaction exceeded {budget_s:.3f}s")
+        return self.conn.recv()
+
+    def close(self) -> None:
+        self.conn.close()
+        self.process.kill()
+        self.process.join()
+
+
+def _redact_in_subprocess(text: str, patterns: list[dict[str, Any]], budget_s: float) -> str:
+    """
+    Other threads / platforms: CPython's regex engine holds the GIL and only the main thread
+    receives signals, so run redact() in a worker process and kill it on timeout. Each call
+    checks out its own worker (the lock only guards the idle list), so concurrent callers
+    redact in parallel and a slow message only costs its own worker.
+    """
+    with _pool_lock:
+        worker = _idle_workers.pop() if _idle_workers else None
+    if worker is None:
+        worker = _RedactWorker()
+        worker.redact("", [], None)  # wait until it is up: start-up is not charged to a budget
+    out = worker.redact(text, patterns, budget_s)
+    with _pool_lock:
+        if len(_idle_workers) < _max_workers():
+            _idle_workers.append(worker)
+            return out
+    worker.close()
+    return out
+
+
+def redact_with_budget(
+    text: str,
+    patterns: list[dict[str, Any]],
+    budget_s: float,
+    on_timeout: str = "mask",
+) -> tuple[str, bool]:
+    """
+    redact() with a per-message time budget. Returns (redacted_text, timed_out).
+    On timeout fails closed: on_timeout="mask" returns QUARANTINE_MASK instead of any of the
+    text (the message is effectively quarantined for a human); "raise" raises
+    RedactionBudgetExceeded.
+    """
+    try:
+        if (
+            hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+        ):
+            return _redact_with_alarm(text, patterns, budget_s), False
+        return _redact_in_subprocess(text, patterns, budget_s), False
+    except RedactionBudgetExceeded:
+        if on_timeout == "raise":
+            raise
+        return QUARANTINE_MASK, True
+
+
+def redact_message(
+    text: str, patterns: list[dict[str, Any]], deadline: Optional[Deadline] = None
+) -> str:
+    """
+    redact(), under a REDACT_BUDGET_MS per-message budget when set (fails closed to a mask).
+    Redaction is never skipped for a deadline; the budget is capped by what it has left
+    (at least 1 ms), and a quarantined message is recorded as redact_quarantined.
+    """
+    try:
+        budget_ms = float(os.environ.get("REDACT_BUDGET_MS", "") or 0)
+    except ValueError:
+        budget_ms = 0.0
+    if budget_ms > 0:
+        budget_s = budget_ms / 1000
+        if deadline is not None:
+            budget_s = max(0.001, min(budget_s, deadline.remaining()))
+        redacted, timed_out = redact_with_budget(text, patterns, budget_s)
+        if timed_out and deadline is not None:
+            deadline.degrade("redact_quarantined")
+        return redacted
+    return redact(text, patterns)
+
+
 def redact_with_config(text: str, config_path: Path) -> str:
     """Load patterns from config_path and redact text. Convenience for pipeline."""
     patterns = load_patterns(config_path)
     return redact(text, patterns)
+
+
+def match_window(regex: str, max_unbounded: int = MAX_UNBOUNDED_MATCH) -> int:
+    """Overlap (chars) a streaming stage keeps so any match of regex is seen whole."""
+    try:
+        _, hi = _sre_parse.parse(regex).getwidth()
+    except Exception:
+        hi = max_unbounded
+    return min(hi, max_unbounded) + _WINDOW_SLACK
+
+
+def _stream_stage(
+    chunks: Iterable[str], rx: re.Pattern, mask: str, window: int
+) -> Iterator[str]:
+    """
+    Apply one pattern to a chunk stream with the same matches as rx.sub on the whole text.
+    A match is emitted only once window chars after its start are buffered; text with no
+    possible match start is emitted up to that limit. The tail of already-consumed input is
+    kept as left context for lookbehind / \\b.
+    """
+    ctx = ""
+    buf = ""
+
+    def scan(final: bool) -> str:
+        nonlocal ctx, buf
+        text = ctx + buf
+        off = len(ctx)
+        limit = len(text) if final else len(text) - window
+        pieces = []
+        pos = off
+        for m in rx.finditer(text, off):
+            if not final and m.start() > limit:
+                break
+            pieces.append(text[pos : m.start()])
+            pieces.append(m.expand(mask))
+            pos = m.end()
+        end = max(pos, limit)
+        pieces.append(text[pos:end])
+        ctx = text[max(0, end - window) : end]
+        buf = text[end:]
+        return "".join(pieces)
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buf += chunk
+        if len(buf) >= 2 * window:
+            out = scan(final=False)
+            if out:
+                yield out
+    out = scan(final=True)
+    if out:
+        yield out
+
+
+def _iter_chunks(source: Union[TextIO, Iterable[str]], chunk_size: int) -> Iterator[str]:
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+
+def redact_stream(
+    source: Union[TextIO, Iterable[str]],
+    patterns: list[dict[str, Any]],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    max_unbounded: int = MAX_UNBOUNDED_MATCH,
+) -> Iterator[str]:
+    """
+    Streaming redact(): source is a text file-like object (read in chunk_size pieces) or an
+    iterable of text chunks; yields redacted chunks whose concatenation equals
+    redact(whole_text, patterns). Patterns are chained stage by stage in order, each keeping
+    an overlap window sized from the regex's maximum match width (max_unbounded chars for
+    unbounded patterns such as email), so memory stays bounded by chunk size + windows.
+    """
+    stream: Iterable[str] = _iter_chunks(source, chunk_size)
+    for p in patterns:
+        try:
+            rx = re.compile(p["regex"])
+        except re.error:
+            continue
+        stream = _stream_stage(
+            stream,
+            rx,
+            p.get("mask", "[REDACTED]"),
+            match_window(p["regex"], max_unbounded),
+        )
+    yield from stream
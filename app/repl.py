@@ -0,0 +1,274 @@
+"""
+Warm interactive mode for manual triage: load patterns, KB and model once, then read messages.
+
+Each input line is one message, handled by the current mode (run by default). Every reply ends
+with the per-message latency of each stage, so only the work for that message is paid for.
+Commands:
+  :run | :redact | :predict | :draft [message]   switch mode, or handle one message in that mode
+  :reload [patterns|kb|model|all]               reload from disk without restarting (default all)
+  :tenant [NAME]                                switch to tenant NAME under --tenants-dir (cached)
+  :stats                                        messages handled and latency per mode
+  :help, :quit
+Run: python -m app repl [--data-dir DIR] [--tenants-dir DIR [--tenant NAME]]   (USE_LLM=1 for LLM drafts)
+MESSAGE_DEADLINE_MS applies per message, as in batch runs; degradations are shown.
+"""
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Optional, TextIO
+
+from app.classify import load_stub_labels
+from app.config import DEFAULT_DATA_DIR
+from app.deadline import Deadline
+from app.draft import draft_from_policy
+from app.guardrails import run_draft_checks
+from app.kb import open_kb
+from app.mtl import MTLClassifier
+from app.redact import load_patterns, redact_message
+from app.tenants import EngineRegistry, TenantEngine, tenant_data_dir, tenant_model_path
+
+MODES = ("run", "redact", "predict", "draft")
+RELOAD_TARGETS = ("patterns", "kb", "model", "all")
+PROMPT = "> "
+
+
+@dataclass
+class ReplStats:
+    """Messages handled and summed latency per mode."""
+
+    messages: dict[str, int] = field(default_factory=dict)
+    total_ms: dict[str, float] = field(default_factory=dict)
+
+    def add(self, mode: str, ms: float) -> None:
+        self.messages[mode] = self.messages.get(mode, 0) + 1
+        self.total_ms[mode] = self.total_ms.get(mode, 0.0) + ms
+
+    def as_dict(self) -> dict:
+        return {
+            mode: {"messages": n, "mean_ms": round(self.total_ms[mode] / n, 2)}
+            for mode, n in self.messages.items()
+        }
+
+
+def reload_engine(engine: TenantEngine, target: str = "all") -> float:
+    """
+    Reload patterns, KB and/or model of engine in place from its data directory; returns seconds.
+    Everything is loaded before anything is swapped in, so a failed reload (bad pattern file,
+    unreadable model) raises and leaves the engine as it was.
+    """
+    t0 = time.perf_counter()
+    updates: dict = {}
+    try:
+        if target in ("patterns", "all"):
+            updates["patterns"] = load_patterns(engine.data_dir / "pii_patterns.yaml")
+        if target in ("kb", "all"):
+            updates["kb"] = open_kb(engine.data_dir / "kb")
+        if target in ("model", "all"):
+            model_path = tenant_model_path(engine.data_dir)
+            updates["model_path"] = model_path
+            # the engine's own copy, as in build_engine
+            updates["classifier"] = MTLClassifier(model_path=model_path) if model_path else None
+            updates["stub_labels"] = load_stub_labels(engine.messages_path)
+    except BaseException:
+        if "kb" in updates:
+            updates["kb"].close()
+        raise
+    old_kb = engine.kb
+    for name, value in updates.items():
+        setattr(engine, name, value)
+    if "kb" in updates:
+        old_kb.close()
+    return time.perf_counter() - t0
+
+
+class Repl:
+    """
+    Line handler over a warm TenantEngine; output goes to out. With registry and tenants_dir,
+    :tenant switches engines through the registry (each tenant is loaded once).
+    """
+
+    def __init__(
+        self,
+        engine: TenantEngine,
+        out: TextIO = sys.stdout,
+        use_llm: bool = False,
+        registry: Optional[EngineRegistry] = None,
+        tenants_dir: Optional[Path] = None,
+    ):
+        self.engine = engine
+        self.out = out
+        self.use_llm = use_llm
+        self.registry = registry
+        self.tenants_dir = tenants_dir
+        self.mode = "run"
+        self.stats = ReplStats()
+
+    def _print(self, text: str = "") -> None:
+        print(text, file=self.out)
+
+    def handle(self, line: str) -> bool:
+        """Process one input line; False when the session should end. Errors end the line only."""
+        try:
+            return self._handle(line)
+        except Exception as exc:
+            self._print(f"error: {type(exc).__name__}: {exc}")
+            return True
+
+    def _handle(self, line: str) -> bool:
+        line = line.strip()
+        if not line:
+            return True
+        if not line.startswith(":"):
+            self.message(line, self.mode)
+            return True
+        cmd, _, rest = line[1:].partition(" ")
+        rest = rest.strip()
+        if cmd in ("quit", "exit", "q"):
+            return False
+        if cmd in MODES:
+            if rest:
+                self.message(rest, cmd)
+            else:
+                self.mode = cmd
+                self._print(f"mode: {cmd}")
+        elif cmd == "reload":
+            target = rest or "all"
+            if target not in RELOAD_TARGETS:
+                self._print(f"reload what? {'|'.join(RELOAD_TARGETS)}")
+            else:
+                try:
+                    s = reload_engine(self.engine, target)
+                except Exception as exc:
+                    self._print(
+                        f"reload {target} failed, keeping the previous one: "
+                        f"{type(exc).__name__}: {exc}"
+                    )
+                else:
+                    self._print(
+                        f"reloaded {target} in {1000 * s:.1f} ms (backend: {self.engine.backend})"
+                    )
+        elif cmd == "tenant":
+            self.switch_tenant(rest)
+        elif cmd == "stats":
+            self._print(str(self.stats.as_dict()))
+            self._print(f"kb cache: {self.engine.kb.metrics()}")
+            if self.registry is not None:
+                self._print(f"tenants: {self.registry.stats()}")
+        elif cmd == "help":
+            self._print(__doc__.split("Commands:")[1].split("Run:")[0].rstrip())
+        else:
+            self._print(f"unknown command :{cmd} (:help)")
+        return True
+
+    def switch_tenant(self, name: str) -> None:
+        if not name:
+            self._print(f"tenant: {self.engine.data_dir}")
+            return
+        if self.registry is None or self.tenants_dir is None:
+            self._print("no --tenants-dir: single-tenant session")
+            return
+        try:
+            data_dir = tenant_data_dir(self.tenants_dir, name)
+        except ValueError as exc:
+            self._print(str(exc))
+            return
+        t0 = time.perf_counter()
+        self.engine = self.registry.get(data_dir)
+        self._print(
+            f"tenant {name} in {1000 * (time.perf_counter() - t0):.1f} ms "
+            f"(backend: {self.engine.backend})"
+        )
+
+    def message(self, text: str, mode: str) -> dict:
+        """Handle one message in mode; prints the result and per-stage latency, returns timings (ms)."""
+        timings: dict[str, float] = {}
+
+        def timed(stage: str, fn: Callable, *args, **kwargs):
+            t0 = time.perf_counter()
+            value = fn(*args, **kwargs)
+            timings[stage] = 1000 * (time.perf_counter() - t0)
+            return value
+
+        deadline = Deadline.from_env()
+        redacted = timed("redact", redact_message, text, self.engine.patterns, deadline)
+        self._print(f"redacted: {redacted}")
+        if mode != "redact":
+            res = timed("classify", self.engine.classify, redacted, deadline=deadline)
+            self._print(
+                f"intent={res.intent} queue={res.suggested_queue} "
+                f"confidence={(res.confidence or 0.0):.2f} backend={self.engine.backend}"
+            )
+            if mode in ("draft", "run"):
+                draft, used_fallback = timed(
+                    "draft",
+                    draft_from_policy,
+                    res,
+                    self.engine.kb,
+                    use_llm=self.use_llm,
+                    redacted_message=redacted,
+                    deadline=deadline,
+                )
+                ok, failures = timed("checks", run_draft_checks, draft, deadline)
+                status = "OK" if ok else f"FAIL:{','.join(failures)}"
+                self._print(f"fallback={used_fallback} checks={status}")
+                self._print(f"draft: {draft}")
+        if deadline is not None and deadline.degradations:
+            self._print(f"degraded: {','.join(deadline.degradations)}")
+        timings["total"] = sum(timings.values())
+        self.stats.add(mode, timings["total"])
+        self._print("latency: " + " ".join(f"{k}={v:.2f}ms" for k, v in timings.items()))
+        return timings
+
+    def loop(self, lines: Iterable[str], interactive: bool = False) -> None:
+        if interactive:
+            self.out.write(PROMPT)
+            self.out.flush()
+        for line in lines:
+            if not self.handle(line):
+                break
+            if interactive:
+                self.out.write(PROMPT)
+                self.out.flush()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    p = argparse.ArgumentParser(
+        prog="app repl",
+        description="Warm interactive triage: one message per line, :help for commands",
+    )
+    p.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    p.add_argument("--mode", choices=MODES, default="run", help="Initial mode (default: run)")
+    p.add_argument(
+        "--tenants-dir", type=Path, default=None, help="One data directory per tenant (:tenant NAME)"
+    )
+    p.add_argument("--tenant", default=None, help="Initial tenant under --tenants-dir")
+    args = p.parse_args(argv)
+    if args.tenant and args.tenants_dir is None:
+        p.error("--tenant needs --tenants-dir")
+
+    registry = EngineRegistry()
+    try:
+        data_dir = tenant_data_dir(args.tenants_dir, args.tenant) if args.tenant else args.data_dir
+    except ValueError as exc:
+        p.error(str(exc))
+    engine = registry.get(data_dir)
+    use_llm = os.environ.get("USE_LLM", "").strip().lower() in ("1", "true", "yes")
+    repl = Repl(engine, use_llm=use_llm, registry=registry, tenants_dir=args.tenants_dir)
+    repl.mode = args.mode
+    print(
+        f"Loaded {data_dir} in {1000 * engine.load_s:.0f} ms "
+        f"(backend: {engine.backend}, draft: {'LLM' if use_llm else 'template'}). "
+        f"Mode: {repl.mode}. :help for commands, :quit to exit."
+    )
+    interactive = sys.stdin.isatty()
+    try:
+        repl.loop(sys.stdin, interactive=interactive)
+    except KeyboardInterrupt:
+        pass
+    if interactive:
+        print()
+    print(f"Session: {repl.stats.as_dict()}")
@@ -0,0 +1,203 @@
+"""
+Compact in-memory result store for batch runs.
+
+Column per field instead of one dict per message: intent and queue as categorical uint8
+codes, confidence as float32, fallback + guardrail failures + deadline degradations
+bit-packed into one uint8,
+strings only for message ids and drafts (identical drafts, e.g. templates, stored once).
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Iterator, Sequence
+
+import numpy as np
+
+# Guardrail failure reasons (app.guardrails) → flag bits; bit 0 is used_fallback
+FAILURE_BITS = {"citation_missing": 1 << 1, "possible_pii_in_draft": 1 << 2}
+FALLBACK_BIT = 1 << 0
+# Deadline degradations (app.deadline.DEGRADATIONS) → the remaining flag bits
+DEGRADATION_BITS = {
+    "llm_classify_skipped": 1 << 3,
+    "llm_skipped": 1 << 4,
+    "draft_skipped": 1 << 5,
+    "redact_quarantined": 1 << 6,
+    "deadline_missed": 1 << 7,
+}
+DRAFT_PREVIEW_CHARS = 80
+
+
+@dataclass(slots=True)
+class ResultRow:
+    """One message's routing result, materialised from the store on access."""
+
+    msg_id: str
+    intent: str
+    queue: str
+    confidence: float
+    fallback: bool
+    failures: tuple[str, ...]
+    draft: str
+    degradations: tuple[str, ...] = ()
+
+    @property
+    def checks_ok(self) -> bool:
+        return not self.failures
+
+    @property
+    def status(self) -> str:
+        return "OK" if self.checks_ok else f"FAIL:{','.join(self.failures)}"
+
+    @property
+    def draft_preview(self) -> str:
+        d = self.draft
+        return (d[:DRAFT_PREVIEW_CHARS] + "…") if len(d) > DRAFT_PREVIEW_CHARS else d
+
+
+class _Categories:
+    """String ↔ small integer code (uint8: up to 256 distinct values per column)."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        c = self.codes.get(value)
+        if c is None:
+            c = len(self.values)
+            if c > 255:
+                raise ValueError("more than 256 categories in a uint8 column")
+            self.codes[value] = c
+            self.values.append(value)
+        return c
+
+
+class ResultStore:
+    """Append-only columnar store; len(), indexing and iteration yield ResultRow."""
+
+    __slots__ = (
+        "_n",
+        "_intent",
+        "_queue",
+        "_confidence",
+        "_flags",
+        "_intents",
+        "_queues",
+        "_msg_ids",
+        "_drafts",
+        "_draft_pool",
+    )
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(1, capacity)
+        self._n = 0
+        self._intent = np.zeros(capacity, dtype=np.uint8)
+        self._queue = np.zeros(capacity, dtype=np.uint8)
+        self._confidence = np.zeros(capacity, dtype=np.float32)
+        self._flags = np.zeros(capacity, dtype=np.uint8)
+        self._intents = _Categories()
+        self._queues = _Categories()
+        self._msg_ids: list[str] = []
+        self._drafts: list[str] = []
+        self._draft_pool: dict[str, str] = {}
+
+    def _grow(self) -> None:
+        cap = len(self._intent) * 2
+        for name in ("_intent", "_queue", "_confidence", "_flags"):
+            old = getattr(self, name)
+            new = np.zeros(cap, dtype=old.dtype)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
+    def append(
+        self,
+        msg_id: str,
+        intent: str,
+        queue: str,
+        confidence: float,
+        fallback: bool,
+        failures: Sequence[str],
+        draft: str,
+        degradations: Sequence[str] = (),
+    ) -> None:
+        if self._n == len(self._intent):
+            self._grow()
+        i = self._n
+        self._intent[i] = self._intents.code(intent)
+        self._queue[i] = self._queues.code(queue)
+        self._confidence[i] = confidence
+        flags = FALLBACK_BIT if fallback else 0
+        for f in failures:
+            if f not in FAILURE_BITS:
+                raise ValueError(f"unknown guardrail failure {f!r}: add it to FAILURE_BITS")
+            flags |= FAILURE_BITS[f]
+        for d in degradations:
+            if d not in DEGRADATION_BITS:
+                raise ValueError(f"unknown degradation {d!r}: add it to DEGRADATION_BITS")
+            flags |= DEGRADATION_BITS[d]
+        self._flags[i] = flags
+        self._msg_ids.append(msg_id)
+        self._drafts.append(self._draft_pool.setdefault(draft, draft))
+        self._n += 1
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> ResultRow:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        flags = int(self._flags[i])
+        return ResultRow(
+            msg_id=self._msg_ids[i],
+            intent=self._intents.values[self._intent[i]],
+            queue=self._queues.values[self._queue[i]],
+            confidence=float(self._confidence[i]),
+            fallback=bool(flags & FALLBACK_BIT),
+            failures=tuple(f for f, bit in FAILURE_BITS.items() if flags & bit),
+            draft=self._drafts[i],
+            degradations=tuple(d for d, bit in DEGRADATION_BITS.items() if flags & bit),
+        )
+
+    def __iter__(self) -> Iterator[ResultRow]:
+        for i in range(self._n):
+            yield self[i]
+
+    @property
+    def fallback_mask(self) -> np.ndarray:
+        return (self._flags[: self._n] & FALLBACK_BIT).astype(bool)
+
+    @property
+    def checks_ok_mask(self) -> np.ndarray:
+        failure_bits = sum(FAILURE_BITS.values())
+        return (self._flags[: self._n] & failure_bits) == 0
+
+    def degradation_counts(self) -> dict[str, int]:
+        """Messages per deadline degradation (all names, zero included)."""
+        flags = self._flags[: self._n]
+        return {d: int(np.count_nonzero(flags & bit)) for d, bit in DEGRADATION_BITS.items()}
+
+    def deadline_report(self) -> dict:
+        """Deadline-miss rate plus degradations; any_degraded counts messages with at least one."""
+        flags = self._flags[: self._n]
+        counts = self.degradation_counts()
+        return {
+            "messages": self._n,
+            "missed": counts["deadline_missed"],
+            "miss_rate": round(counts["deadline_missed"] / self._n, 4) if self._n else 0.0,
+            "any_degraded": int(np.count_nonzero(flags & sum(DEGRADATION_BITS.values()))),
+            **{d: n for d, n in counts.items() if d != "deadline_missed"},
+        }
+
+    def nbytes(self) -> int:
+        """Approximate resident bytes: arrays, category tables, id strings and unique drafts."""
+        arrays = sum(
+            a.nbytes for a in (self._intent, self._queue, self._confidence, self._flags)
+        )
+        strings = sys.getsizeof(self._msg_ids) + sum(sys.getsizeof(s) for s in self._msg_ids)
+        strings += sys.getsizeof(self._drafts)
+        strings += sum(sys.getsizeof(s) for s in self._draft_pool)
+        return arrays + strings
@@ -1,15 +1,35 @@
 """Main pipeline: ingress → redact → classify → draft (supported intents) → guardrails/eval."""
 
 import argparse
+import importlib
 import os
+import sys
 from pathlib import Path
 
-from app.redact import load_patterns, redact
-from app.classify import classify
-from app.kb import load_kb
-from app.draft import draft_from_policy
+from app.redact import load_patterns, redact_message
+from app.classify import ClassificationResult, LLMGateStats, classify, classify_batch
+from app.deadline import Deadline, degradations_of
+from app.kb import open_kb
+from app.draft import (
+    DraftBatchStats,
+    draft_batch_from_policy,
+    draft_from_policy,
+    draft_threshold,
+    stream_enabled,
+)
+from app.draft_reuse import get_draft_index
 from app.guardrails import run_draft_checks
-from app.mtl import DEFAULT_MODEL_DIR, MODEL_FILE
+from app.llm import draft_stream_metrics, draft_token_metrics, llm_metrics
+from app.mtl import resolve_model_path
+from app.pipeline import PipelineStats, StagedPipeline
+from app.results import ResultStore
+from app.checkpoint import (
+    DEFAULT_CHECKPOINT,
+    DEFAULT_CHECKPOINT_EVERY,
+    CheckpointMismatch,
+    RunCheckpoint,
+    input_fingerprint,
+)
 
 try:
     from rich.console import Console
@@ -41,14 +61,42 @@ def _status_style(ok: bool) -> str:
     return "[ok]OK[/ok]" if ok else "[fail]FAIL[/fail]"
 
 
+# Redaction entry point of every pipeline stage here (app.profiling times it as "redact")
+_redact = redact_message
+
+
+def _select_backend(model_path: Path) -> str:
+    """CLASSIFY_BACKEND (stub|mtl|llm) overrides auto-selection: MTL if model exists, else stub."""
+    env = os.environ.get("CLASSIFY_BACKEND", "").strip().lower()
+    if env in ("stub", "mtl", "llm"):
+        return env
+    return "mtl" if model_path.exists() else "stub"
+
+
 def run_pipeline(
     messages_path: Path,
     data_dir: Path,
     limit: int | None = 5,
-) -> None:
+    quiet: bool = False,
+    checkpoint_path: Path | None = None,
+    resume: bool = False,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    staged: bool = False,
+) -> ResultStore:
     """
     Wire pipeline: redaction runs before any non-local model or external service.
     Ingress (messages.csv) → redact → classify → draft (for supported intents) → check.
+    Returns a columnar ResultStore (one ResultRow per message on iteration);
+    quiet=True skips all console output (e.g. profiling).
+    With checkpoint_path, results are flushed every checkpoint_every messages; resume=True
+    restores them and continues after the last checkpointed message.
+    staged=True runs per-message work on a StagedPipeline (app/pipeline.py): redact/classify
+    on a worker pool overlapped with concurrent drafting; checks as drafts complete.
+    Not used with the llm backend or DRAFT_BATCH=1, which batch per chunk instead; staged
+    is then turned off and the run says so.
+    MESSAGE_DEADLINE_MS gives each message a deadline (app/deadline.py) from when its
+    processing starts (with chunk-level batching, when its chunk is picked up); stages
+    degrade to meet it and each row records its degradations.
     """
     import pandas as pd
 
@@ -56,23 +104,51 @@ def run_pipeline(
         (console or __import__("builtins").print)(
             f"messages.csv not found at {messages_path}"
         )
-        return
+        return ResultStore()
     df = pd.read_csv(messages_path)
     if limit:
         df = df.head(limit)
     pii_path = data_dir / "pii_patterns.yaml"
-    kb = load_kb(data_dir / "kb")
+    kb = open_kb(data_dir / "kb")
     patterns = load_patterns(pii_path)
-    model_path = Path(__file__).resolve().parent.parent / DEFAULT_MODEL_DIR / MODEL_FILE
-    backend = "mtl" if model_path.exists() else "stub"
+    model_path = resolve_model_path()
+    backend = _select_backend(model_path)
     use_llm = os.environ.get("USE_LLM", "").strip().lower() in ("1", "true", "yes")
+    # LLM backend / DRAFT_BATCH=1: classify each chunk up front so low-confidence ones
+    # share batched classification requests and same-kb_key drafts share batched draft requests
+    draft_batch = use_llm and os.environ.get("DRAFT_BATCH", "").strip().lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    staged_off = ""
+    if staged and (backend == "llm" or draft_batch):
+        staged = False
+        staged_off = (
+            "Staged mode disabled: "
+            f"{'the llm backend' if backend == 'llm' else 'DRAFT_BATCH=1'} batches per chunk instead."
+        )
 
-    if RICH_AVAILABLE:
+    total = len(df)
+    rows = ResultStore(capacity=total)
+    checkpoint = None
+    start = 0
+    if checkpoint_path is not None:
+        checkpoint = RunCheckpoint(checkpoint_path, input_fingerprint(messages_path, limit))
+        if resume:
+            start = checkpoint.restore(rows)
+        else:
+            checkpoint.reset()
+
+    if quiet:
+        pass
+    elif RICH_AVAILABLE:
+        resumed = f", resuming after {start}" if start else ""
         console.print(
             Panel(
                 f"[bold]Backend[/bold]: {backend}\n"
                 f"[bold]Draft[/bold]: {'LLM (GPT-4o-mini)' if use_llm else 'template'}\n"
-                f"[bold]Messages[/bold]: {len(df)} (redact → classify → draft → check)",
+                f"[bold]Messages[/bold]: {len(df)}{resumed} (redact → classify → draft → check)",
                 title="[cyan]Intelligent message routing[/cyan]",
                 border_style="cyan",
             )
@@ -80,43 +156,144 @@ def run_pipeline(
     else:
         print(
             f"Backend: {backend}. Draft: {'LLM' if use_llm else 'template'}. "
-            f"Processed {len(df)} messages\n"
+            f"Processed {len(df)} messages{f' (resumed after {start})' if start else ''}\n"
         )
 
-    rows: list[dict] = []
-    total = len(df)
-    show_progress = RICH_AVAILABLE and total > 0
+    if staged_off and not quiet:
+        (console.print if RICH_AVAILABLE else print)(staged_off)
+
+    show_progress = RICH_AVAILABLE and total > start and not quiet
 
-    def process_one(idx: int, row) -> None:
-        msg_id = row.get("message_id", "")
-        text = str(row.get("text", ""))
-        redacted = redact(text, patterns)
-        res = classify(
+    gate_stats = LLMGateStats()
+    draft_stats = DraftBatchStats()
+    stage_stats = PipelineStats()
+
+    def classify_one(redacted: str, msg_id, deadline: Deadline | None = None) -> ClassificationResult:
+        return classify(
             redacted,
             messages_path,
             message_id=str(msg_id),
             backend=backend,
-            model_path=model_path if backend == "mtl" else None,
+            model_path=model_path if backend != "stub" else None,
+            deadline=deadline,
         )
-        draft, used_fallback = draft_from_policy(
-            res, kb, use_llm=use_llm, redacted_message=redacted
-        )
-        ok, failures = run_draft_checks(draft)
-        status = "OK" if ok else f"FAIL:{','.join(failures)}"
-        conf = res.confidence if res.confidence is not None else 0.0
-        draft_preview = (draft[:80] + "…") if len(draft) > 80 else draft
-        rows.append(
-            {
-                "msg_id": str(msg_id),
-                "intent": res.intent,
-                "queue": res.suggested_queue,
-                "confidence": conf,
-                "fallback": used_fallback,
-                "checks_ok": ok,
-                "status": status,
-                "draft_preview": draft_preview,
-            }
+
+    def process_staged(part, on_row=None) -> None:
+        """Rows of part through the staged runner; appended in input order."""
+
+        def cpu_stage(row):
+            msg_id, text = row
+            deadline = Deadline.from_env()
+            redacted = _redact(text, patterns, deadline)
+            return msg_id, redacted, classify_one(redacted, msg_id, deadline), deadline
+
+        def draft_stage(item):
+            msg_id, redacted, res, deadline = item
+            draft, used_fallback = draft_from_policy(
+                res, kb, use_llm=use_llm, redacted_message=redacted, deadline=deadline
+            )
+            return msg_id, res, draft, used_fallback, deadline
+
+        def check_stage(item):
+            msg_id, res, draft, used_fallback, deadline = item
+            failures = run_draft_checks(draft, deadline)[1]
+            return msg_id, res, draft, used_fallback, failures, degradations_of(deadline)
+
+        runner = StagedPipeline(cpu_stage, draft_stage, check_stage)
+        done = runner.run(
+            ((row.get("message_id", ""), str(row.get("text", ""))) for _, row in part.iterrows()),
+            on_result=(lambda i, r: on_row()) if on_row is not None else None,
         )
+        stage_stats.merge(runner.stats)
+        for msg_id, res, draft, used_fallback, failures, degradations in done:
+            conf = res.confidence if res.confidence is not None else 0.0
+            rows.append(
+                str(msg_id),
+                res.intent,
+                res.suggested_queue,
+                conf,
+                used_fallback,
+                failures,
+                draft,
+                degradations,
+            )
+
+    def process_chunk(part, on_row=None) -> None:
+        """Process rows of part (a slice of df) in order, appending to rows."""
+        pre_classified = None
+        pre_drafted = None
+        deadlines_all = None
+        if backend == "llm" or draft_batch:
+            # The whole chunk is picked up at once: every message's deadline starts here
+            deadlines_all = [Deadline.from_env() for _ in range(len(part))]
+            redacted_all = [
+                _redact(str(t), patterns, dl)
+                for t, dl in zip(part.get("text", []), deadlines_all)
+            ]
+            ids_all = [str(m) for m in part.get("message_id", [""] * len(part))]
+            pre_classified = classify_batch(
+                redacted_all,
+                messages_path,
+                message_ids=ids_all,
+                backend=backend,
+                model_path=model_path if backend != "stub" else None,
+                stats=gate_stats,
+                deadlines=deadlines_all,
+            )
+            if draft_batch:
+                pre_drafted = draft_batch_from_policy(
+                    [
+                        (str(i), res, red)
+                        for i, (res, red) in enumerate(zip(pre_classified, redacted_all))
+                    ],
+                    kb,
+                    use_llm=True,
+                    stats=draft_stats,
+                    deadlines={str(i): dl for i, dl in enumerate(deadlines_all)},
+                )
+        elif staged:
+            process_staged(part, on_row)
+            return
+
+        for idx, (_, row) in enumerate(part.iterrows()):
+            if on_row is not None:
+                on_row()
+            msg_id = row.get("message_id", "")
+            text = str(row.get("text", ""))
+            deadline = deadlines_all[idx] if deadlines_all is not None else Deadline.from_env()
+            if pre_classified is not None:
+                redacted = redacted_all[idx]
+                res = pre_classified[idx]
+            else:
+                redacted = _redact(text, patterns, deadline)
+                res = classify_one(redacted, msg_id, deadline)
+            if pre_drafted is not None:
+                draft, used_fallback = pre_drafted[str(idx)]
+            else:
+                draft, used_fallback = draft_from_policy(
+                    res, kb, use_llm=use_llm, redacted_message=redacted, deadline=deadline
+                )
+            _, failures = run_draft_checks(draft, deadline)
+            conf = res.confidence if res.confidence is not None else 0.0
+            rows.append(
+                str(msg_id),
+                res.intent,
+                res.suggested_queue,
+                conf,
+                used_fallback,
+                failures,
+                draft,
+                degradations_of(deadline),
+            )
+
+    def process_all(on_row=None) -> None:
+        # Without a checkpoint the whole file is one chunk (widest LLM batching)
+        chunk = max(1, checkpoint_every) if checkpoint is not None else max(1, total)
+        for chunk_start in range(start, total, chunk):
+            part = df.iloc[chunk_start : chunk_start + chunk]
+            process_chunk(part, on_row)
+            if checkpoint is not None:
+                checkpoint.save(rows, offset=chunk_start + len(part))
 
     if show_progress:
         with Progress(
@@ -125,17 +302,24 @@ def run_pipeline(
             TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
             console=console,
         ) as progress:
-            task = progress.add_task("Processing messages…", total=total)
-            for idx, (_, row) in enumerate(df.iterrows()):
+            task = progress.add_task("Processing messages…", total=total, completed=start)
+
+            completed = [start]
+
+            def advance() -> None:
+                done = completed[0]
                 progress.update(
-                    task, description=f"Message {idx + 1}/{total}", completed=idx
+                    task, description=f"Message {min(done + 1, total)}/{total}", completed=done
                 )
-                process_one(idx, row)
+                completed[0] += 1
+
+            process_all(advance)
             progress.update(task, completed=total)
     else:
-        for idx, (_, row) in enumerate(df.iterrows()):
-            process_one(idx, row)
+        process_all()
 
+    if quiet:
+        return rows
     if RICH_AVAILABLE:
         table = Table(show_header=True, header_style="bold cyan", border_style="dim")
         table.add_column("ID", style="dim", width=10)
@@ -147,35 +331,64 @@ def run_pipeline(
         table.add_column("Draft preview", max_width=50, overflow="ellipsis")
         for r in rows:
             checks_cell = (
-                _status_style(r["checks_ok"])
-                if r["checks_ok"]
-                else f'[fail]{r["status"]}[/fail]'
+                _status_style(r.checks_ok) if r.checks_ok else f"[fail]{r.status}[/fail]"
             )
             table.add_row(
-                r["msg_id"],
-                r["intent"],
-                r["queue"],
-                f"{r['confidence']:.2f}",
-                str(r["fallback"]),
+                r.msg_id,
+                r.intent,
+                r.queue,
+                f"{r.confidence:.2f}",
+                str(r.fallback),
                 checks_cell,
-                r["draft_preview"],
+                r.draft_preview,
             )
         console.print(table)
     else:
         sep = "─" * 72
         for r in rows:
             print(
-                f"  {r['msg_id']} intent={r['intent']} queue={r['queue']} confidence={r['confidence']:.2f} fallback={r['fallback']} checks={r['status']}"
+                f"  {r.msg_id} intent={r.intent} queue={r.queue} confidence={r.confidence:.2f} fallback={r.fallback} checks={r.status}"
             )
-            print(f"    draft: {r['draft_preview']}")
+            print(f"    draft: {r.draft_preview}")
             print(sep)
+    if backend == "llm":
+        (console.print if RICH_AVAILABLE else print)(
+            f"LLM classification gate: {gate_stats.as_dict()}"
+        )
+    if draft_batch:
+        (console.print if RICH_AVAILABLE else print)(
+            f"Batched drafting: {draft_stats.as_dict()}"
+        )
+    (console.print if RICH_AVAILABLE else print)(f"KB cache: {kb.metrics()}")
+    if Deadline.from_env() is not None:
+        (console.print if RICH_AVAILABLE else print)(f"Deadlines: {rows.deadline_report()}")
+    if stage_stats.stages:
+        (console.print if RICH_AVAILABLE else print)(
+            f"Staged pipeline: {stage_stats.as_dict()}"
+        )
+    reuse_index = get_draft_index()
+    if use_llm and reuse_index is not None:
+        (console.print if RICH_AVAILABLE else print)(
+            f"Draft reuse: {reuse_index.metrics()}"
+        )
+    if use_llm and stream_enabled() and not draft_batch:
+        (console.print if RICH_AVAILABLE else print)(
+            f"Streamed drafts: {draft_stream_metrics()}"
+        )
+    if use_llm:
+        (console.print if RICH_AVAILABLE else print)(
+            f"Draft tokens: {draft_token_metrics()}"
+        )
+    if use_llm or backend == "llm":
+        (console.print if RICH_AVAILABLE else print)(f"LLM client: {llm_metrics()}")
+    return rows
 
 
 def cmd_redact(text: str, data_dir: Path) -> None:
     """Redact only: input → redacted text (pretty output)."""
     pii_path = data_dir / "pii_patterns.yaml"
     patterns = load_patterns(pii_path)
-    redacted = redact(text, patterns)
+    redacted = _redact(text, patterns)
     if RICH_AVAILABLE:
         console.print(Panel(text, title="[cyan]Input[/cyan]", border_style="dim"))
         console.print(
@@ -190,15 +403,15 @@ def cmd_predict(text: str, data_dir: Path, messages_path: Path) -> None:
     """Redact + classify only: input → intent, queue, confidence (pretty output)."""
     pii_path = data_dir / "pii_patterns.yaml"
     patterns = load_patterns(pii_path)
-    model_path = Path(__file__).resolve().parent.parent / DEFAULT_MODEL_DIR / MODEL_FILE
-    backend = "mtl" if model_path.exists() else "stub"
-    redacted = redact(text, patterns)
+    model_path = resolve_model_path()
+    backend = _select_backend(model_path)
+    redacted = _redact(text, patterns)
     res = classify(
         redacted,
         messages_path,
         message_id=None,
         backend=backend,
-        model_path=model_path if backend == "mtl" else None,
+        model_path=model_path if backend != "stub" else None,
     )
     conf = res.confidence if res.confidence is not None else 0.0
     if RICH_AVAILABLE:
@@ -228,23 +441,38 @@ def cmd_predict(text: str, data_dir: Path, messages_path: Path) -> None:
 def run_single_message(text: str, data_dir: Path, messages_path: Path) -> None:
     """Run pipeline on one custom message (no message_id; classifier uses MTL or stub default)."""
     pii_path = data_dir / "pii_patterns.yaml"
-    kb = load_kb(data_dir / "kb")
+    kb = open_kb(data_dir / "kb")
     patterns = load_patterns(pii_path)
-    model_path = Path(__file__).resolve().parent.parent / DEFAULT_MODEL_DIR / MODEL_FILE
-    backend = "mtl" if model_path.exists() else "stub"
+    model_path = resolve_model_path()
+    backend = _select_backend(model_path)
     use_llm = os.environ.get("USE_LLM", "").strip().lower() in ("1", "true", "yes")
 
-    redacted = redact(text, patterns)
+    redacted = _redact(text, patterns)
     res = classify(
         redacted,
         messages_path,
         message_id=None,
         backend=backend,
-        model_path=model_path if backend == "mtl" else None,
-    )
-    draft, used_fallback = draft_from_policy(
-        res, kb, use_llm=use_llm, redacted_message=redacted
+        model_path=model_path if backend != "stub" else None,
     )
+    if use_llm and stream_enabled() and RICH_AVAILABLE:
+        from rich.live import Live
+
+        # Live preview of the streamed draft (cleared once checks decide the final text)
+        with Live(console=console, transient=True) as live:
+            draft, used_fallback = draft_from_policy(
+                res,
+                kb,
+                use_llm=use_llm,
+                redacted_message=redacted,
+                on_partial=lambda partial: live.update(
+                    Panel(partial, title="[cyan]Draft (streaming)[/cyan]", border_style="dim")
+                ),
+            )
+    else:
+        draft, used_fallback = draft_from_policy(
+            res, kb, use_llm=use_llm, redacted_message=redacted
+        )
     ok, failures = run_draft_checks(draft)
     status = "OK" if ok else f"FAIL:{','.join(failures)}"
     conf = res.confidence if res.confidence is not None else 0.0
@@ -269,8 +497,10 @@ def run_single_message(text: str, data_dir: Path, messages_path: Path) -> None:
             f"[bold]Fallback[/bold]: {used_fallback}",
             f"[bold]Checks[/bold]: {checks_display}",
         ]
-        if use_llm and conf < 0.7:
-            result_lines.append("[dim](LLM skipped: confidence < 0.7)[/dim]")
+        if use_llm and conf < draft_threshold(res):
+            result_lines.append(
+                f"[dim](LLM skipped: confidence < {draft_threshold(res):.2f})[/dim]"
+            )
         console.print(
             Panel(
                 "\n".join(result_lines),
@@ -286,8 +516,8 @@ def run_single_message(text: str, data_dir: Path, messages_path: Path) -> None:
         print(
             f"  Intent/Queue Prediction: intent={res.intent}  queue={res.suggested_queue}  confidence={conf:.2f}  fallback={used_fallback}  checks={status}"
         )
-        if use_llm and conf < 0.7:
-            print("  (LLM skipped: confidence < 0.7)")
+        if use_llm and conf < draft_threshold(res):
+            print(f"  (LLM skipped: confidence < {draft_threshold(res):.2f})")
         print(f"  draft: {draft}")
 
 
@@ -313,12 +543,27 @@ def _get_message_from_args_or_prompt(
     return (out or "").strip()
 
 
+# Commands with their own options: `app <command> ...` hands the remaining args to module.main(argv)
+DELEGATED_COMMANDS = {
+    "profile": "app.profiling",
+    "consume": "app.consume",
+    "repl": "app.repl",
+}
+
+
 def main() -> None:
+    argv = sys.argv[1:]
+    if argv and argv[0] in DELEGATED_COMMANDS:
+        importlib.import_module(DELEGATED_COMMANDS[argv[0]]).main(argv[1:])
+        return
     base = Path(__file__).resolve().parent.parent
     data_dir_default = base / "assignment" / "data"
 
     p = argparse.ArgumentParser(
-        description="Message routing pipeline (CLI). Use: app [run|redact|predict|draft] [message]",
+        description=(
+            "Message routing pipeline (CLI). Use: app [run|redact|predict|draft] [message], "
+            f"or app [{'|'.join(DELEGATED_COMMANDS)}] --help"
+        ),
     )
     p.add_argument(
         "--data-dir",
@@ -338,6 +583,34 @@ def main() -> None:
         default=None,
         help="Message when first arg is a command",
     )
+    p.add_argument(
+        "--limit",
+        type=int,
+        default=5,
+        help="Batch run: first N messages of messages.csv (default: 5, 0 = all)",
+    )
+    p.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help=f"Batch run: flush results and progress to PATH.jsonl/PATH.json (--resume: {DEFAULT_CHECKPOINT})",
+    )
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="Batch run: continue from the checkpoint, skipping completed messages",
+    )
+    p.add_argument(
+        "--staged",
+        action="store_true",
+        help="Batch run: overlap redact/classify (worker pool) with concurrent LLM drafting",
+    )
+    p.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        help=f"Messages between checkpoints (default: {DEFAULT_CHECKPOINT_EVERY})",
+    )
     args = p.parse_args()
     commands = ("run", "redact", "predict", "draft")
     if args.arg1 in commands:
@@ -354,15 +627,33 @@ def main() -> None:
         print("Intelligent message routing")
         print(f"Data directory: {data_dir}\n")
 
+    checkpoint_path = args.checkpoint
+    if args.resume and checkpoint_path is None:
+        checkpoint_path = DEFAULT_CHECKPOINT
+
     if cmd == "run":
-        single_msg = _get_message_from_args_or_prompt(
-            message_arg,
-            prompt_enter_csv=True,
+        # A checkpointed batch run never prompts for a single message
+        single_msg = (
+            message_arg
+            if checkpoint_path is not None
+            else _get_message_from_args_or_prompt(message_arg, prompt_enter_csv=True)
         )
         if single_msg:
             run_single_message(single_msg, data_dir, messages_path)
         else:
-            run_pipeline(messages_path, data_dir, limit=5)
+            try:
+                run_pipeline(
+                    messages_path,
+                    data_dir,
+                    limit=args.limit or None,
+                    checkpoint_path=checkpoint_path,
+                    resume=args.resume,
+                    checkpoint_every=args.checkpoint_every,
+                    staged=args.staged,
+                )
+            except CheckpointMismatch as e:
+                (console.print if RICH_AVAILABLE else print)(f"Cannot resume: {e}")
+                sys.exit(1)
     elif cmd == "redact":
         msg = _get_message_from_args_or_prompt(message_arg)
         if msg:
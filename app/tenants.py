@@ -0,0 +1,239 @@
+"""
+Multi-tenant engine cache: one long-lived process serving several brands.
+
+Each tenant is a data directory with its own pii_patterns.yaml, kb/ and (optionally) model.
+Engines (patterns, KB, classifier) are built lazily on first use, kept in an LRU with a
+tenant-count and memory cap, and reused on every later switch without reloading anything.
+`app consume` and `app repl` route messages to tenants by name under --tenants-dir.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from app.classify import ClassificationResult, classify, load_stub_labels
+from app.deadline import Deadline, degradations_of
+from app.draft import draft_from_policy
+from app.guardrails import run_draft_checks
+from app.kb import KBStore, open_kb
+from app.mtl import MODEL_FILE, MTLClassifier, resolve_model_path
+from app.redact import load_patterns, redact_message
+
+DEFAULT_MAX_TENANTS = 16
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def tenant_data_dir(tenants_dir: Path, tenant: str) -> Path:
+    """Data directory of a named tenant under tenants_dir (names are single path components)."""
+    if not tenant or tenant in (".", "..") or "/" in tenant or "\\" in tenant:
+        raise ValueError(f"invalid tenant name {tenant!r}")
+    path = Path(tenants_dir) / tenant
+    if not path.is_dir():
+        raise ValueError(f"unknown tenant {tenant!r}: no directory {path}")
+    return path
+
+
+def tenant_model_path(data_dir: Path) -> Optional[Path]:
+    """Tenant model: <data_dir>/mtl_model.joblib, else the process default; None → stub."""
+    for path in (Path(data_dir) / MODEL_FILE, resolve_model_path()):
+        if path.exists():
+            return path
+    return None
+
+
+@dataclass
+class TenantEngine:
+    """Everything needed to route one tenant's messages, loaded once."""
+
+    data_dir: Path
+    patterns: list[dict[str, Any]]
+    kb: KBStore
+    classifier: Optional[MTLClassifier]
+    load_s: float
+    approx_bytes: int
+    model_path: Optional[Path] = None
+    # message_id → (label, queue) for the stub backend, read once
+    stub_labels: dict[str, tuple[str, str]] = field(default_factory=dict)
+
+    @property
+    def messages_path(self) -> Path:
+        return self.data_dir / "messages.csv"
+
+    @property
+    def backend(self) -> str:
+        """CLASSIFY_BACKEND (stub|mtl|llm) when the tenant has a model, else mtl; stub without one."""
+        if self.classifier is None:
+            return "stub"
+        env = os.environ.get("CLASSIFY_BACKEND", "").strip().lower()
+        return env if env in ("stub", "mtl", "llm") else "mtl"
+
+    def classify(
+        self,
+        redacted: str,
+        message_id: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> ClassificationResult:
+        """
+        app.classify.classify with this tenant's own model (llm backend: confidence-gated).
+        The model is the engine's, not load_or_train's process-wide cache, so evicting the
+        engine frees it.
+        """
+        return classify(
+            redacted,
+            self.messages_path,
+            message_id=message_id,
+            backend=self.backend,
+            model_path=self.model_path,
+            deadline=deadline,
+            stub_labels=self.stub_labels,
+            classifier=self.classifier,
+        )
+
+    def process(
+        self,
+        text: str,
+        message_id: Optional[str] = None,
+        use_llm: bool = False,
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """
+        redact → classify → draft → check with this tenant's patterns, model and KB.
+        deadline defaults to a fresh MESSAGE_DEADLINE_MS one (app/deadline.py), if set.
+        """
+        if deadline is None:
+            deadline = Deadline.from_env()
+        redacted = redact_message(text, self.patterns, deadline)
+        res = self.classify(redacted, message_id, deadline)
+        draft, used_fallback = draft_from_policy(
+            res, self.kb, use_llm=use_llm, redacted_message=redacted, deadline=deadline
+        )
+        ok, failures = run_draft_checks(draft, deadline)
+        return {
+            "redacted": redacted,
+            "intent": res.intent,
+            "queue": res.suggested_queue,
+            "confidence": res.confidence if res.confidence is not None else 0.0,
+            "draft": draft,
+            "fallback": used_fallback,
+            "checks_ok": ok,
+            "failures": failures,
+            "degradations": list(degradations_of(deadline)),
+        }
+
+
+def build_engine(data_dir: Path) -> TenantEngine:
+    """Cold-load one tenant: patterns, KB and classifier (size estimate used for the memory cap)."""
+    data_dir = Path(data_dir)
+    t0 = time.perf_counter()
+    patterns = load_patterns(data_dir / "pii_patterns.yaml")
+    kb = open_kb(data_dir / "kb")
+    model_path = tenant_model_path(data_dir)
+    # owned by the engine (not load_or_train's cache): dropped when the engine is evicted
+    classifier = MTLClassifier(model_path=model_path) if model_path else None
+    # KB documents load lazily: count what the store may hold, at most its byte cap
+    approx = min(sum(doc.size for doc in kb.index.values()), kb.max_bytes)
+    approx += sum(sys.getsizeof(p["regex"]) + sys.getsizeof(p["mask"]) for p in patterns)
+    if model_path:
+        # on-disk artifact size as a proxy for the unpickled model's footprint
+        approx += model_path.stat().st_size
+    return TenantEngine(
+        data_dir=data_dir,
+        patterns=patterns,
+        kb=kb,
+        classifier=classifier,
+        load_s=time.perf_counter() - t0,
+        approx_bytes=approx,
+        model_path=model_path,
+        stub_labels=load_stub_labels(data_dir / "messages.csv"),
+    )
+
+
+@dataclass
+class RegistryStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    cold_load_s: float = 0.0
+    per_tenant_load_s: dict[str, float] = field(default_factory=dict)
+
+
+class EngineRegistry:
+    """LRU of TenantEngine keyed by resolved data directory, capped by count and bytes."""
+
+    def __init__(
+        self, max_tenants: int = DEFAULT_MAX_TENANTS, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.max_tenants = max(1, max_tenants)
+        self.max_bytes = max_bytes
+        self._engines: "OrderedDict[Path, TenantEngine]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._building: dict[Path, threading.Lock] = {}
+        self._stats = RegistryStats()
+
+    def get(self, data_dir: Path) -> TenantEngine:
+        """Engine for data_dir: cached (hit) or built now (miss), then marked most recent."""
+        key = Path(data_dir).resolve()
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                self._stats.hits += 1
+                return engine
+            build_lock = self._building.setdefault(key, threading.Lock())
+        with build_lock:  # one cold load per tenant even under concurrent first requests
+            with self._lock:
+                engine = self._engines.get(key)
+                if engine is not None:
+                    self._engines.move_to_end(key)
+                    self._stats.hits += 1
+                    return engine
+            engine = None
+            try:
+                engine = build_engine(key)
+            finally:  # a failed build must not leave its lock behind
+                with self._lock:
+                    if engine is not None:
+                        self._stats.misses += 1
+                        self._stats.cold_load_s += engine.load_s
+                        self._stats.per_tenant_load_s[str(key)] = engine.load_s
+                        self._engines[key] = engine
+                        self._evict()
+                    self._building.pop(key, None)
+            return engine
+
+    def _evict(self) -> None:
+        """Drop least-recently-used engines over the caps (the newest one is always kept)."""
+        while len(self._engines) > 1 and (
+            len(self._engines) > self.max_tenants or self.resident_bytes > self.max_bytes
+        ):
+            self._engines.popitem(last=False)
+            self._stats.evictions += 1
+
+    def invalidate(self, data_dir: Path) -> None:
+        """Forget one tenant (e.g. after its patterns, KB or model changed on disk)."""
+        with self._lock:
+            self._engines.pop(Path(data_dir).resolve(), None)
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(e.approx_bytes for e in self._engines.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = self._stats
+            lookups = s.hits + s.misses
+            return {
+                "tenants": len(self._engines),
+                "hits": s.hits,
+                "misses": s.misses,
+                "hit_rate": s.hits / lookups if lookups else 0.0,
+                "evictions": s.evictions,
+                "cold_load_s_total": s.cold_load_s,
+                "cold_load_s_avg": s.cold_load_s / s.misses if s.misses else 0.0,
+                "resident_bytes": self.resident_bytes,
+            }
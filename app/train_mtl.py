@@ -4,7 +4,29 @@ import argparse
 from pathlib import Path
 
 from app.config import DEFAULT_DATA_DIR
-from app.mtl import train
+from app.mtl import (
+    DEFAULT_MODEL_DIR,
+    FEATURE_CACHE_DIR,
+    HEAD_C,
+    MODEL_FILE,
+    TARGET_PRECISION,
+    compare_models,
+    search,
+    train,
+    train_compact,
+)
+
+
+def _print_timings(timings: dict) -> None:
+    stages = ", ".join(
+        f"{k[:-2]}={v:.2f}s" for k, v in timings.items() if k.endswith("_s")
+    )
+    extra = (
+        f" (feature cache {'hit' if timings['features_cache_hit'] else 'miss'})"
+        if "features_cache_hit" in timings
+        else ""
+    )
+    print(f"Wall-clock per stage: {stages}{extra}")
 
 
 def main() -> None:
@@ -28,15 +50,133 @@ def main() -> None:
         metavar="R",
         help="Use R of data for training (0 < R <= 1). 0.8 = 80%% train / 20%% holdout (default: 1.0)",
     )
+    p.add_argument(
+        "--C",
+        type=float,
+        default=HEAD_C,
+        help=f"Inverse regularisation strength for both heads (default: {HEAD_C})",
+    )
+    p.add_argument(
+        "--calibrate",
+        action="store_true",
+        help="Temperature-calibrate both heads (k-fold, slower) and store per-intent draft "
+        "thresholds; without it the model uses the global draft threshold",
+    )
+    p.add_argument(
+        "--target-precision",
+        type=float,
+        default=TARGET_PRECISION,
+        help="Per-intent draft thresholds are the lowest calibrated confidence reaching this "
+        f"precision on the holdout (default: {TARGET_PRECISION})",
+    )
+    p.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not read/write the feature cache ({FEATURE_CACHE_DIR})",
+    )
+    p.add_argument(
+        "--search",
+        action="store_true",
+        help="Parallel grid search over C, n-grams and max_features on the holdout (no model saved)",
+    )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=-1,
+        help="Parallel jobs for --search (default: all cores)",
+    )
+    p.add_argument(
+        "--compact",
+        action="store_true",
+        help="Also write a pruned, reduced-precision model and print a full vs compact report",
+    )
+    p.add_argument(
+        "--compact-path",
+        type=Path,
+        default=None,
+        help="Compact model output (default: mtl_model_compact.joblib next to the model)",
+    )
+    p.add_argument(
+        "--keep-ratio",
+        type=float,
+        default=0.5,
+        help="Fraction of vocabulary kept by coefficient magnitude (default: 0.5)",
+    )
+    p.add_argument(
+        "--dtype",
+        choices=("float16", "float32"),
+        default="float16",
+        help="Coefficient precision of the compact model (default: float16)",
+    )
     args = p.parse_args()
     messages_path = args.data_dir / "messages.csv"
-    train(
+    cache_dir = None if args.no_cache else FEATURE_CACHE_DIR
+    timings: dict = {}
+    if args.search:
+        ratio = args.train_ratio if 0 < args.train_ratio < 1 else 0.8
+        results = search(
+            messages_path,
+            train_ratio=ratio,
+            n_jobs=args.jobs,
+            cache_dir=cache_dir,
+            timings=timings,
+        )
+        print(f"Grid search ({len(results)} configs, holdout {1 - ratio:.0%}), best first:")
+        for r in results[:10]:
+            print(
+                f"  C={r['C']:<5} ngram={r['ngram_range']} max_features={r['max_features']:<6} "
+                f"intent_acc={r['intent_accuracy']:.3f} queue_acc={r['queue_accuracy']:.3f} "
+                f"score={r['score']:.3f}"
+            )
+        _print_timings(timings)
+        return
+    report: dict = {}
+    clf = train(
         messages_path,
         model_path=args.model_path,
         train_ratio=args.train_ratio,
+        C=args.C,
+        cache_dir=cache_dir,
+        timings=timings,
+        target_precision=args.target_precision,
+        thresholds_report=report,
+        calibrated=args.calibrate,
     )
     out = args.model_path or Path("models/mtl_model.joblib")
     print(f"Model saved to {out}")
+    _print_timings(timings)
+    eval_set = "holdout" if 0 < args.train_ratio < 1 else "out-of-fold training predictions"
+    if args.calibrate:
+        temps = clf.calibration
+        fitted = [
+            f"{h}={temps[h]:.3f}" if h in temps else f"{h}=not fitted" for h in ("intent", "queue")
+        ]
+        # not fitted: the best temperature was on the grid edge, raw probabilities are kept
+        print(f"Temperatures: {', '.join(fitted)}")
+        print(f"Per-intent draft thresholds (target precision {args.target_precision}, {eval_set}):")
+    for intent, r in report.items():
+        print(
+            f"  {intent:<8} threshold={r['threshold']:.3f} precision={r['precision']:.3f} "
+            f"coverage={r['coverage']:.1%} n={r['support']}"
+        )
+    if args.compact:
+        full_path = args.model_path or DEFAULT_MODEL_DIR / MODEL_FILE
+        compact_path = train_compact(
+            full_path,
+            compact_path=args.compact_path,
+            keep_ratio=args.keep_ratio,
+            dtype=args.dtype,
+        )
+        print(f"Compact model saved to {compact_path}")
+        eval_set = "holdout" if 0 < args.train_ratio < 1 else "training data"
+        print(f"Full vs compact ({eval_set}):")
+        for r in compare_models(full_path, compact_path, messages_path, args.train_ratio):
+            print(
+                f"  {r['model']:<8} intent_acc={r['intent_accuracy']:.3f} "
+                f"queue_acc={r['queue_accuracy']:.3f} size={r['size_kb']}KB (zlib {r['size_kb_zlib']}KB) "
+                f"vocab={r['vocabulary']} load={r['load_ms']}ms "
+                f"latency_p50={r['latency_us_p50']}us"
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+"""Shared fixtures: local OpenAI-compatible stand-in server for LLM tests."""
+
+import pytest
+
+from app.llm import reset_llm_client
+from app.mock_llm import MockLLMServer
+
+
+@pytest.fixture
+def openai_stub(monkeypatch):
+    """Run the local mock chat-completions server and point the OpenAI client at it."""
+    server = MockLLMServer().start()
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    reset_llm_client()
+    yield server
+    server.stop()
+    reset_llm_client()
@@ -0,0 +1,73 @@
+"""Tests for checkpointed, resumable batch runs."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+import app.run as run_mod
+from app.checkpoint import CheckpointMismatch
+from app.run import run_pipeline
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "assignment" / "data"
+
+
+def _ids(store):
+    return [r.msg_id for r in store]
+
+
+def test_resume_after_crash_has_no_duplicate_or_missing_rows(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    monkeypatch.delenv("USE_LLM", raising=False)
+    messages = DATA_DIR / "messages.csv"
+    expected = _ids(run_pipeline(messages, DATA_DIR, limit=25, quiet=True))
+
+    real_checks = run_mod.run_draft_checks
+    calls = {"n": 0}
+
+    def crash_after_17(draft, deadline=None):
+        calls["n"] += 1
+        if calls["n"] > 17:
+            raise KeyboardInterrupt
+        return real_checks(draft, deadline)
+
+    ckpt = tmp_path / "ckpt"
+    monkeypatch.setattr(run_mod, "run_draft_checks", crash_after_17)
+    with pytest.raises(KeyboardInterrupt):
+        run_pipeline(messages, DATA_DIR, limit=25, quiet=True, checkpoint_path=ckpt, checkpoint_every=5)
+    # 15 rows checkpointed; the two processed after the last checkpoint are redone
+    assert len((tmp_path / "ckpt.jsonl").read_text().splitlines()) == 15
+
+    monkeypatch.setattr(run_mod, "run_draft_checks", real_checks)
+    resumed = run_pipeline(
+        messages, DATA_DIR, limit=25, quiet=True, checkpoint_path=ckpt, resume=True, checkpoint_every=5
+    )
+    assert _ids(resumed) == expected
+    assert len((tmp_path / "ckpt.jsonl").read_text().splitlines()) == 25
+
+    # Resuming a finished run processes nothing and returns the same rows
+    calls["n"] = 0
+    monkeypatch.setattr(run_mod, "run_draft_checks", crash_after_17)
+    again = run_pipeline(messages, DATA_DIR, limit=25, quiet=True, checkpoint_path=ckpt, resume=True)
+    assert calls["n"] == 0 and _ids(again) == expected
+
+
+def test_resume_rejects_checkpoint_for_other_input(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    messages = DATA_DIR / "messages.csv"
+    ckpt = tmp_path / "ckpt"
+    run_pipeline(messages, DATA_DIR, limit=4, quiet=True, checkpoint_path=ckpt, checkpoint_every=2)
+    with pytest.raises(CheckpointMismatch):
+        run_pipeline(messages, DATA_DIR, limit=6, quiet=True, checkpoint_path=ckpt, resume=True)
+
+
+def test_cli_resume_mismatch_exits_with_message(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    ckpt = tmp_path / "ckpt"
+    run_pipeline(DATA_DIR / "messages.csv", DATA_DIR, limit=4, quiet=True, checkpoint_path=ckpt)
+    argv = ["app", "run", "--data-dir", str(DATA_DIR), "--limit", "6", "--resume"]
+    monkeypatch.setattr(sys, "argv", argv + ["--checkpoint", str(ckpt)])
+    with pytest.raises(SystemExit) as exc:
+        run_mod.main()
+    assert exc.value.code == 1
+    assert "Cannot resume" in capsys.readouterr().out
@@ -0,0 +1,119 @@
+"""Tests for the gated, batched LLM classification backend (local stand-in server)."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from app.classify import LLMGateStats, classify, classify_batch
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "assignment" / "data"
+MESSAGES = DATA_DIR / "messages.csv"
+
+TEXTS = [
+    "I think there is a transaction I don't recognise at Tesco for [CARD].",
+    "Can I raise my credit limit?",
+    "What are your branch opening hours near Leeds?",
+]
+
+
+def _route_all_fraud(body):
+    items = json.loads(body["messages"][-1]["content"])
+    return json.dumps(
+        {
+            "results": [
+                {
+                    "id": it["id"],
+                    "intent": "fraud",
+                    "suggested_queue": "Fraud/Economic Crime Prevention",
+                    "confidence": 0.9,
+                }
+                for it in items
+            ]
+        }
+    )
+
+
+def test_low_confidence_messages_share_one_request(openai_stub):
+    openai_stub.responder = _route_all_fraud
+    stats = LLMGateStats()
+    results = classify_batch(
+        TEXTS, MESSAGES, backend="llm", stats=stats, confidence_threshold=1.01
+    )
+    assert len(openai_stub.requests) == 1
+    req = openai_stub.requests[0]
+    assert req["response_format"]["type"] == "json_schema"
+    assert len(json.loads(req["messages"][-1]["content"])) == 3
+    assert [r.intent for r in results] == ["fraud"] * 3
+    assert stats.llm_calls == 1
+    assert stats.calls_avoided_by_batching == 2
+    assert stats.tokens_avoided_by_batching > 0
+
+
+def test_confident_messages_skip_llm(openai_stub):
+    openai_stub.responder = _route_all_fraud
+    stats = LLMGateStats()
+    classify_batch(TEXTS, MESSAGES, backend="llm", stats=stats, confidence_threshold=0.0)
+    assert openai_stub.requests == []
+    assert stats.gated_out == 3
+    assert stats.calls_avoided_by_gating == 3
+    assert stats.tokens_avoided_by_gating > 0
+
+
+def test_per_item_fallback_on_missing_or_invalid_answers(openai_stub):
+    def partial(body):
+        items = json.loads(body["messages"][-1]["content"])
+        return json.dumps(
+            {
+                "results": [
+                    {
+                        "id": items[0]["id"],
+                        "intent": "credit",
+                        "suggested_queue": "Credit/Risk",
+                        "confidence": 0.8,
+                    },
+                    {
+                        "id": items[1]["id"],
+                        "intent": "not_an_intent",
+                        "suggested_queue": "Credit/Risk",
+                        "confidence": 0.8,
+                    },
+                ]
+            }
+        )
+
+    openai_stub.responder = partial
+    stats = LLMGateStats()
+    base = classify_batch(TEXTS, MESSAGES, backend="mtl")
+    results = classify_batch(
+        TEXTS, MESSAGES, backend="llm", stats=stats, confidence_threshold=1.01
+    )
+    assert results[0].intent == "credit"
+    assert results[1:] == base[1:]
+    assert stats.llm_fallbacks == 2
+
+
+def test_api_error_falls_back_to_base(openai_stub):
+    openai_stub.status = 500
+    stats = LLMGateStats()
+    base = classify_batch(TEXTS, MESSAGES, backend="mtl")
+    results = classify_batch(
+        TEXTS, MESSAGES, backend="llm", stats=stats, confidence_threshold=1.01
+    )
+    assert results == base
+    assert stats.llm_calls == 0
+    assert stats.llm_fallbacks == 3
+
+
+def test_unknown_backend_raises():
+    with pytest.raises(ValueError):
+        classify("hello", MESSAGES, backend="nope")
+
+
+def test_llm_answer_keeps_the_models_threshold_for_its_intent(openai_stub, monkeypatch):
+    from app.mtl import load_or_train
+
+    monkeypatch.setattr(load_or_train(MESSAGES), "thresholds", {"fraud": 0.55})
+    openai_stub.responder = _route_all_fraud
+    results = classify_batch(TEXTS, MESSAGES, backend="llm", confidence_threshold=1.01)
+    assert [r.threshold for r in results] == [0.55] * 3
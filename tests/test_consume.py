@@ -0,0 +1,102 @@
+"""Tests for the queue consumer: at-least-once delivery, spool offsets and backpressure."""
+
+import json
+import time
+
+from app.consume import Consumer, ResultSink, SpoolQueue, SQLiteQueue
+
+
+def _process(text, message_id, tenant=None):
+    return {
+        "intent": "general",
+        "queue": "General Banking",
+        "confidence": 1.0,
+        "fallback": True,
+        "checks_ok": True,
+        "failures": [],
+        "draft": f"re: {text}",
+    }
+
+
+def _slow_process(text, message_id, tenant=None):
+    time.sleep(0.02)
+    return _process(text, message_id)
+
+
+def _ids(path):
+    return [json.loads(line)["message_id"] for line in path.read_text().splitlines()]
+
+
+def test_sqlite_queue_drains_and_redelivers_unacked(tmp_path):
+    q = SQLiteQueue(tmp_path / "q.db", lease_s=0.05)
+    q.put_many([(f"M{i}", f"text {i}") for i in range(25)])
+    leased = q.lease(5)  # consumer "crashes" before acking these
+    assert q.depth() == 25
+    time.sleep(0.06)
+    sink = ResultSink(tmp_path / "out.jsonl")
+    stats = Consumer(q, sink, _process, max_batch=8).run(until_empty=True)
+    sink.close()
+    assert sorted(_ids(tmp_path / "out.jsonl")) == sorted(f"M{i}" for i in range(25))
+    assert {it.message_id for it in leased} <= set(_ids(tmp_path / "out.jsonl"))
+    assert stats.acked == 25 and q.depth() == 0 and stats.consumer_lag_s == 0.0
+
+
+def test_spool_resumes_from_acked_offset(tmp_path):
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    for name, rng in (("a.jsonl", range(0, 6)), ("b.jsonl", range(6, 10))):
+        (spool / name).write_text(
+            "".join(json.dumps({"message_id": f"M{i}", "text": "x"}) + "\n" for i in rng)
+        )
+    q = SpoolQueue(spool)
+    q.ack(q.lease(4))  # acked M0..M3, then "crash"
+    assert q.depth() == 6
+
+    q = SpoolQueue(spool)
+    sink = ResultSink(tmp_path / "out.jsonl")
+    Consumer(q, sink, _process, max_batch=3).run(until_empty=True)
+    sink.close()
+    assert _ids(tmp_path / "out.jsonl") == [f"M{i}" for i in range(4, 10)]
+    assert sorted(p.name for p in (spool / "done").iterdir()) == ["a.jsonl", "b.jsonl"]
+    assert q.depth() == 0
+
+
+def test_malformed_spool_line_is_acked_as_error(tmp_path):
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    good = [json.dumps({"message_id": f"M{i}", "text": "x"}) for i in range(3)]
+    (spool / "a.jsonl").write_text("\n".join([good[0], '{"message_id": "M1", "te', good[2], "[1]"]) + "\n")
+    sink = ResultSink(tmp_path / "out.jsonl")
+    stats = Consumer(SpoolQueue(spool), sink, _process, max_batch=2).run(until_empty=True)
+    sink.close()
+    rows = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    assert [r["message_id"] for r in rows] == ["M0", "a.jsonl:1", "M2", "a.jsonl:3"]
+    assert "malformed spool line" in rows[1]["error"] and "error" in rows[3]
+    assert stats.failed == 2 and stats.acked == 4
+    assert [p.name for p in (spool / "done").iterdir()] == ["a.jsonl"]
+
+
+def test_backpressure_bounds_in_flight(tmp_path):
+    q = SQLiteQueue(tmp_path / "q.db")
+    q.put_many([(f"M{i}", "x") for i in range(60)])
+    sink = ResultSink(tmp_path / "out.jsonl")
+    consumer = Consumer(
+        q, sink, _slow_process, max_batch=32, concurrency=2, max_in_flight=8, target_batch_s=10
+    )
+    stats = consumer.run(until_empty=True)
+    sink.close()
+    assert stats.acked == 60 and stats.backpressure_waits > 0
+    assert stats.peak_in_flight <= 8 and stats.batch_size <= 8
+    assert len(set(_ids(tmp_path / "out.jsonl"))) == 60
+
+
+def test_batch_size_adapts_to_target_latency(tmp_path):
+    sizes = {}
+    for target in (10.0, 0.0):
+        q = SQLiteQueue(tmp_path / f"q{target}.db")
+        q.put_many([(f"M{i}", "x") for i in range(40)])
+        sink = ResultSink(tmp_path / "out.jsonl")
+        consumer = Consumer(q, sink, _slow_process, max_batch=16, target_batch_s=target)
+        sizes[target] = consumer.run(until_empty=True).batch_size
+        sink.close()
+    assert sizes == {10.0: 16, 0.0: 1}  # grows to max under target, halves to min over it
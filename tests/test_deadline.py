@@ -0,0 +1,99 @@
+"""Tests for per-message deadlines and graceful degradation."""
+
+from dataclasses import asdict
+from pathlib import Path
+
+from app.classify import ClassificationResult, classify_batch
+from app.deadline import Deadline
+from app.draft import draft_batch_from_policy, draft_from_policy
+from app.guardrails import run_draft_checks
+from app.kb import load_kb
+from app.results import ResultStore
+from app.run import run_pipeline
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "assignment" / "data"
+KB = load_kb(DATA_DIR / "kb")
+
+FRAUD = ClassificationResult("fraud", "Fraud/Economic Crime Prevention", 0.95)
+MESSAGE = "I don't recognise a payment at Tesco"
+
+
+def test_draft_degrades_with_remaining_budget(openai_stub):
+    roomy = Deadline(30.0)
+    text, fallback = draft_from_policy(FRAUD, KB, use_llm=True, redacted_message=MESSAGE, deadline=roomy)
+    assert not fallback and roomy.degradations == []
+
+    tight = Deadline(0.5)  # less than the 1 s an LLM call needs by default
+    text, fallback = draft_from_policy(FRAUD, KB, use_llm=True, redacted_message=MESSAGE, deadline=tight)
+    assert fallback and text.endswith("[No-LLM fallback]") and "[kb: suspected_fraud]" in text
+    assert tight.degradations == ["llm_skipped"]
+
+    spent = Deadline(0.0)
+    text, fallback = draft_from_policy(FRAUD, KB, use_llm=True, redacted_message=MESSAGE, deadline=spent)
+    assert fallback and text.endswith("[Escalated: deadline]")
+    run_draft_checks(text, spent)  # checks still run; the overrun is recorded
+    assert spent.degradations == ["draft_skipped", "deadline_missed"]
+    assert len(openai_stub.requests) == 1
+
+
+def test_pipeline_records_degradations_and_miss_rate(monkeypatch):
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    monkeypatch.delenv("USE_LLM", raising=False)
+    messages = DATA_DIR / "messages.csv"
+
+    monkeypatch.setenv("MESSAGE_DEADLINE_MS", "60000")
+    monkeypatch.setenv("DEADLINE_DRAFT_MIN_MS", "120000")  # never enough budget to draft
+    store = run_pipeline(messages, DATA_DIR, limit=20, quiet=True)
+    fraud = [r for r in store if r.intent == "fraud"]
+    assert fraud and all(r.degradations == ("draft_skipped",) for r in fraud)
+    assert all(r.queue == "Fraud/Economic Crime Prevention" for r in fraud)
+    assert all(r.degradations == () for r in store if r.intent != "fraud")
+    report = store.deadline_report()
+    assert (report["messages"], report["missed"], report["miss_rate"]) == (20, 0, 0.0)
+    assert report["draft_skipped"] == report["any_degraded"] == len(fraud)
+
+    # Rows round-trip through append (as a checkpoint restore does)
+    copy = ResultStore()
+    for r in store:
+        copy.append(**asdict(r))
+    assert list(copy) == list(store)
+
+    monkeypatch.setenv("MESSAGE_DEADLINE_MS", "0.001")
+    monkeypatch.delenv("DEADLINE_DRAFT_MIN_MS")
+    missed = run_pipeline(messages, DATA_DIR, limit=20, quiet=True).deadline_report()
+    assert missed["missed"] == 20 and missed["miss_rate"] == 1.0
+    assert missed["draft_skipped"] == len(fraud)
+
+
+def test_batched_classify_and_draft_degrade_per_message(openai_stub):
+    texts = [MESSAGE, "Can I raise my credit limit?"]
+    roomy, tight = Deadline(30.0), Deadline(0.5)
+    messages = DATA_DIR / "messages.csv"
+    classify_batch(texts, messages, backend="llm", confidence_threshold=1.01, deadlines=[roomy, tight])
+    assert len(openai_stub.requests) == 1
+    assert "credit limit" not in openai_stub.requests[0]["messages"][-1]["content"]
+    assert (roomy.degradations, tight.degradations) == ([], ["llm_classify_skipped"])
+
+    spent = Deadline(0.0)
+    items = [("a", FRAUD, MESSAGE), ("b", FRAUD, MESSAGE + " today"), ("c", FRAUD, MESSAGE)]
+    deadlines = {"a": roomy, "b": tight, "c": spent}
+    out = draft_batch_from_policy(items, KB, use_llm=True, deadlines=deadlines)
+    assert not out["a"][1] and out["b"][0].endswith("[No-LLM fallback]")
+    assert out["c"][0].endswith("[Escalated: deadline]")
+    assert (roomy.degradations, tight.degradations, spent.degradations) == (
+        [], ["llm_classify_skipped", "llm_skipped"], ["draft_skipped"]
+    )
+    assert len(openai_stub.requests) == 2
+
+
+def test_batched_pipeline_starts_deadlines_at_chunk_pickup(monkeypatch, openai_stub):
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    monkeypatch.setenv("USE_LLM", "1")
+    monkeypatch.setenv("DRAFT_BATCH", "1")
+    monkeypatch.setenv("MESSAGE_DEADLINE_MS", "500")  # under the 1 s an LLM call needs
+    store = run_pipeline(DATA_DIR / "messages.csv", DATA_DIR, limit=20, quiet=True)
+    drafted = [r for r in store if r.intent == "fraud"]
+    assert drafted and all(r.degradations == ("llm_skipped",) for r in drafted)
+    assert all(r.draft.endswith("[No-LLM fallback]") for r in drafted)
+    assert openai_stub.requests == []
+    assert store.deadline_report()["llm_skipped"] == len(drafted)
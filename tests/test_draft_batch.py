@@ -0,0 +1,62 @@
+"""Tests for batched LLM drafting (local mock server)."""
+
+import json
+from pathlib import Path
+
+from app.classify import ClassificationResult
+from app.draft import DraftBatchStats, draft_batch_from_policy
+from app.kb import load_kb
+from app.mock_llm import default_responder
+
+KB = load_kb(Path(__file__).resolve().parent.parent / "assignment" / "data" / "kb")
+
+FRAUD = ClassificationResult("fraud", "Fraud/Economic Crime Prevention", 0.95)
+GENERAL = ClassificationResult("general", "General Banking", 0.95)
+
+
+def _items():
+    return [
+        ("m1", FRAUD, "I don't recognise a payment at Tesco for £45"),
+        ("m2", FRAUD, "There is a £12 charge at Amazon I did not make"),
+        ("m3", GENERAL, "What are your opening hours?"),
+    ]
+
+
+def test_same_kb_key_shares_one_request(openai_stub):
+    stats = DraftBatchStats()
+    out = draft_batch_from_policy(_items(), KB, use_llm=True, stats=stats)
+    assert len(openai_stub.requests) == 1
+    assert openai_stub.requests[0]["response_format"]["json_schema"]["name"] == "draft_batch"
+    assert out["m1"][1] is False and "[kb: suspected_fraud]" in out["m1"][0]
+    assert out["m2"][1] is False
+    assert out["m3"][1] is True  # not in draft scope: no LLM
+    assert stats.batch_requests == 1 and stats.llm_drafts == 2
+    assert stats.prompt_tokens > 0
+
+
+def test_failing_item_is_retried_singly(openai_stub):
+    def drop_citation_for_m2(body):
+        reply = default_responder(body)
+        if body.get("response_format"):
+            data = json.loads(reply)
+            for d in data["drafts"]:
+                if d["id"] == "m2":
+                    d["draft"] = "Sure, no citation here."
+            return json.dumps(data)
+        return reply
+
+    openai_stub.responder = drop_citation_for_m2
+    stats = DraftBatchStats()
+    out = draft_batch_from_policy(_items(), KB, use_llm=True, stats=stats)
+    assert len(openai_stub.requests) == 2
+    assert stats.single_retries == 1
+    assert out["m2"][1] is False and "[kb: suspected_fraud]" in out["m2"][0]
+
+
+def test_api_error_falls_back_to_template(openai_stub):
+    openai_stub.status = 500
+    stats = DraftBatchStats()
+    out = draft_batch_from_policy(_items(), KB, use_llm=True, stats=stats)
+    assert out["m1"][1] is True and out["m1"][0].endswith("[No-LLM fallback]")
+    assert stats.template_fallbacks == 2
+    assert len(openai_stub.requests) == 1 and stats.single_retries == 0  # no N+1 into the outage
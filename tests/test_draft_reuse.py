@@ -0,0 +1,75 @@
+"""Tests for near-duplicate draft reuse (MinHash LSH)."""
+
+from pathlib import Path
+
+from app.classify import ClassificationResult
+from app.draft import draft_from_policy
+from app.draft_reuse import DraftReuseIndex, jaccard, lsh_params, shingles
+from app.kb import load_kb
+
+KB = load_kb(Path(__file__).resolve().parent.parent / "assignment" / "data" / "kb")
+
+FRAUD = ClassificationResult("fraud", "Fraud/Economic Crime Prevention", 0.95)
+TESCO = "I think there is a transaction I don't recognise at Tesco for £45.50 yesterday."
+UBER = "I think there is a transaction I don’t recognise at Uber for £12.00 yesterday."
+
+
+def test_near_duplicates_match_within_kb_key_only():
+    index = DraftReuseIndex(threshold=0.6)
+    assert jaccard(shingles(TESCO), shingles(UBER)) >= 0.6
+    index.add("suspected_fraud", TESCO, "Approved draft [kb: suspected_fraud]")
+    assert index.lookup("suspected_fraud", UBER) == "Approved draft [kb: suspected_fraud]"
+    assert index.lookup("card_lost_stolen", UBER) is None
+    assert index.lookup("suspected_fraud", "Someone set up a new payee I don't know.") is None
+    m = index.metrics()
+    assert (m["lookups"], m["hits"], m["size"]) == (3, 1, 1)
+
+
+def test_lookup_compares_only_bucket_candidates():
+    index = DraftReuseIndex(threshold=0.8)
+    bands, rows = lsh_params(0.8)
+    assert abs((1 / bands) ** (1 / rows) - 0.8) < 0.05
+    for i in range(300):
+        index.add("suspected_fraud", f"unrelated message number {i} about topic {i * 7919}", "d")
+    index.lookup("suspected_fraud", TESCO)
+    assert index.stats.candidates < 10
+
+
+def test_draft_from_policy_reuses_instead_of_calling_llm(openai_stub):
+    index = DraftReuseIndex()
+    first, fb1 = draft_from_policy(FRAUD, KB, use_llm=True, redacted_message=TESCO, reuse=index)
+    second, fb2 = draft_from_policy(FRAUD, KB, use_llm=True, redacted_message=UBER, reuse=index)
+    assert not fb1 and not fb2 and second == first
+    assert len(openai_stub.requests) == 1
+    assert index.stats.hits == 1
+
+
+def test_reuse_still_serves_when_llm_unavailable(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("LLM_BASE_URL", raising=False)
+    index = DraftReuseIndex()
+    index.add("suspected_fraud", TESCO, "Approved draft [kb: suspected_fraud]")
+    text, fallback = draft_from_policy(FRAUD, KB, use_llm=True, redacted_message=UBER, reuse=index)
+    assert (text, fallback) == ("Approved draft [kb: suspected_fraud]", False)
+    text, fallback = draft_from_policy(
+        FRAUD, KB, use_llm=True, redacted_message="Someone set up a new payee I don't know.", reuse=index
+    )
+    assert fallback and text.endswith("[No-LLM fallback]")
+
+
+def test_index_is_capped_per_kb_key_least_recently_used_first():
+    index = DraftReuseIndex(threshold=0.6, max_per_key=2)
+    index.add("suspected_fraud", TESCO, "tesco draft")
+    index.add("suspected_fraud", "Someone set up a new payee I don't know.", "payee draft")
+    index.lookup("suspected_fraud", UBER)  # reuse marks the Tesco entry most recent
+    index.add("suspected_fraud", "My card was stolen from my bag on the bus.", "stolen draft")
+    index.add("card_lost_stolen", "My card was stolen from my bag on the bus.", "other key")
+    assert index.lookup("suspected_fraud", UBER) == "tesco draft"
+    assert index.lookup("suspected_fraud", "Someone set up a new payee I don't know.") is None
+    m = index.metrics()
+    assert (m["size"], m["evicted"], m["max_per_key"]) == (3, 1, 2)
+    # evicted ids leave no (empty) buckets behind
+    buckets = [ids for band in index._buckets["suspected_fraud"] for ids in band.values()]
+    assert all(buckets) and {i for ids in buckets for i in ids} == set(
+        index._recency["suspected_fraud"]
+    )
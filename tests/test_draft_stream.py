@@ -0,0 +1,68 @@
+"""Tests for streamed LLM drafts with incremental guardrail checks (local mock server)."""
+
+import time
+from pathlib import Path
+
+from app.classify import ClassificationResult
+from app.draft import draft_from_policy
+from app.guardrails import IncrementalPIICheck
+from app.kb import load_kb
+from app.llm import draft_stream_metrics, stream_draft
+
+KB = load_kb(Path(__file__).resolve().parent.parent / "assignment" / "data" / "kb")
+
+FRAUD = ClassificationResult("fraud", "Fraud/Economic Crime Prevention", 0.95)
+LEAKY = "Thanks. We see card 4111 1111 1111 1111 on file. " + "Please wait while we check. " * 20
+
+
+def test_incremental_check_catches_pii_split_across_chunks():
+    check = IncrementalPIICheck()
+    assert check.feed("Your card 4111 11") and check.feed("11 1111 ")
+    assert not check.feed("1111 is blocked")
+    assert not check.feed(" [kb: suspected_fraud]")
+
+
+def test_incremental_check_catches_card_with_long_separator():
+    spaced = "Card 1234" + " " * 60 + "\n5678 9012 3456 is on file. [kb: suspected_fraud]"
+    check = IncrementalPIICheck()
+    for i in range(0, len(spaced), 5):
+        check.feed(spaced[i : i + 5])
+    assert not check.ok
+
+
+def test_stream_rejects_raw_pii_in_the_full_draft(openai_stub):
+    leak = "Card 1234" + " " * 60 + "\n5678 9012 3456. [kb: suspected_fraud]"
+    openai_stub.responder = lambda body: leak
+    assert stream_draft("I don't recognise a payment", "policy", "suspected_fraud") is None
+    assert draft_stream_metrics()["aborted_pii"] == 1
+
+
+def test_stream_completes_with_partials_and_citation(openai_stub):
+    partials = []
+    text = stream_draft("I don't recognise a payment", "policy", "suspected_fraud", on_partial=partials.append)
+    assert text and "[kb: suspected_fraud]" in text
+    assert len(partials) > 1 and partials[-1].strip() == text
+    assert openai_stub.requests[0]["stream"] is True
+    m = draft_stream_metrics()
+    assert (m["streams"], m["completed"], m["aborted_pii"]) == (1, 1, 0)
+    assert m["first_tokens"] == 1
+
+
+def test_raw_pii_aborts_stream_early(openai_stub):
+    openai_stub.per_token_latency_s = 0.005
+    stream_draft("I don't recognise a payment", "policy", "suspected_fraud")  # baseline duration
+    full_tokens = draft_stream_metrics()["completion_tokens"]
+
+    openai_stub.responder = lambda body: LEAKY + "[kb: suspected_fraud]"
+    partials = []
+    t0 = time.perf_counter()
+    draft, fallback = draft_from_policy(
+        FRAUD, KB, use_llm=True, redacted_message="Payment I don't recognise", on_partial=partials.append
+    )
+    elapsed = time.perf_counter() - t0
+    assert fallback and draft.endswith("[No-LLM fallback]")
+    assert "4111 1111 1111 1111" in partials[-1] and "Please wait" not in partials[-1]
+    assert elapsed < 0.005 * len(LEAKY) / 4  # did not wait for the whole completion
+    m = draft_stream_metrics()
+    assert m["aborted_pii"] == 1 and m["tokens_saved"] > 0
+    assert m["completion_tokens"] - full_tokens < len(LEAKY) // 4
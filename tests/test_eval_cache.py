@@ -0,0 +1,42 @@
+"""Tests for incremental evaluation with the prediction cache."""
+
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from app.eval import classification_metrics, eval_draft_checks
+from app.eval_cache import PredictionCache
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "assignment" / "data"
+
+
+def test_only_changed_rows_are_recomputed(tmp_path):
+    data = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data)
+    messages = data / "messages.csv"
+    df = pd.read_csv(messages).head(40)
+    with PredictionCache(tmp_path / "cache.sqlite") as cache:
+        first = classification_metrics(messages, data, backend="stub", df=df, cache=cache)
+        assert (first["cached_rows"], first["recomputed_rows"]) == (0, 40)
+
+        again = classification_metrics(messages, data, backend="stub", df=df, cache=cache)
+        assert (again["cached_rows"], again["recomputed_rows"]) == (40, 0)
+        assert again["accuracy"] == first["accuracy"]
+
+        grown = pd.concat([df, pd.read_csv(messages).iloc[40:45]])
+        grown.iloc[0, grown.columns.get_loc("text")] += " (edited)"
+        inc = classification_metrics(messages, data, backend="stub", df=grown, cache=cache)
+        assert (inc["cached_rows"], inc["recomputed_rows"]) == (39, 6)
+        assert inc["total"] == 45
+
+
+def test_pattern_or_kb_change_invalidates(tmp_path):
+    data = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data)
+    with PredictionCache(tmp_path / "cache.sqlite") as cache:
+        assert eval_draft_checks(data, limit=10, cache=cache)["recomputed_rows"] == 10
+        assert eval_draft_checks(data, limit=10, cache=cache)["recomputed_rows"] == 0
+        kb_file = next((data / "kb").glob("*.md"))
+        kb_file.write_text(kb_file.read_text() + "\nUpdated.")
+        assert eval_draft_checks(data, limit=10, cache=cache)["recomputed_rows"] == 10
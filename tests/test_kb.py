@@ -0,0 +1,35 @@
+"""Tests for the lazy, memory-bounded KB store."""
+
+from pathlib import Path
+
+import pytest
+
+from app.kb import get_snippet, load_kb, open_kb
+
+KB_DIR = Path(__file__).resolve().parent.parent / "assignment" / "data" / "kb"
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_store_matches_eager_load_and_get_snippet(use_mmap):
+    eager = load_kb(KB_DIR)
+    store = open_kb(KB_DIR, use_mmap=use_mmap)
+    assert store.resident_bytes == 0 and len(store) == len(eager)
+    for intent in ("fraud", "card_lost", "general", "unknown_intent"):
+        assert get_snippet(store, intent) == get_snippet(eager, intent)
+    assert dict(store) == eager
+    m = store.metrics()
+    assert m["misses"] == len(eager) and m["hits"] >= 2
+
+
+def test_lru_respects_byte_cap(tmp_path):
+    for i in range(20):
+        (tmp_path / f"doc{i}.md").write_text(f"# Policy {i}\n\n" + "- step\n" * 40)
+    store = open_kb(tmp_path, max_bytes=2000, use_mmap=False)
+    for _ in range(2):
+        for i in range(20):
+            assert store[f"doc{i}"].startswith(f"# Policy {i}")
+    m = store.metrics()
+    assert m["resident_bytes"] <= 2000 and m["evictions"] > 0 and 0 < m["cached"] < 20
+    assert store["doc19"] and store.stats.hits == 1  # most recent stays resident
+    with pytest.raises(KeyError):
+        store["missing"]
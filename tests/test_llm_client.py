@@ -0,0 +1,85 @@
+"""Tests for the guarded LLM client: rate limiting, retries and circuit breaker."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from app.classify import ClassificationResult
+from app.draft import draft_from_policy
+from app.kb import load_kb
+from app.llm import (
+    CircuitBreaker,
+    GuardedLLMClient,
+    LLMUnavailable,
+    TokenBucket,
+    llm_metrics,
+)
+
+KB = load_kb(Path(__file__).resolve().parent.parent / "assignment" / "data" / "kb")
+FRAUD = ClassificationResult("fraud", "Fraud/Economic Crime Prevention", 0.95)
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def test_token_bucket_denies_past_deadline():
+    bucket = TokenBucket(per_minute=60)  # 1 per second
+    assert bucket.acquire(60, time.monotonic())
+    assert not bucket.acquire(1, time.monotonic() + 0.1)
+
+
+def test_shed_on_token_limit_refunds_request_slot(openai_stub):
+    client = GuardedLLMClient(requests_per_minute=60, tokens_per_minute=1000, timeout_s=0.1)
+    assert client.tokens.acquire(1000, time.monotonic())  # token budget used up elsewhere
+    with pytest.raises(LLMUnavailable):
+        client.create(model="m", messages=MESSAGES, max_tokens=100)
+    assert client.requests._tokens > 59.9
+    assert client.metrics()["shed_rate_limited"] == 1 and not openai_stub.requests
+
+
+def test_retryable_errors_are_retried_then_fail(openai_stub):
+    openai_stub.status = 500
+    client = GuardedLLMClient(max_retries=2, backoff_base_s=0.0)
+    with pytest.raises(LLMUnavailable):
+        client.create(model="m", messages=MESSAGES)
+    assert len(openai_stub.requests) == 3
+    assert client.metrics()["retries"] == 2
+
+
+def test_breaker_opens_and_sheds_without_network(openai_stub):
+    openai_stub.status = 500
+    client = GuardedLLMClient(
+        max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout_s=60)
+    )
+    for _ in range(2):
+        with pytest.raises(LLMUnavailable):
+            client.create(model="m", messages=MESSAGES)
+    assert client.breaker.state == "open"
+    with pytest.raises(LLMUnavailable):
+        client.create(model="m", messages=MESSAGES)
+    assert len(openai_stub.requests) == 2
+    assert client.metrics()["shed_circuit_open"] == 1
+
+
+def test_half_open_probe_success_closes_breaker(openai_stub):
+    openai_stub.status = 500
+    client = GuardedLLMClient(
+        max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout_s=0.05)
+    )
+    with pytest.raises(LLMUnavailable):
+        client.create(model="m", messages=MESSAGES)
+    time.sleep(0.06)
+    assert client.breaker.state == "half_open"
+    openai_stub.status = 200
+    client.create(model="m", messages=MESSAGES)
+    assert client.breaker.state == "closed"
+
+
+def test_open_breaker_drafts_go_straight_to_template(openai_stub, monkeypatch):
+    monkeypatch.setenv("LLM_BREAKER_FAILURES", "1")
+    openai_stub.status = 500
+    text, fallback = draft_from_policy(FRAUD, KB, use_llm=True, redacted_message="lost card")
+    assert fallback and llm_metrics()["breaker_state"] == "open"
+    seen = len(openai_stub.requests)
+    text, fallback = draft_from_policy(FRAUD, KB, use_llm=True, redacted_message="lost card")
+    assert fallback and text.endswith("[No-LLM fallback]")
+    assert len(openai_stub.requests) == seen
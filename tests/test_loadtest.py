@@ -0,0 +1,45 @@
+"""Tests for the mock server fault injection, LLM_BASE_URL and the load driver."""
+
+import time
+from pathlib import Path
+
+from app.llm import GuardedLLMClient, is_available, reset_llm_client
+from app.loadtest import load_messages, run_level
+from app.mock_llm import MockLLMServer
+from app.tenants import build_engine
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "assignment" / "data"
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def test_rate_limited_reply_is_retried_after_retry_after(monkeypatch):
+    with MockLLMServer(rate_limit_rate=0.5, retry_after_s=0.05, seed=0) as server:
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+        assert is_available()
+        client = GuardedLLMClient(max_retries=10, backoff_base_s=0.0)
+        t0 = time.monotonic()
+        for _ in range(5):
+            client.create(messages=MESSAGES, model="m")
+        elapsed = time.monotonic() - t0
+    assert server.counts["ok"] == 5 and server.counts["rate_limited"] > 0
+    assert client.metrics()["retries"] == server.counts["rate_limited"]
+    assert elapsed >= 0.05 * server.counts["rate_limited"]
+
+
+def test_load_driver_reports_one_point_per_level(monkeypatch):
+    with MockLLMServer(seed=0, error_rate=0.5) as server:
+        monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+        monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+        engine = build_engine(DATA_DIR)
+        messages = load_messages(DATA_DIR, 12)
+        points = [run_level(engine, messages, c, server) for c in (1, 4)]
+    reset_llm_client()
+    assert [p["concurrency"] for p in points] == [1, 4]
+    for p in points:
+        assert p["messages"] == 12 and p["throughput_msg_s"] > 0
+        assert p["p50_ms"] <= p["p95_ms"] <= p["p99_ms"]
+        assert p["guardrail_pass_rate"] == 1.0
+        # every 500 becomes a template fallback (no retries)
+        assert p["fallback_rate"] >= p["mock_5xx"] / 12
+    assert sum(p["mock_5xx"] for p in points) > 0
@@ -0,0 +1,122 @@
+"""Tests for MTL training: feature cache, hyperparameter search and calibrated thresholds."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.draft import draft_gate, draft_threshold
+from app.mtl import (
+    MTLClassifier,
+    choose_thresholds,
+    fit_temperature,
+    compare_models,
+    load_or_train,
+    search,
+    train,
+    train_compact,
+)
+
+MESSAGES = Path(__file__).resolve().parent.parent / "assignment" / "data" / "messages.csv"
+
+
+def test_train_reuses_cached_features(tmp_path):
+    first, second = {}, {}
+    train(MESSAGES, model_path=tmp_path / "m.joblib", cache_dir=tmp_path, timings=first)
+    clf = train(
+        MESSAGES, model_path=tmp_path / "m.joblib", cache_dir=tmp_path, timings=second
+    )
+    assert first["features_cache_hit"] is False
+    assert second["features_cache_hit"] is True
+    assert {"load_s", "features_s", "heads_s", "save_s"} <= set(second)
+    assert clf.predict("I don't recognise a payment on my card").intent == "fraud"
+
+
+def test_search_scores_grid_on_holdout(tmp_path):
+    results = search(
+        MESSAGES,
+        grid={"C": (0.5, 2.0), "ngram_range": ((1, 1),), "max_features": (500,)},
+        n_jobs=1,
+        cache_dir=tmp_path,
+    )
+    assert len(results) == 2
+    assert results[0]["score"] >= results[1]["score"]
+    assert 0.0 <= results[0]["queue_accuracy"] <= 1.0
+
+
+def test_compact_model_prunes_and_predicts(tmp_path):
+    full = tmp_path / "m.joblib"
+    train(MESSAGES, model_path=full, cache_dir=tmp_path)
+    compact = train_compact(full, keep_ratio=0.5)
+    report = {r["model"]: r for r in compare_models(full, compact, MESSAGES)}
+    assert report["compact"]["vocabulary"] < report["full"]["vocabulary"]
+    assert report["compact"]["size_kb"] < report["full"]["size_kb"]
+    assert report["compact"]["size_kb_zlib"] < report["full"]["size_kb_zlib"]
+    assert report["compact"]["queue_accuracy"] >= 0.8
+    res = MTLClassifier(model_path=compact).predict("I don't recognise a payment on my card")
+    assert res.intent == "fraud" and 0.0 < res.confidence <= 1.0
+
+
+def test_choose_thresholds_meets_target_precision():
+    pred = ["fraud"] * 6 + ["general"] * 2
+    conf = [0.95, 0.9, 0.8, 0.7, 0.6, 0.5, 0.9, 0.8]
+    correct = [True, True, True, True, False, False, True, True]
+    out = choose_thresholds(pred, conf, correct, target_precision=0.8, min_support=3)
+    assert out["fraud"]["threshold"] == pytest.approx(0.55)
+    assert out["fraud"]["precision"] == 0.8 and out["fraud"]["coverage"] == 5 / 6
+    assert "general" not in out  # below min_support: global threshold
+    # 0.9 needs 10 predictions for one error to show: too few fraud ones to set a threshold
+    assert choose_thresholds(pred, conf, correct, target_precision=0.9, min_support=3) == {}
+
+
+def test_threshold_never_below_the_evidence():
+    conf = [0.99, 0.98, 0.97, 0.96, 0.95]
+    out = choose_thresholds(["fraud"] * 5, conf, [True] * 5, target_precision=0.75, min_support=3)
+    assert out["fraud"]["threshold"] == pytest.approx(0.95)  # nothing rejected: lowest accepted
+
+
+def test_temperature_on_grid_edge_is_a_failed_fit():
+    classes = np.array(["a", "b"])
+    separable = np.array([[0.9, 0.1], [0.2, 0.8]])
+    assert fit_temperature(separable, ["a", "b"], classes) is None
+    noisy = np.array([[0.9, 0.1], [0.8, 0.2], [0.3, 0.7], [0.6, 0.4]])
+    assert fit_temperature(noisy, ["a", "a", "b", "b"], classes) is not None
+
+
+def test_thresholds_stored_with_model_and_used_for_drafts(tmp_path):
+    report: dict = {}
+    train(
+        MESSAGES,
+        model_path=tmp_path / "m.joblib",
+        train_ratio=0.8,
+        cache_dir=tmp_path,
+        thresholds_report=report,
+        calibrated=True,
+    )
+    clf = MTLClassifier(model_path=tmp_path / "m.joblib")
+    assert set(clf.thresholds) == set(report) and "fraud" in report
+    res = clf.predict("I don't recognise a payment on my card")
+    assert res.threshold == clf.thresholds["fraud"]
+    assert draft_threshold(res) == res.threshold
+    assert draft_gate(res) == ("llm" if res.confidence >= res.threshold else "escalate")
+    assert draft_gate(res, threshold=0.0) == "llm"
+    assert draft_gate(res, threshold=1.01) == "escalate"
+    # No threshold looser than the lowest confidence accepted on the holdout
+    assert all(r["threshold"] > 1 / 3 for r in report.values())
+
+
+def test_load_or_train_reuses_model_until_file_changes(tmp_path):
+    path = tmp_path / "m.joblib"
+    train(MESSAGES, model_path=path, cache_dir=tmp_path)
+    first = load_or_train(MESSAGES, model_path=path)
+    assert load_or_train(MESSAGES, model_path=path) is first
+    train(MESSAGES, model_path=path, cache_dir=tmp_path, C=0.5)
+    assert load_or_train(MESSAGES, model_path=path) is not first
+
+
+def test_calibration_is_opt_in(tmp_path):
+    timings: dict = {}
+    clf = train(MESSAGES, model_path=tmp_path / "m.joblib", cache_dir=tmp_path, timings=timings)
+    assert "calibration_s" not in timings and not clf.thresholds
+    res = clf.predict("I don't recognise a payment on my card")
+    assert res.threshold is None and draft_threshold(res) == 0.7
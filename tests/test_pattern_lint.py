@@ -0,0 +1,98 @@
+"""Tests for ReDoS pattern linting and the per-message redaction time budget."""
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.pattern_lint import fuzz_pattern, lint_regex
+from app.redact import (
+    QUARANTINE_MASK,
+    RedactionBudgetExceeded,
+    UnsafePatternError,
+    load_patterns,
+    redact_with_budget,
+)
+
+PII_YAML = Path(__file__).resolve().parent.parent / "assignment" / "data" / "pii_patterns.yaml"
+EVIL = [{"regex": r"(a+)+$", "mask": "[X]"}]
+EVIL_INPUT = "a" * 40 + "b"
+
+
+def _rules(regex):
+    return {(f.rule, f.severity) for f in lint_regex(regex)}
+
+
+def test_linter_flags_super_linear_constructs():
+    assert ("nested_quantifier", "error") in _rules(r"(a+)+$")
+    assert ("overlapping_alternation", "error") in _rules(r"(xy|\wy)*$")
+    assert ("adjacent_overlapping_repeats", "warning") in _rules(r"\d+\d+x")
+    assert ("backreference", "warning") in _rules(r"(\w+)\s\1")
+    assert not any(s == "error" for _, s in _rules(r"(?:\d{4}[ -]?){3}\d{4}"))
+
+
+def test_shipped_patterns_pass_strict_lint():
+    assert len(load_patterns(PII_YAML)) >= 1
+
+
+def test_strict_load_rejects_unsafe_pattern(tmp_path):
+    bad = tmp_path / "pii_patterns.yaml"
+    bad.write_text('patterns:\n  - name: evil\n    regex: "(a+)+$"\n    mask: "[X]"\n')
+    with pytest.raises(UnsafePatternError):
+        load_patterns(bad)
+    with pytest.warns(RuntimeWarning):
+        assert len(load_patterns(bad, lint="warn")) == 1
+
+
+def test_budget_fails_closed_in_main_thread():
+    out, timed_out = redact_with_budget(EVIL_INPUT, EVIL, budget_s=0.05)
+    assert timed_out and out == QUARANTINE_MASK
+    with pytest.raises(RedactionBudgetExceeded):
+        redact_with_budget(EVIL_INPUT, EVIL, budget_s=0.05, on_timeout="raise")
+
+
+def test_budget_fails_closed_in_worker_thread():
+    results = []
+    t = threading.Thread(
+        target=lambda: results.append(
+            redact_with_budget(EVIL_INPUT, EVIL, budget_s=0.5)
+        )
+    )
+    t.start()
+    t.join(5)
+    assert results == [(QUARANTINE_MASK, True)]
+
+
+def test_fast_path_unchanged():
+    out, timed_out = redact_with_budget("card 4791 5741 2307 4814", load_patterns(PII_YAML), 1.0)
+    assert not timed_out and "[CARD]" in out
+
+
+def test_fuzz_reports_worst_case_per_size():
+    worst = fuzz_pattern(r"\d{2}-\d{2}-\d{2}", sizes=(100, 1000))
+    assert set(worst) == {100, 1000}
+    assert all(t < 1.0 for t in worst.values())
+    assert fuzz_pattern(r"(a+)+$", sizes=(40,), budget_s=0.05)[40] == float("inf")
+
+
+def test_slow_message_does_not_stall_other_worker_threads():
+    patterns = load_patterns(PII_YAML)
+    redact_with_budget("warm", patterns, 1.0)  # main thread: alarm path, no worker
+    done = {}
+
+    def run(name, text, pats, budget_s):
+        t0 = time.perf_counter()
+        out = redact_with_budget(text, pats, budget_s)
+        done[name] = (out, time.perf_counter() - t0)
+
+    slow = threading.Thread(target=run, args=("slow", EVIL_INPUT, EVIL, 3.0))
+    slow.start()
+    time.sleep(0.05)
+    fast = threading.Thread(target=run, args=("fast", "card 4791 5741 2307 4814", patterns, 3.0))
+    fast.start()
+    fast.join(10)
+    assert "slow" not in done  # the fast message did not wait for the slow one's budget
+    assert not done["fast"][0][1] and "[CARD]" in done["fast"][0][0]
+    slow.join(10)
+    assert done["slow"][0] == (QUARANTINE_MASK, True)
@@ -0,0 +1,54 @@
+"""Tests for the staged (pipelined) runner."""
+
+import time
+from pathlib import Path
+
+from app.pipeline import StagedPipeline
+from app.run import run_pipeline
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "assignment" / "data"
+
+
+def test_overlaps_slow_drafts_and_keeps_order():
+    def slow_draft(x):
+        time.sleep(0.02)
+        return x * 10
+
+    runner = StagedPipeline(lambda x: x + 1, slow_draft, lambda x: -x, cpu_workers=2, draft_concurrency=8)
+    t0 = time.perf_counter()
+    out = runner.run(range(40))
+    assert out == [-(i + 1) * 10 for i in range(40)]
+    assert time.perf_counter() - t0 < 40 * 0.02 / 2
+    stats = runner.stats.as_dict()
+    assert stats["stages"]["check"]["items"] == 40
+    assert 0 < stats["stages"]["draft"]["utilisation"] <= 1
+
+
+def test_bounded_queues_apply_backpressure():
+    def slow_check(x):
+        time.sleep(0.005)
+        return x
+
+    runner = StagedPipeline(lambda x: x, lambda x: x, slow_check, queue_size=4)
+    assert runner.run(range(60)) == list(range(60))
+    stats = runner.stats.as_dict()
+    assert all(q["max_depth"] <= 4 for q in stats["queues"].values())
+    assert stats["stages"]["draft"]["blocked_s"] > 0
+
+
+def test_staged_run_matches_sequential(monkeypatch):
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    messages = DATA_DIR / "messages.csv"
+    seq = list(run_pipeline(messages, DATA_DIR, limit=30, quiet=True))
+    staged = list(run_pipeline(messages, DATA_DIR, limit=30, quiet=True, staged=True))
+    assert staged == seq
+
+
+def test_staged_is_reported_off_when_drafts_batch(monkeypatch, capsys, openai_stub):
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    monkeypatch.setenv("USE_LLM", "1")
+    monkeypatch.setenv("DRAFT_BATCH", "1")
+    rows = run_pipeline(DATA_DIR / "messages.csv", DATA_DIR, limit=5, staged=True)
+    assert len(rows) == 5
+    out = capsys.readouterr().out
+    assert "Staged mode disabled: DRAFT_BATCH=1" in out and "Staged pipeline:" not in out
@@ -0,0 +1,34 @@
+"""Tests for the pipeline profiler."""
+
+from pathlib import Path
+
+from app.profiling import STAGES, profile_pipeline, write_synthetic_corpus
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "assignment" / "data"
+
+
+def test_profile_attributes_stages_and_writes_outputs(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    monkeypatch.delenv("USE_LLM", raising=False)
+    corpus = write_synthetic_corpus(DATA_DIR, 30, tmp_path / "synthetic.csv")
+    summary = profile_pipeline(corpus, DATA_DIR, limit=None, out_dir=tmp_path)
+    assert summary["messages"] == 30
+    assert set(summary["stages"]) == set(STAGES)
+    assert all(st.calls == 30 for st in summary["stages"].values())
+    for line in summary["stacks_path"].read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert ";" in stack and int(count) > 0
+    assert "Top" in summary["allocations_path"].read_text()
+    assert summary["alloc_wall_s"] > 0
+    assert any(st.alloc_peak_bytes > 0 for st in summary["stages"].values())
+
+
+def test_budgeted_redaction_is_attributed_to_redact(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    monkeypatch.setenv("REDACT_BUDGET_MS", "1000")
+    monkeypatch.delenv("USE_LLM", raising=False)
+    summary = profile_pipeline(
+        DATA_DIR / "messages.csv", DATA_DIR, limit=5, out_dir=tmp_path, trace_allocations=False
+    )
+    redact = summary["stages"]["redact"]
+    assert redact.calls == 5 and redact.total_s > 0
@@ -0,0 +1,51 @@
+"""Tests for cache-friendly, token-budgeted draft prompts."""
+
+from pathlib import Path
+
+from app.llm import draft_token_metrics, estimate_tokens, generate_draft
+from app.kb import load_kb
+from app.prompts import DRAFT_SYSTEM, build_draft_prompt, policy_sections
+
+KB = load_kb(Path(__file__).resolve().parent.parent / "assignment" / "data" / "kb")
+
+
+def test_prefix_is_static_per_kb_key():
+    a = build_draft_prompt("Payment at Tesco I don't recognise", KB["suspected_fraud"], "suspected_fraud")
+    b = build_draft_prompt("Transfer I didn't make", KB["suspected_fraud"], "suspected_fraud")
+    c = build_draft_prompt("I lost my card", KB["card_lost_stolen"], "card_lost_stolen")
+    assert a.prefix == b.prefix
+    assert a.messages[0] == c.messages[0] == {"role": "system", "content": DRAFT_SYSTEM}
+    assert "[kb:" not in DRAFT_SYSTEM
+    assert not a.trimmed
+
+
+def test_budget_keeps_most_relevant_sections():
+    header, sections = policy_sections(KB["card_lost_stolen"])
+    assert header.startswith("# Card Lost") and len(sections) == 4
+    prompt = build_draft_prompt(
+        "When will my new card delivery arrive?", KB["card_lost_stolen"], "card_lost_stolen", budget_tokens=130
+    )
+    policy = prompt.messages[1]["content"]
+    assert prompt.trimmed and 0 < prompt.sections_kept < 4
+    assert "delivery times" in policy and "# Card Lost or Stolen" in policy
+    assert prompt.prompt_tokens <= 130
+    assert sum(estimate_tokens(m["content"]) for m in prompt.messages) == prompt.prompt_tokens
+
+
+def test_repeated_prefix_reports_cached_tokens(openai_stub):
+    usage: dict[str, int] = {}
+    for text in ("Payment at Tesco I don't recognise", "Transfer I didn't make"):
+        assert generate_draft(text, KB["suspected_fraud"], "suspected_fraud", usage=usage)
+    m = draft_token_metrics()
+    assert m["calls"] == 2 and m["cached_tokens"] == usage["cached_tokens"] > 0
+    assert usage["cached_tokens"] < usage["prompt_tokens"]
+
+
+def test_long_customer_message_is_truncated_not_the_policy():
+    message = " ".join(["I lost my card on the train and need a replacement delivered"] * 30)
+    prompt = build_draft_prompt(message, KB["card_lost_stolen"], "card_lost_stolen", budget_tokens=400)
+    assert prompt.sections_kept >= 1 and "# Card Lost or Stolen" in prompt.messages[1]["content"]
+    assert prompt.messages[2]["content"].count("[truncated]") == 1
+    assert prompt.prompt_tokens <= 400
+    short = build_draft_prompt("I lost my card", KB["card_lost_stolen"], "card_lost_stolen", budget_tokens=400)
+    assert "[truncated]" not in short.messages[2]["content"]
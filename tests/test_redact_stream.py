@@ -0,0 +1,61 @@
+"""Equivalence and memory tests for streaming redaction."""
+
+import io
+import random
+import tracemalloc
+from pathlib import Path
+
+from app.redact import load_patterns, redact, redact_stream
+
+PII_YAML = Path(__file__).resolve().parent.parent / "assignment" / "data" / "pii_patterns.yaml"
+PATTERNS = load_patterns(PII_YAML)
+
+PII_TEXT = (
+    "Card 4791 5741 2307 4814, sort code 12-34-56, acct 12345678, "
+    "mail joe.bloggs+bank@example.co.uk, phone +447912345678, postcode SW1A 1AA. "
+)
+
+
+def _chunked(text: str, rng: random.Random):
+    i = 0
+    while i < len(text):
+        n = rng.randint(1, 40)
+        yield text[i : i + n]
+        i += n
+
+
+def test_stream_matches_whole_text_for_random_chunking():
+    text = ("Hello there. " + PII_TEXT) * 50
+    expected = redact(text, PATTERNS)
+    for seed in range(20):
+        rng = random.Random(seed)
+        assert "".join(redact_stream(_chunked(text, rng), PATTERNS)) == expected
+
+
+def test_match_split_across_every_boundary():
+    text = PII_TEXT * 3
+    expected = redact(text, PATTERNS)
+    for cut in range(1, len(PII_TEXT)):
+        out = "".join(redact_stream([text[:cut], text[cut:]], PATTERNS))
+        assert out == expected
+
+
+def test_file_like_source():
+    text = PII_TEXT * 200
+    out = "".join(redact_stream(io.StringIO(text), PATTERNS, chunk_size=97))
+    assert out == redact(text, PATTERNS)
+    assert "4791" not in out and "joe.bloggs" not in out
+
+
+def test_peak_memory_bounded():
+    chunk = "Statement line with nothing sensitive. " * 100 + PII_TEXT
+    n_chunks = 500  # ~2 MB total
+
+    tracemalloc.start()
+    total = 0
+    for piece in redact_stream((chunk for _ in range(n_chunks)), PATTERNS):
+        total += len(piece)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert total > 1_000_000
+    assert peak < 200_000
@@ -0,0 +1,69 @@
+"""Tests for the warm interactive triage mode."""
+
+import io
+from pathlib import Path
+
+from app.repl import Repl
+from app.tenants import build_engine
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "assignment" / "data"
+
+
+def _repl(tmp_path=None):
+    out = io.StringIO()
+    return Repl(build_engine(tmp_path or DATA_DIR), out=out), out
+
+
+def test_modes_and_latency_per_message():
+    repl, out = _repl()
+    repl.loop(
+        [
+            "My card 4111 1111 1111 1111 was stolen",
+            ":predict Someone set up a new payee I don't know.",
+            ":redact",
+            "mail a@b.com",
+            ":quit",
+            "never read",
+        ]
+    )
+    text = out.getvalue()
+    assert "[CARD]" in text and "draft:" in text and "[EMAIL]" in text
+    assert text.count("latency:") == 3 and "never read" not in text
+    assert repl.mode == "redact"
+    assert set(repl.stats.as_dict()) == {"run", "predict", "redact"}
+
+
+def test_reload_picks_up_changed_patterns(tmp_path):
+    (tmp_path / "kb").mkdir()
+    (tmp_path / "pii_patterns.yaml").write_text(
+        'patterns:\n  - name: email\n    regex: "[a-z]+@[a-z.]+"\n    mask: "[EMAIL]"\n'
+    )
+    repl, out = _repl(tmp_path)
+    repl.handle(":redact call 07700 900123")
+    (tmp_path / "pii_patterns.yaml").write_text(
+        'patterns:\n  - name: phone\n    regex: "\\\\d{5} \\\\d{6}"\n    mask: "[PHONE]"\n'
+    )
+    repl.handle(":reload patterns")
+    repl.handle(":redact call 07700 900123")
+    lines = [line for line in out.getvalue().splitlines() if line.startswith("redacted:")]
+    assert lines == ["redacted: call 07700 900123", "redacted: call [PHONE]"]
+
+
+def test_failed_reload_keeps_previous_patterns_and_session(tmp_path):
+    (tmp_path / "kb").mkdir()
+    (tmp_path / "pii_patterns.yaml").write_text(
+        'patterns:\n  - name: email\n    regex: "[a-z]+@[a-z.]+"\n    mask: "[EMAIL]"\n'
+    )
+    repl, out = _repl(tmp_path)
+    bad_files = (
+        'patterns:\n  - name: nested\n    regex: "(a+)+b"\n    mask: "[X]"\n',  # ReDoS
+        'patterns:\n  - name: email\n    regex: "[a-z]+@[a-z.]+\n    mask: [EMAIL\n',  # YAML
+    )
+    for bad in bad_files:
+        (tmp_path / "pii_patterns.yaml").write_text(bad)
+        assert repl.handle(":reload patterns") is True
+        repl.handle(":redact mail a@b.com")
+    text = out.getvalue()
+    assert text.count("reload patterns failed, keeping the previous one") == 2
+    assert "UnsafePatternError" in text
+    assert text.count("redacted: mail [EMAIL]") == 2
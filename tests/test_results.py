@@ -0,0 +1,39 @@
+"""Tests for the columnar batch result store."""
+
+import pytest
+
+from app.classify import ClassificationResult
+from app.results import ResultStore
+
+
+def test_round_trip_and_growth():
+    store = ResultStore(capacity=1)
+    store.append("M1", "fraud", "Fraud", 0.91, False, [], "Draft [kb: suspected_fraud]")
+    store.append("M2", "general", "General", 0.4, True, ["citation_missing"], "x" * 100)
+    store.append("M3", "fraud", "Fraud", 0.5, True, ["citation_missing", "possible_pii_in_draft"], "")
+    assert len(store) == 3
+    r = store[0]
+    assert (r.msg_id, r.intent, r.queue, r.fallback, r.checks_ok) == ("M1", "fraud", "Fraud", False, True)
+    assert r.confidence == pytest.approx(0.91, abs=1e-6)
+    assert store[1].status == "FAIL:citation_missing"
+    assert store[1].draft_preview == "x" * 80 + "…"
+    assert store[-1].failures == ("citation_missing", "possible_pii_in_draft")
+    assert store.fallback_mask.tolist() == [False, True, True]
+    assert store.checks_ok_mask.tolist() == [True, False, False]
+    assert [r.msg_id for r in store] == ["M1", "M2", "M3"]
+
+
+def test_identical_drafts_stored_once():
+    store = ResultStore()
+    for i in range(3):
+        store.append(f"M{i}", "fraud", "Fraud", 0.9, False, [], "template " + "draft")
+    assert store[0].draft is store[2].draft
+
+
+def test_unknown_failure_rejected():
+    with pytest.raises(ValueError):
+        ResultStore().append("M1", "fraud", "Fraud", 0.9, False, ["new_check"], "")
+
+
+def test_classification_result_has_slots():
+    assert not hasattr(ClassificationResult("fraud", "Fraud", 0.9), "__dict__")
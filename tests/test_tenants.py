@@ -0,0 +1,125 @@
+"""Tests for the multi-tenant engine registry."""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.consume import main as consume_main
+from app.redact import UnsafePatternError
+from app.tenants import EngineRegistry
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "assignment" / "data"
+
+
+@pytest.fixture
+def tenants(tmp_path):
+    """Two brands: the shipped data, and a copy whose card mask differs."""
+    a = tmp_path / "brand_a"
+    b = tmp_path / "brand_b"
+    for d in (a, b):
+        shutil.copytree(DATA_DIR, d)
+    yaml_b = b / "pii_patterns.yaml"
+    yaml_b.write_text(yaml_b.read_text().replace('"[CARD]"', '"[PAN]"'))
+    return a, b
+
+
+def test_switching_tenants_reuses_engines(tenants):
+    a, b = tenants
+    reg = EngineRegistry()
+    ea = reg.get(a)
+    eb = reg.get(b)
+    assert reg.get(a) is ea and reg.get(b) is eb
+    stats = reg.stats()
+    assert (stats["misses"], stats["hits"]) == (2, 2)
+    assert stats["hit_rate"] == 0.5
+    assert stats["cold_load_s_total"] > 0
+
+
+def test_each_tenant_uses_its_own_patterns(tenants):
+    a, b = tenants
+    reg = EngineRegistry()
+    text = "My card 4791 5741 2307 4814 was stolen"
+    assert "[CARD]" in reg.get(a).process(text)["redacted"]
+    assert "[PAN]" in reg.get(b).process(text)["redacted"]
+
+
+def test_lru_eviction_by_count_and_bytes(tenants):
+    a, b = tenants
+    reg = EngineRegistry(max_tenants=1)
+    reg.get(a)
+    reg.get(b)
+    assert reg.stats()["evictions"] == 1 and reg.stats()["tenants"] == 1
+    reg.get(a)
+    assert reg.stats()["misses"] == 3
+
+    tiny = EngineRegistry(max_bytes=1)
+    tiny.get(a)
+    tiny.get(b)
+    assert tiny.stats()["tenants"] == 1
+
+
+def test_engine_reads_stub_labels_once_and_failed_build_is_retried(tenants, tmp_path, monkeypatch):
+    a, _ = tenants
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    reg = EngineRegistry()
+    engine = reg.get(a)
+    (a / "messages.csv").unlink()  # labels were loaded with the engine
+    assert engine.classify("a payment I don't recognise", "MSG0002").intent == "fraud"
+
+    broken = tmp_path / "broken"
+    broken.mkdir()
+    (broken / "pii_patterns.yaml").write_text('patterns:\n  - regex: "(a+)+$"\n    mask: "[X]"\n')
+    with pytest.raises(UnsafePatternError):
+        reg.get(broken)
+    assert not reg._building
+    shutil.copytree(DATA_DIR, broken, dirs_exist_ok=True)
+    assert reg.get(broken).patterns
+
+
+def test_consume_routes_messages_to_their_tenant(tenants, tmp_path, monkeypatch):
+    a, b = tenants
+    monkeypatch.setenv("CLASSIFY_BACKEND", "stub")
+    monkeypatch.delenv("USE_LLM", raising=False)
+    policy = b / "kb" / "suspected_fraud.md"
+    policy.write_text("Brand B fraud policy.\n" + policy.read_text())
+    csv = tmp_path / "in.csv"
+    csv.write_text(
+        "message_id,text,tenant\n"
+        "MSG0002,Payment I don't recognise,brand_a\n"
+        "MSG0002,Payment I don't recognise,brand_b\n"
+        "MSG0002,Payment I don't recognise,brand_c\n"
+    )
+    out = tmp_path / "out.jsonl"
+    args = ["--spool", str(tmp_path / "spool"), "--enqueue", str(csv), "--once"]
+    consume_main(args + ["--tenants-dir", str(a.parent), "--out", str(out)])
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r["tenant"] for r in rows] == ["brand_a", "brand_b", "brand_c"]
+    assert "Brand B" not in rows[0]["draft"] and "Brand B" in rows[1]["draft"]
+    assert rows[0]["intent"] == rows[1]["intent"] == "fraud"
+    assert "unknown tenant" in rows[2]["error"]
+
+
+def test_evicted_engine_releases_its_model(tmp_path, monkeypatch):
+    import gc
+    import weakref
+
+    from app import mtl
+
+    monkeypatch.setenv("CLASSIFY_BACKEND", "mtl")
+    model = tmp_path / "model.joblib"
+    mtl.train(DATA_DIR / "messages.csv", model_path=model)
+    dirs = []
+    for name in ("t1", "t2", "t3"):
+        d = tmp_path / name
+        shutil.copytree(DATA_DIR, d)
+        shutil.copy(model, d / mtl.MODEL_FILE)
+        dirs.append(d)
+    reg = EngineRegistry(max_tenants=1)
+    first = weakref.ref(reg.get(dirs[0]).classifier)
+    for d in dirs:
+        assert reg.get(d).classify("I don't recognise a payment").intent
+    gc.collect()
+    assert reg.stats()["tenants"] == 1 and first() is None
+    assert not [k for k in mtl._loaded if any(k[0].startswith(str(d.resolve())) for d in dirs)]